@@ -0,0 +1,198 @@
+import argparse
+import mmap
+import os
+import struct
+import time
+
+import pygame
+
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS, AUDIO_BUFFER,
+    FONT_FILE, MESSAGE_IMAGE, BACKGROUND_IMAGE, FLOOR_IMAGE, PIPE_IMAGE, BIRD_FRAME_FILES,
+    FLAP_SOUND, HIT_SOUND, SCORE_SOUND, ASSET_PACK_FILE,
+)
+
+# Every asset in the form the game uses it, in one file: images already
+# scaled and laid out as 32-bit BGRA, sounds decoded to raw PCM in the
+# mixer's format, and the font file. The pack is memory-mapped and slices of
+# the mapping go straight to pygame.image.frombuffer() and
+# mixer.Sound(buffer=), so startup neither decodes nor scales anything.
+# Without a pack (or with a stale one) the same assets come from the source
+# files through FileAssets.
+#
+# Layout (little endian):
+#   header   magic, version, entry count, mixer frequency, sample size, channels
+#   entries  name, kind, offset, size, width, height
+#   data     each entry's bytes, starting on an ALIGN boundary
+
+MAGIC = b'FBAP'
+VERSION = 1
+ALIGN = 64
+HEADER = struct.Struct('<4sBIihB')
+ENTRY = struct.Struct('<24sBQIHH')
+PIXEL_FORMAT = 'BGRA'
+# Masks of a BGRA buffer read as little-endian 32-bit pixels
+PIXEL_MASKS = (0xFF0000, 0xFF00, 0xFF, 0xFF000000)
+
+KIND_IMAGE = 0
+KIND_IMAGE_ALPHA = 1
+KIND_SOUND = 2
+KIND_BLOB = 3
+
+SCALE2X = 'scale2x'
+FIT_SCREEN = 'screen'
+
+# name -> (kind, source file, how it is scaled)
+IMAGES = {
+    'message': (KIND_IMAGE_ALPHA, MESSAGE_IMAGE, SCALE2X),
+    'background': (KIND_IMAGE, BACKGROUND_IMAGE, FIT_SCREEN),
+    'floor': (KIND_IMAGE, FLOOR_IMAGE, SCALE2X),
+    'pipe': (KIND_IMAGE, PIPE_IMAGE, SCALE2X),
+}
+IMAGES.update({f'bird{index}': (KIND_IMAGE_ALPHA, path, SCALE2X)
+               for index, path in enumerate(BIRD_FRAME_FILES)})
+SOUNDS = {'flap': FLAP_SOUND, 'hit': HIT_SOUND, 'score': SCORE_SOUND}
+BLOBS = {'font': FONT_FILE}
+MIXER_FORMAT = (AUDIO_FREQUENCY, AUDIO_SIZE, AUDIO_CHANNELS)
+
+
+def source_files():
+    return ([path for _, path, _ in IMAGES.values()] + list(SOUNDS.values())
+            + list(BLOBS.values()))
+
+
+class FileAssets:
+    # Decodes and scales the source files; needs a display mode to be set
+    source = 'files'
+
+    def image(self, name):
+        kind, path, scale = IMAGES[name]
+        surface = pygame.image.load(path)
+        surface = surface.convert_alpha() if kind == KIND_IMAGE_ALPHA else surface.convert()
+        if scale == FIT_SCREEN:
+            return pygame.transform.scale(surface, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        return pygame.transform.scale2x(surface)
+
+    def sound(self, name):
+        return pygame.mixer.Sound(SOUNDS[name])
+
+    def blob(self, name):
+        with open(BLOBS[name], 'rb') as f:
+            return f.read()
+
+
+class AssetPack:
+    source = 'pack'
+
+    def __init__(self, path=ASSET_PACK_FILE):
+        with open(path, 'rb') as f:
+            # The mapping outlives the file object and every surface made from it
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, version, count, frequency, size, channels = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('not an asset pack or unsupported version')
+        self.mixer_format = (frequency, size, channels)
+        self.entries = {}
+        offset = HEADER.size
+        for _ in range(count):
+            name, kind, data_offset, data_size, width, height = ENTRY.unpack_from(self.map, offset)
+            self.entries[name.rstrip(b'\0').decode()] = (kind, data_offset, data_size, width, height)
+            offset += ENTRY.size
+        self.fallback = FileAssets()
+
+    def data(self, name):
+        _, offset, size, _, _ = self.entries[name]
+        return self.view[offset:offset + size]
+
+    def image(self, name):
+        kind, offset, size, width, height = self.entries[name]
+        surface = pygame.image.frombuffer(self.view[offset:offset + size], (width, height), PIXEL_FORMAT)
+        if kind == KIND_IMAGE:
+            # frombuffer has no 32-bit format without alpha; one convert() makes
+            # opaque images blit without blending
+            return surface.convert()
+        if pygame.display.get_surface().get_masks()[:3] != PIXEL_MASKS[:3]:
+            return surface.convert_alpha()
+        return surface
+
+    def sound(self, name):
+        if pygame.mixer.get_init() != self.mixer_format:
+            return self.fallback.sound(name)
+        return pygame.mixer.Sound(buffer=self.data(name))
+
+    def blob(self, name):
+        return bytes(self.data(name))
+
+
+def pack_is_current(path=ASSET_PACK_FILE):
+    if not os.path.exists(path):
+        return False
+    built = os.path.getmtime(path)
+    return all(os.path.getmtime(source) <= built for source in source_files())
+
+
+def open_assets(path=ASSET_PACK_FILE):
+    # The pack when there is an up-to-date one, otherwise the source files
+    if path and os.path.exists(path):
+        if pack_is_current(path):
+            try:
+                return AssetPack(path)
+            except (OSError, ValueError, struct.error) as e:
+                print(f'Ignoring asset pack {path}: {e}')
+        else:
+            print(f'Asset pack {path} is older than the assets; rebuild it with python assetpack.py')
+    return FileAssets()
+
+
+def build(path=ASSET_PACK_FILE):
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    pygame.mixer.init(frequency=AUDIO_FREQUENCY, size=AUDIO_SIZE, channels=AUDIO_CHANNELS,
+                      buffer=AUDIO_BUFFER)
+    if pygame.mixer.get_init() != MIXER_FORMAT:
+        raise RuntimeError(f'mixer opened as {pygame.mixer.get_init()}, expected {MIXER_FORMAT}')
+
+    files = FileAssets()
+    items = []
+    for name, (kind, _, _) in IMAGES.items():
+        surface = files.image(name)
+        items.append((name, kind, pygame.image.tobytes(surface, PIXEL_FORMAT)) + surface.get_size())
+    for name in SOUNDS:
+        items.append((name, KIND_SOUND, files.sound(name).get_raw(), 0, 0))
+    for name in BLOBS:
+        items.append((name, KIND_BLOB, files.blob(name), 0, 0))
+    pygame.quit()
+
+    offset = HEADER.size + ENTRY.size * len(items)
+    header = [HEADER.pack(MAGIC, VERSION, len(items), *MIXER_FORMAT)]
+    data = []
+    for name, kind, payload, width, height in items:
+        padding = -offset % ALIGN
+        data.append(bytes(padding))
+        offset += padding
+        header.append(ENTRY.pack(name.encode(), kind, offset, len(payload), width, height))
+        data.append(payload)
+        offset += len(payload)
+
+    temp = path + '.tmp'
+    with open(temp, 'wb') as f:
+        f.write(b''.join(header + data))
+    os.replace(temp, path)
+    return offset
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bake the game assets into one memory-mappable file')
+    parser.add_argument('--output', default=ASSET_PACK_FILE)
+    args = parser.parse_args()
+    start = time.perf_counter()
+    size = build(args.output)
+    print(f'{args.output}: {len(IMAGES) + len(SOUNDS) + len(BLOBS)} assets, {size:,} bytes '
+          f'in {(time.perf_counter() - start) * 1000:.0f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,356 @@
+import json
+import os
+import sys
+import time
+
+from config import (
+    FPS, GRAVITY, JUMP_STRENGTH, PIPE_GAP, PIPE_WIDTH, FLOOR_Y, CEILING_Y, BIRD_START_Y,
+    MAX_PIPE_SPEED, MIN_PIPE_SPAWN_RATE,
+)
+from simulation import BIRD_LEFT, BIRD_RIGHT, BIRD_HALF_HEIGHT
+from stats import Histogram
+
+# Autopilot for soak and regression runs: a planner that plays the game
+# within a small per-tick time budget, and a log of what every run reached.
+#
+# The planner works on flap points. A flap sets the bird's velocity to
+# JUMP_STRENGTH whatever it was, so n ticks after flapping from height y the
+# bird is at y + ARC[n]: the future after a flap depends only on the tick and
+# the height. safe[k] holds the heights (as intervals) from which a flap on
+# tick k can be followed by flaps that keep the bird inside the open band of
+# every later tick up to the end of the window. It is filled backwards from
+# the window's end, one tick (row) at a time.
+#
+# The open bands come from a ghost: a fork of the game whose bird cannot die,
+# kept ahead of the real one. Pipe heights come from the counter RNG and speed
+# and spawn rate from the pipes passed, not from the bird, so as long as the
+# real bird lives the ghost sees exactly the pipes it will meet.
+#
+# A window of LOOKAHEAD_TICKS rows costs several milliseconds, so it is
+# spread over the ticks before it is needed: every decide() fills a few rows
+# of the next window while deciding from the current one.
+
+LOOKAHEAD_TICKS = 300
+ROWS_PER_DECISION = 4
+# Ghost ticks cost a fraction of a row
+GHOST_TICKS_PER_ROW = 8
+# ARC assumes int() rounds down, which holds for positive heights; the
+# ceiling is far above the screen, so the band keeps the bird below this
+ARC_MIN_Y = 8
+# The pixel narrow phase can reach past the unrotated rect when the bird tilts
+PIXEL_MARGIN = 10
+# Ticks on the game-over screen before the autopilot starts the next run
+RESTART_TICKS = 60
+DECISION_BUDGET_MS = 1.0
+# A frame is a hitch when it takes this many frame budgets or more
+HITCH_FRAMES = 2
+
+ARC = [0]
+_velocity = JUMP_STRENGTH
+for _ in range(LOOKAHEAD_TICKS + 1):
+    _velocity += GRAVITY
+    ARC.append(ARC[-1] + int(_velocity // 1))
+
+
+def _never_collides():
+    return None
+
+
+class Autopilot:
+    def __init__(self, lookahead=LOOKAHEAD_TICKS, rows=ROWS_PER_DECISION, margin=0):
+        if not 0 < lookahead <= LOOKAHEAD_TICKS:
+            raise ValueError(f'lookahead must be between 1 and {LOOKAHEAD_TICKS}, got {lookahead}')
+        self.lookahead = lookahead
+        self.rows = rows
+        self.margin = margin
+        # Decision times in ms; take_times() hands them over per run
+        self.times = Histogram()
+        self.over_budget = 0
+        # Decisions where neither flapping nor waiting was known to be safe
+        self.doomed = 0
+        self.ghost = None
+        self.seed = None
+        self.tick = None
+
+    def reset(self, sim):
+        ghost = self.ghost = sim.fork()
+        ghost.check_collision = _never_collides
+        ghost.done = False
+        self.seed = sim.seed
+        # low[i]/high[i] bound the bird's height after tick base + i
+        self.base = sim.tick + 1
+        self.low = []
+        self.high = []
+        self.safe = {}
+        self.end = 0
+        self.job = None
+
+    def decide(self, sim):
+        # Call once before every tick; returns whether to flap on it
+        start = time.perf_counter()
+        if self.ghost is None or sim.tick != self.tick + 1 or sim.seed != self.seed:
+            self.reset(sim)
+        now = self.tick = sim.tick
+        if self.job is None:
+            self.start_job(now)
+        for _ in range(self.rows):
+            try:
+                next(self.job)
+            except StopIteration as finished:
+                self.activate(finished.value, now)
+                break
+
+        bird_y, bird_movement, _, gap_center = sim.observe()
+        # Among safe choices, flap when falling below the next gap's center
+        flap = bird_y > gap_center and bird_movement > 0
+        step = now + 1
+        if step in self.safe:
+            flap_safe = any(low <= bird_y <= high for low, high in self.safe[step])
+            wait_safe = self.wait_safe(step, bird_y, bird_movement)
+            if flap_safe != wait_safe:
+                flap = flap_safe
+            elif not flap_safe:
+                self.doomed += 1
+
+        ms = (time.perf_counter() - start) * 1000
+        self.times.add(ms)
+        if ms > DECISION_BUDGET_MS:
+            self.over_budget += 1
+        return flap
+
+    def take_times(self):
+        times, self.times = self.times, Histogram()
+        return times
+
+    def wait_safe(self, step, y, velocity):
+        # Whether not flapping on `step` still reaches a safe flap point or the window's end
+        low, high, base, safe, end = self.low, self.high, self.base, self.safe, self.end
+        while True:
+            velocity += GRAVITY
+            y = int(y + velocity)
+            if y <= low[step - base] or y >= high[step - base]:
+                return False
+            step += 1
+            if step >= end:
+                return True
+            for lowest, highest in safe[step]:
+                if lowest <= y <= highest:
+                    return True
+
+    def start_job(self, now):
+        # The next window starts where the current decision will be once it is filled
+        start = now + 1 + (self.lookahead + 1) // self.rows + 2
+        cut = now + 1 - self.base
+        if cut > 0:
+            del self.low[:cut]
+            del self.high[:cut]
+            self.base += cut
+        self.job_start = start
+        self.job_end = start + self.lookahead
+        self.job = self.fill(start, self.job_end)
+
+    def activate(self, safe, now):
+        # Ticks the new window starts after are still covered by the old one
+        for step in range(now + 1, self.job_start):
+            if step in self.safe:
+                safe[step] = self.safe[step]
+        self.safe = safe
+        self.end = self.job_end
+        self.start_job(now)
+
+    def ghost_tick(self):
+        ghost, margin = self.ghost, self.margin
+        ghost.bird_y = BIRD_START_Y
+        ghost.bird_movement = 0
+        ghost.advance_tick()
+        low = max(CEILING_Y + BIRD_HALF_HEIGHT, ARC_MIN_Y)
+        high = FLOOR_Y - BIRD_HALF_HEIGHT
+        for pipe in ghost.pipes:
+            left = pipe.left
+            if left + PIPE_WIDTH <= BIRD_LEFT - margin:
+                continue
+            if left >= BIRD_RIGHT + margin:
+                break
+            # Same tests as FlappySimulation.check_collision(), as open bounds on bird_y
+            low = max(low, pipe.gap_y - PIPE_GAP + BIRD_HALF_HEIGHT - 1 + margin)
+            high = min(high, pipe.gap_y - BIRD_HALF_HEIGHT + 1 - margin)
+        self.low.append(low)
+        self.high.append(high)
+
+    def fill(self, start, end):
+        # Generator: runs the ghost up to `end`, then fills safe[start:end]
+        # backwards, yielding after each row; returns the filled dict
+        while self.base + len(self.low) < end:
+            for _ in range(GHOST_TICKS_PER_ROW):
+                self.ghost_tick()
+            yield
+        safe = {}
+        for flap in range(end - 1, start - 1, -1):
+            low, high, tick = self.low, self.high, flap - self.base
+            # Heights that are still alive after n ticks of the arc
+            lowest, highest = -FLOOR_Y, FLOOR_Y
+            reachable = []
+            n = 1
+            while True:
+                offset = ARC[n]
+                bound = low[tick] - offset + 1
+                if bound > lowest:
+                    lowest = bound
+                bound = high[tick] - offset - 1
+                if bound < highest:
+                    highest = bound
+                if lowest > highest:
+                    break
+                following = flap + n
+                if following == end:
+                    reachable.append((lowest, highest))
+                    break
+                covered = False
+                for a, b in safe[following]:
+                    a -= offset
+                    b -= offset
+                    if a < lowest:
+                        a = lowest
+                    if b > highest:
+                        b = highest
+                    if a <= b:
+                        reachable.append((a, b))
+                        if a == lowest and b == highest:
+                            covered = True
+                # Later flap points cannot add heights once the live range is covered
+                if covered:
+                    break
+                n += 1
+                tick += 1
+            safe[flap] = merge(reachable)
+            yield
+        return safe
+
+
+def merge(intervals):
+    if len(intervals) < 2:
+        return intervals
+    intervals.sort()
+    merged = [intervals[0]]
+    for low, high in intervals[1:]:
+        last_low, last_high = merged[-1]
+        if low <= last_high + 1:
+            if high > last_high:
+                merged[-1] = (last_low, high)
+        else:
+            merged.append((low, high))
+    return merged
+
+
+def current_rss_mb():
+    # Resident set size now; None where /proc is not available
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def peak_rss_mb():
+    # Peak resident set size; None where the resource module is missing (Windows)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak / 2 ** 20 if sys.platform == 'darwin' else peak / 1024
+
+
+class SoakLog:
+    # One JSON line per finished run: score, length and whether it reached
+    # maximum difficulty, the run's frame times and hitches, the planner's
+    # decision times and the process's memory. The file is line-buffered, so
+    # a crash keeps every finished run. close() prints a session summary.
+
+    def __init__(self, path, minutes=None, fps=FPS):
+        self.path = path
+        self.file = open(path, 'a', buffering=1)
+        self.hitch_ms = HITCH_FRAMES * 1000 / fps
+        self.started = time.perf_counter()
+        self.deadline = self.started + minutes * 60 if minutes else None
+        self.runs = 0
+        self.best = 0
+        self.late_game_runs = 0
+        self.total_hitches = 0
+        self.first_rss = None
+        self.last_rss = None
+        # The autopilot's counters when the previous run ended
+        self.over_budget = self.doomed = 0
+        self.new_run()
+
+    def new_run(self):
+        self.frames = Histogram()
+        self.intervals = Histogram()
+        self.hitches = 0
+
+    def frame(self, work_ms, interval_ms):
+        # work_ms: frame start to present; interval_ms: since the previous present
+        self.frames.add(work_ms)
+        if interval_ms is not None:
+            self.intervals.add(interval_ms)
+            if interval_ms >= self.hitch_ms:
+                self.hitches += 1
+
+    def run_ended(self, sim, autopilot=None, finished=True):
+        frames, intervals = self.frames.summary(), self.intervals.summary()
+        late_game = sim.current_pipe_speed >= MAX_PIPE_SPEED and sim.current_spawn_rate <= MIN_PIPE_SPAWN_RATE
+        rss, peak = current_rss_mb(), peak_rss_mb()
+        entry = {
+            'run': self.runs,
+            'elapsed_s': round(time.perf_counter() - self.started, 1),
+            'seed': sim.seed,
+            'score': sim.score,
+            'ticks': sim.tick,
+            'death_cause': sim.death_cause,
+            # False for the run still going when the session ended
+            'finished': finished,
+            'late_game': late_game,
+            'frames': frames['count'],
+            'frame_p50_ms': round(frames['p50_ms'], 3),
+            'frame_p99_ms': round(frames['p99_ms'], 3),
+            'frame_max_ms': round(frames['max_ms'], 3),
+            'interval_p99_ms': round(intervals['p99_ms'], 3),
+            'interval_max_ms': round(intervals['max_ms'], 3),
+            'hitches': self.hitches,
+            'rss_mb': None if rss is None else round(rss, 1),
+            'peak_rss_mb': None if peak is None else round(peak, 1),
+        }
+        if autopilot is not None:
+            planner = autopilot.take_times().summary()
+            entry.update({
+                'planner_p50_ms': round(planner['p50_ms'], 3),
+                'planner_p99_ms': round(planner['p99_ms'], 3),
+                'planner_max_ms': round(planner['max_ms'], 3),
+                'planner_over_budget': autopilot.over_budget - self.over_budget,
+                'planner_doomed': autopilot.doomed - self.doomed,
+            })
+            self.over_budget, self.doomed = autopilot.over_budget, autopilot.doomed
+        self.file.write(json.dumps(entry) + '\n')
+
+        self.runs += 1
+        self.best = max(self.best, sim.score)
+        self.late_game_runs += late_game
+        self.total_hitches += self.hitches
+        if rss is not None:
+            if self.first_rss is None:
+                self.first_rss = rss
+            self.last_rss = rss
+        self.new_run()
+
+    def expired(self):
+        return self.deadline is not None and time.perf_counter() >= self.deadline
+
+    def close(self):
+        self.file.close()
+        hours = (time.perf_counter() - self.started) / 3600
+        line = (f"Soak: {self.runs} runs in {hours:.2f} h, best score {self.best}, "
+                f"{self.late_game_runs} at maximum difficulty, {self.total_hitches} hitches")
+        if self.first_rss is not None:
+            line += f", RSS {self.first_rss:.1f} -> {self.last_rss:.1f} MB"
+        print(f'{line} (log: {self.path})')
@@ -0,0 +1,238 @@
+import numpy as np
+
+from config import (
+    GRAVITY, JUMP_STRENGTH, BASE_PIPE_SPEED, BASE_PIPE_SPAWN_RATE, PIPE_GAP,
+    PIPE_HEIGHTS, FLOOR_Y, CEILING_Y, PIPE_WIDTH, PIPE_SPAWN_X, BIRD_HEIGHT,
+    BIRD_START_X, BIRD_START_Y, DIFFICULTY_SCALE, MAX_PIPE_SPEED,
+    MIN_PIPE_SPAWN_RATE, SPAWN_RATE_STEP, POINTS_PER_PIPE, TICK_RATE,
+)
+from simulation import (
+    CAUSE_NONE, CAUSE_PIPE, CAUSE_FLOOR, CAUSE_CEILING, BIRD_LEFT, BIRD_RIGHT,
+    BIRD_HALF_HEIGHT, PIPE_SLOTS, ms_to_ticks, ticks_per_step,
+)
+
+# N games advanced in lockstep with the same rules as FlappySimulation.
+# Every per-game quantity is a NumPy array so one tick is a handful of array
+# operations no matter how many games are running.
+
+_PIPE_HEIGHTS = np.array(PIPE_HEIGHTS, dtype=np.int32)
+_DEFAULT_GAP_CENTER = PIPE_HEIGHTS[len(PIPE_HEIGHTS) // 2] - PIPE_GAP / 2
+
+
+class BatchFlappyEnv:
+    def __init__(self, num_envs, seed=None, tick_rate=TICK_RATE):
+        self.ticks_per_step = ticks_per_step(tick_rate)
+        self.num_envs = num_envs
+        self.tick_rate = tick_rate
+        self.rng = np.random.default_rng(seed)
+        n, k = num_envs, PIPE_SLOTS
+
+        self.bird_y = np.zeros(n, dtype=np.float64)
+        self.bird_movement = np.zeros(n, dtype=np.float64)
+        self.pipe_x = np.zeros((n, k), dtype=np.float64)
+        self.pipe_gap = np.zeros((n, k), dtype=np.int32)
+        self.pipe_alive = np.zeros((n, k), dtype=bool)
+        self.pipe_passed = np.zeros((n, k), dtype=bool)
+        self.pipes_spawned = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.int32)
+        self.ticks = np.zeros(n, dtype=np.int32)
+        self.pipe_speed = np.zeros(n, dtype=np.float64)
+        self.spawn_rate = np.zeros(n, dtype=np.int32)
+        self.spawn_interval = np.zeros(n, dtype=np.int32)
+        self.spawn_timer = np.zeros(n, dtype=np.int32)
+        self.death_cause = np.zeros(n, dtype=np.int8)
+        self.done = np.zeros(n, dtype=bool)
+
+        self._rows = np.arange(n)
+        self.reset()
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.rng = np.random.default_rng(seed)
+        self._reset_envs(np.ones(self.num_envs, dtype=bool))
+        return self.observe()
+
+    def reset_games(self, mask):
+        # Fresh episodes for the selected games only (bool mask or indices)
+        self._reset_envs(mask)
+
+    def _reset_envs(self, mask):
+        self.bird_y[mask] = BIRD_START_Y
+        self.bird_movement[mask] = 0
+        self.pipe_alive[mask] = False
+        self.pipe_passed[mask] = False
+        self.pipes_spawned[mask] = 0
+        self.score[mask] = 0
+        self.ticks[mask] = 0
+        self.pipe_speed[mask] = BASE_PIPE_SPEED
+        self.spawn_rate[mask] = BASE_PIPE_SPAWN_RATE
+        self.spawn_interval[mask] = ms_to_ticks(BASE_PIPE_SPAWN_RATE)
+        self.spawn_timer[mask] = 0
+        self.death_cause[mask] = CAUSE_NONE
+        self.done[mask] = False
+
+    def observe(self):
+        pending = self.pipe_alive & ~self.pipe_passed
+        # Unscored pipes never overtake each other, so the leftmost one is next
+        nearest = np.argmin(np.where(pending, self.pipe_x, np.inf), axis=1)
+        has_pipe = pending[self._rows, nearest]
+
+        obs = np.empty((self.num_envs, 4), dtype=np.float64)
+        obs[:, 0] = self.bird_y
+        obs[:, 1] = self.bird_movement
+        obs[:, 2] = np.where(has_pipe, self.pipe_x[self._rows, nearest],
+                             PIPE_SPAWN_X) - BIRD_START_X
+        obs[:, 3] = np.where(has_pipe, self.pipe_gap[self._rows, nearest] - PIPE_GAP / 2,
+                             _DEFAULT_GAP_CENTER)
+        return obs
+
+    def step(self, actions):
+        """Advance every game one step of ticks_per_step ticks, flapping at its
+        start where actions is true. Finished games are reset in place.
+
+        Returns (obs, reward, done, info). For games that finished this tick,
+        info['episode_score'], info['episode_length'] and info['death_cause']
+        hold the final values; obs already belongs to the fresh episode.
+        """
+        actions = np.asarray(actions, dtype=bool)
+        self.bird_movement = np.where(actions, float(JUMP_STRENGTH), self.bird_movement)
+
+        if self.ticks_per_step == 1:
+            reward, cause = self._advance_tick()
+        else:
+            reward, cause = self._advance_step(self.ticks_per_step)
+        self.death_cause = cause
+        self.done = cause != CAUSE_NONE
+        self.ticks += 1
+
+        info = {
+            'episode_score': self.score.copy(),
+            'episode_length': self.ticks.copy(),
+            'death_cause': self.death_cause.copy(),
+        }
+        done = self.done.copy()
+        if done.any():
+            self._reset_envs(done)
+        return self.observe(), reward, done, info
+
+    def _advance_tick(self):
+        # One tick for every game
+        rows = self._rows
+        self.spawn_timer += 1
+        spawning = self.spawn_timer >= self.spawn_interval
+        if spawning.any():
+            idx = rows[spawning]
+            slot = self.pipes_spawned[idx] % PIPE_SLOTS
+            self.pipe_x[idx, slot] = PIPE_SPAWN_X
+            self.pipe_gap[idx, slot] = self.rng.choice(_PIPE_HEIGHTS, size=idx.size)
+            self.pipe_alive[idx, slot] = True
+            self.pipe_passed[idx, slot] = False
+            self.pipes_spawned[idx] += 1
+            self.spawn_timer[idx] = 0
+
+        self.bird_movement += GRAVITY
+        self.bird_y = np.trunc(self.bird_y + self.bird_movement)
+        self.pipe_x = np.round(self.pipe_x - self.pipe_speed[:, None])
+
+        pipe_left = self.pipe_x - PIPE_WIDTH // 2
+        self.pipe_alive &= pipe_left + PIPE_WIDTH > 0
+
+        # colliderect between the bird and both rects of every pipe pair
+        bird_top = (self.bird_y - BIRD_HALF_HEIGHT)[:, None]
+        bird_bottom = bird_top + BIRD_HEIGHT
+        overlap_x = self.pipe_alive & (pipe_left < BIRD_RIGHT) & (pipe_left + PIPE_WIDTH > BIRD_LEFT)
+        hit_pipe = (overlap_x & ((bird_top < self.pipe_gap - PIPE_GAP)
+                                 | (bird_bottom > self.pipe_gap))).any(axis=1)
+        bird_top = bird_top[:, 0]
+        cause = np.where(hit_pipe, CAUSE_PIPE,
+                         np.where(bird_top <= CEILING_Y, CAUSE_CEILING,
+                                  np.where(bird_top + BIRD_HEIGHT >= FLOOR_Y, CAUSE_FLOOR,
+                                           CAUSE_NONE)))
+        newly_passed = self.pipe_alive & ~self.pipe_passed & (self.pipe_x < BIRD_START_X)
+        self.pipe_passed |= newly_passed
+        reward = newly_passed.sum(axis=1, dtype=np.int32) * POINTS_PER_PIPE
+        self.score += reward
+        self._update_difficulty(reward > 0)
+        return reward, cause.astype(np.int8)
+
+    def _advance_step(self, ticks):
+        # Several ticks for every game, as FlappySimulation.advance_step():
+        # the bird's path tick by tick, the pipes moved once, and one swept
+        # test of the ticks each pipe overlaps the bird against the bird's
+        # heights on those ticks. Games score up to the tick they died on.
+        rows = self._rows
+        first = np.ones(self.pipe_x.shape, dtype=np.int32)
+        spawn_at = self.spawn_interval - self.spawn_timer
+        self.spawn_timer += ticks
+        spawning = spawn_at <= ticks
+        if spawning.any():
+            idx = rows[spawning]
+            slot = self.pipes_spawned[idx] % PIPE_SLOTS
+            # Placed where it would have been a tick before the step, had it
+            # existed; it is only there from its spawn tick on
+            self.pipe_x[idx, slot] = PIPE_SPAWN_X + self.pipe_speed[idx] * (spawn_at[idx] - 1)
+            self.pipe_gap[idx, slot] = self.rng.choice(_PIPE_HEIGHTS, size=idx.size)
+            self.pipe_alive[idx, slot] = True
+            self.pipe_passed[idx, slot] = False
+            self.pipes_spawned[idx] += 1
+            self.spawn_timer[idx] -= self.spawn_interval[idx]
+            first[idx, slot] = spawn_at[idx]
+
+        heights = np.empty((ticks, self.num_envs))
+        for tick in range(ticks):
+            self.bird_movement += GRAVITY
+            self.bird_y = np.trunc(self.bird_y + self.bird_movement)
+            heights[tick] = self.bird_y
+
+        # Ticks low..high on which each pipe overlaps the bird horizontally
+        speed = self.pipe_speed[:, None]
+        start_left = self.pipe_x - PIPE_WIDTH // 2
+        low = np.maximum(first, np.floor((start_left - BIRD_RIGHT) / speed).astype(np.int32) + 1)
+        high = np.minimum(ticks, np.ceil((start_left + PIPE_WIDTH - BIRD_LEFT) / speed).astype(np.int32) - 1)
+        env, slot = np.nonzero(self.pipe_alive & (low <= high))
+        low, high, gap = low[env, slot], high[env, slot], self.pipe_gap[env, slot]
+
+        # Walked backwards so each game keeps its earliest hit
+        never = ticks + 1
+        pipe_tick = np.full(env.size, never, dtype=np.int32)
+        bound_tick = np.full(self.num_envs, never, dtype=np.int32)
+        bound_cause = np.full(self.num_envs, CAUSE_NONE, dtype=np.int8)
+        for tick in range(ticks, 0, -1):
+            bird_top = heights[tick - 1] - BIRD_HALF_HEIGHT
+            top = bird_top[env]
+            pipe_tick[(low <= tick) & (tick <= high)
+                      & ((top < gap - PIPE_GAP) | (top + BIRD_HEIGHT > gap))] = tick
+            ceiling = bird_top <= CEILING_Y
+            bound = ceiling | (bird_top + BIRD_HEIGHT >= FLOOR_Y)
+            bound_tick[bound] = tick
+            bound_cause[bound] = np.where(ceiling[bound], CAUSE_CEILING, CAUSE_FLOOR)
+        hit_tick = np.full(self.num_envs, never, dtype=np.int32)
+        np.minimum.at(hit_tick, env, pipe_tick)
+        # A pipe is tested before the ceiling and floor on the same tick
+        cause = np.where(hit_tick <= bound_tick,
+                         np.where(hit_tick < never, CAUSE_PIPE, CAUSE_NONE), bound_cause).astype(np.int8)
+        last = np.minimum(np.minimum(hit_tick, bound_tick), ticks)
+
+        newly_passed = (self.pipe_alive & ~self.pipe_passed
+                        & (self.pipe_x - speed * last[:, None] < BIRD_START_X))
+        self.pipe_x = np.round(self.pipe_x - speed * ticks)
+        self.pipe_alive &= self.pipe_x - PIPE_WIDTH // 2 + PIPE_WIDTH > 0
+        self.pipe_passed |= newly_passed
+        reward = newly_passed.sum(axis=1, dtype=np.int32) * POINTS_PER_PIPE
+        self.score += reward
+        self._update_difficulty(reward > 0)
+        return reward, cause
+
+    def _update_difficulty(self, scored):
+        if not scored.any():
+            return
+        new_speed = np.minimum(MAX_PIPE_SPEED, BASE_PIPE_SPEED + self.score * DIFFICULTY_SCALE)
+        new_rate = np.maximum(MIN_PIPE_SPAWN_RATE,
+                              BASE_PIPE_SPAWN_RATE - self.score * SPAWN_RATE_STEP).astype(np.int32)
+        self.pipe_speed = np.where(scored, new_speed, self.pipe_speed)
+        # Changing the rate restarts the spawn countdown, as in FlappySimulation
+        restart = scored & (np.abs(new_rate - self.spawn_rate) > 1)
+        self.spawn_rate[restart] = new_rate[restart]
+        self.spawn_interval[restart] = np.maximum(
+            1, np.round(new_rate[restart] * TICK_RATE / 1000)).astype(np.int32)
+        self.spawn_timer[restart] = 0
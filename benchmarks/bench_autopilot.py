@@ -0,0 +1,66 @@
+import time
+
+from common import Table, parser
+from autopilot import Autopilot, DECISION_BUDGET_MS
+from config import TICK_RATE, MAX_PIPE_SPEED, MIN_PIPE_SPAWN_RATE
+from rollout import flap_below_gap
+from simulation import FlappySimulation, POINTS_PER_PIPE
+
+# The autopilot on the headless simulation: pipes passed per game, how many
+# games reach maximum difficulty, and the planner's decision time per tick
+# against its 1 ms budget. The flap-below-gap rule used by the rollouts is
+# played on the same seeds for comparison.
+
+
+def at_max_difficulty(sim):
+    return sim.current_pipe_speed >= MAX_PIPE_SPEED and sim.current_spawn_rate <= MIN_PIPE_SPAWN_RATE
+
+
+def play(seed, max_ticks, autopilot=None):
+    sim = FlappySimulation(seed)
+    obs = sim.observe()
+    while not sim.done and sim.tick < max_ticks:
+        flap = autopilot.decide(sim) if autopilot else flap_below_gap(obs)
+        obs, _, _, _ = sim.step(flap)
+    return sim.score // POINTS_PER_PIPE, sim.tick, sim.death_cause, at_max_difficulty(sim)
+
+
+TABLE = Table('policy:<12', 'pipes p50:>9', 'min:>8', 'max:>8', 'max difficulty:>14', 'survived:>11')
+
+
+def report(name, results):
+    pipes = sorted(result[0] for result in results)
+    survived = sum(result[2] is None for result in results)
+    late = sum(result[3] for result in results)
+    TABLE.row(name, pipes[len(pipes) // 2], pipes[0], pipes[-1],
+              f'{late}/{len(results)}', f'{survived}/{len(results)}')
+
+
+def main():
+    arguments = parser('Autopilot scores and decision time')
+    arguments.add_argument('--games', type=int, default=10)
+    arguments.add_argument('--minutes', type=float, default=5.0, help='game time cap per game')
+    args = arguments.parse_args()
+    max_ticks = int(args.minutes * 60 * TICK_RATE)
+
+    autopilot = Autopilot()
+    start = time.perf_counter()
+    planned = [play(args.seed + game, max_ticks, autopilot) for game in range(args.games)]
+    elapsed = time.perf_counter() - start
+    baseline = [play(args.seed + game, max_ticks) for game in range(args.games)]
+
+    TABLE.print_header()
+    report('autopilot', planned)
+    report('below gap', baseline)
+
+    stats = autopilot.times.summary()
+    ticks = sum(result[1] for result in planned)
+    print(f"\ndecision time: mean {stats['mean_ms']:.3f}  p50 {stats['p50_ms']:.2f}  p99 {stats['p99_ms']:.2f}  "
+          f"max {stats['max_ms']:.2f} ms; {autopilot.over_budget} of {stats['count']} over "
+          f"{DECISION_BUDGET_MS:g} ms, {autopilot.doomed} with no safe move")
+    print(f'{ticks / elapsed:,.0f} planned ticks/s ({ticks / TICK_RATE / 60:.0f} game minutes '
+          f'in {elapsed:.1f} s)')
+
+
+if __name__ == '__main__':
+    main()
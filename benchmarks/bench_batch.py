@@ -0,0 +1,59 @@
+import time
+
+from common import Table, parser
+from batch_env import BatchFlappyEnv
+from simulation import FlappySimulation
+
+# Steps/s of the NumPy batch environment against a Python loop over
+# FlappySimulation instances. Both play the same "flap when below the gap"
+# policy so the pipe load is comparable.
+
+
+def bench_batch(num_envs, ticks, seed):
+    env = BatchFlappyEnv(num_envs, seed=seed)
+    obs = env.observe()
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        obs, _, done, _ = env.step(obs[:, 0] > obs[:, 3] + 40)
+        episodes += int(done.sum())
+    elapsed = time.perf_counter() - start
+    return num_envs * ticks / elapsed, episodes
+
+
+def bench_scalar(num_envs, ticks, seed):
+    sims = [FlappySimulation(seed + i) for i in range(num_envs)]
+    observations = [sim.observe() for sim in sims]
+    episodes = 0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        for i, sim in enumerate(sims):
+            obs = observations[i]
+            obs, _, done, _ = sim.step(obs[0] > obs[3] + 40)
+            if done:
+                obs = sim.reset()
+                episodes += 1
+            observations[i] = obs
+    elapsed = time.perf_counter() - start
+    return num_envs * ticks / elapsed, episodes
+
+
+def main():
+    arguments = parser('Batch environment throughput')
+    arguments.add_argument('--sizes', type=int, nargs='+', default=[1, 64, 4096])
+    arguments.add_argument('--env-steps', type=int, default=2_000_000,
+                           help='approximate env-steps per measurement')
+    args = arguments.parse_args()
+
+    table = Table('N:>6', 'batch steps/s:>15,.0f', 'loop steps/s:>15,.0f', 'speedup:>8')
+    table.print_header()
+    for n in args.sizes:
+        ticks = max(100, args.env_steps // n)
+        batch_rate, _ = bench_batch(n, ticks, args.seed)
+        # The Python loop is slow enough that a tenth of the work is plenty
+        loop_rate, _ = bench_scalar(n, max(10, ticks // 10), args.seed)
+        table.row(n, batch_rate, loop_rate, f'{batch_rate / loop_rate:.1f}x')
+
+
+if __name__ == '__main__':
+    main()
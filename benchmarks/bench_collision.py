@@ -0,0 +1,61 @@
+import os
+import time
+
+from common import ROOT, Table, parser
+
+os.chdir(ROOT)
+
+from collision import PixelCollider
+from rollout import flap_below_gap
+from simulation import FlappySimulation, DEATH_PIPE
+
+# Cost of one check_collision() call with the rect test and with the pixel
+# narrow phase, measured on the same game states, plus how often the rect
+# test and the drawn pixels disagree.
+
+
+def main():
+    arguments = parser('Rect vs pixel-mask collision cost')
+    arguments.add_argument('--ticks', type=int, default=200_000)
+    args = arguments.parse_args()
+
+    collider = PixelCollider.from_assets()
+    sim = FlappySimulation(args.seed)
+    obs = sim.observe()
+    rect_time = pixel_time = 0.0
+    rect_hits = pixel_hits = rect_only = pixel_only = 0
+    clock = time.perf_counter
+    for _ in range(args.ticks):
+        obs, _, done, _ = sim.step(flap_below_gap(obs))
+
+        sim.collider = None
+        start = clock()
+        rect = sim.check_collision()
+        rect_time += clock() - start
+
+        sim.collider = collider
+        start = clock()
+        pixel = sim.check_collision()
+        pixel_time += clock() - start
+        sim.collider = None
+
+        rect_hits += rect == DEATH_PIPE
+        pixel_hits += pixel == DEATH_PIPE
+        rect_only += rect == DEATH_PIPE and pixel != DEATH_PIPE
+        pixel_only += pixel == DEATH_PIPE and rect != DEATH_PIPE
+        if done:
+            obs = sim.reset()
+
+    ticks = args.ticks
+    table = Table('test:>6', 'us/check:>9.3f', 'pipe hits:>10')
+    table.print_header()
+    table.row('rect', rect_time / ticks * 1e6, rect_hits)
+    table.row('pixel', pixel_time / ticks * 1e6, pixel_hits)
+    print(f'pixel / rect cost: {pixel_time / rect_time:.2f}x')
+    print(f'narrow phase ran on {collider.narrow_checks / ticks:.2%} of ticks')
+    print(f'rect hits not confirmed by pixels (transparent corners): {rect_only} of {rect_hits}')
+    print(f'pixel hits outside the unrotated rect (rotation): {pixel_only} of {pixel_hits}')
+
+
+if __name__ == '__main__':
+    main()
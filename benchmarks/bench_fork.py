@@ -0,0 +1,105 @@
+import copy
+import random
+import sys
+import time
+
+from common import Table, parser, per_call
+from rollout import flap_below_gap
+from simulation import FlappySimulation
+
+# Branching the simulation for lookahead search. First a check: from states
+# along many games, a restored scratch simulation and a fork must play a
+# random continuation exactly like the original, and restoring must undo
+# it. Then the cost of snapshot(), restore() and fork() against deepcopy,
+# and branches per second for a depth-limited flap/no-flap search.
+
+
+def signature(sim):
+    return (sim.tick, sim.bird_y, sim.prev_bird_y, sim.bird_movement, sim.bird_rotation, sim.bird_index,
+            sim.score, sim.done, sim.death_cause, sim.rng.getstate(), sim.spawn_timer,
+            tuple((p.centerx, p.prev_centerx, p.gap_y, p.slot) for p in sim.pipes))
+
+
+def play(sim, actions):
+    for flap in actions:
+        if sim.done:
+            break
+        sim.step(flap)
+    return signature(sim)
+
+
+def check(games, seed, depth):
+    rng = random.Random(seed)
+    scratch = FlappySimulation()
+    mismatches = checks = 0
+    for game in range(games):
+        sim = FlappySimulation(seed + game)
+        obs = sim.observe()
+        while not sim.done:
+            if rng.random() < 0.05:
+                state = sim.snapshot()
+                actions = [rng.random() < 0.1 for _ in range(depth)]
+                before = signature(sim)
+                fork = sim.fork()
+                scratch.restore(state)
+                expected = play(sim, actions)
+                mismatches += play(fork, actions) != expected
+                mismatches += play(scratch, actions) != expected
+                sim.restore(state)
+                mismatches += signature(sim) != before
+                checks += 1
+            obs, _, _, _ = sim.step(flap_below_gap(obs))
+    return checks, mismatches
+
+
+def search(sim, scratch, depth):
+    # Exhaustive flap/no-flap tree over `depth` steps, restoring into one
+    # scratch simulation; returns the number of branches expanded
+    branches = 0
+    stack = [(sim.snapshot(), 0)]
+    while stack:
+        state, level = stack.pop()
+        for flap in (False, True):
+            scratch.restore(state)
+            scratch.step(flap)
+            branches += 1
+            if not scratch.done and level + 1 < depth:
+                stack.append((scratch.snapshot(), level + 1))
+    return branches
+
+
+def main():
+    arguments = parser('Snapshot/restore/fork correctness and cost')
+    arguments.add_argument('--games', type=int, default=200)
+    arguments.add_argument('--depth', type=int, default=30, help='steps per checked continuation')
+    arguments.add_argument('--search-depth', type=int, default=10)
+    args = arguments.parse_args()
+
+    checks, mismatches = check(args.games, args.seed, args.depth)
+    print(f'{checks} branch points, {mismatches} mismatches')
+
+    sim = FlappySimulation(args.seed)
+    obs = sim.observe()
+    while len(sim.pipes) < 2:
+        obs, _, _, _ = sim.step(flap_below_gap(obs))
+    state = sim.snapshot()
+    print(f'\n{len(sim.pipes)} live pipes')
+    table = Table('operation:<10', 'us:>8.2f')
+    table.print_header()
+    table.row('snapshot', per_call(sim.snapshot, 100_000))
+    table.row('restore', per_call(lambda: sim.restore(state), 100_000))
+    table.row('fork', per_call(sim.fork, 20_000))
+    table.row('deepcopy', per_call(lambda: copy.deepcopy(sim), 1_000))
+
+    scratch = sim.fork()
+    start = time.perf_counter()
+    branches = search(sim, scratch, args.search_depth)
+    elapsed = time.perf_counter() - start
+    print(f'\nsearch depth {args.search_depth}: {branches:,} branches, {branches / elapsed:,.0f} branches/s '
+          f'(restore + step)')
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == '__main__':
+    main()
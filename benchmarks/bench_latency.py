@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from common import HEADLESS_ENV, ROOT, Table, parser, percentile
+from pacing import PACING_MODES
+
+# Input-to-present latency for every pacing mode. Each mode runs the real
+# game loop (game.run()) headless in its own process. A second thread plays
+# by posting SPACE key events at random moments, each carrying the time it
+# was posted, so the measured latency includes the time an event sits in
+# the queue before the loop reads it. Also reports the present cadence.
+
+
+def play(mode, seconds, seed):
+    import pygame
+    import game
+
+    os.chdir(ROOT)
+    g = game.FlappyBirdGame(seed, pacing=mode, score_file=None)
+    g.record_run = lambda: None
+    presents = []
+    present = g.canvas.present
+
+    def timed_present():
+        present()
+        presents.append(time.perf_counter())
+    g.canvas.present = timed_present
+
+    def player():
+        rng = random.Random(seed)
+        end = time.perf_counter() + seconds
+        while time.perf_counter() < end:
+            # Random polling so inputs land anywhere in the frame
+            time.sleep(rng.uniform(0.002, 0.02))
+            bird_y, bird_movement, _, gap_center = g.sim.observe()
+            if g.game_state != 'game' or (not g.flap_queued and bird_y > gap_center and bird_movement > 0):
+                pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE,
+                                                     stamp=time.perf_counter()))
+                time.sleep(0.05)
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    threading.Thread(target=player, daemon=True).start()
+    try:
+        g.run()
+    except SystemExit:
+        pass
+    intervals = sorted((b - a) * 1000 for a, b in zip(presents, presents[1:]))
+    return {
+        'latency': g.latency.summary(),
+        'fps': len(presents) / (presents[-1] - presents[0]) if len(presents) > 1 else 0.0,
+        'interval_p50_ms': percentile(intervals, 0.5),
+        'interval_p99_ms': percentile(intervals, 0.99),
+    }
+
+
+def main():
+    arguments = parser('Input-to-present latency per pacing mode')
+    arguments.add_argument('modes', nargs='*', default=list(PACING_MODES))
+    arguments.add_argument('--seconds', type=float, default=30)
+    arguments.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = arguments.parse_args()
+    unknown = set(args.modes) - set(PACING_MODES)
+    if unknown:
+        arguments.error(f"unknown pacing mode(s): {', '.join(sorted(unknown))}")
+
+    if args.child:
+        print(json.dumps(play(args.modes[0], args.seconds, args.seed)))
+        return
+
+    table = Table('pacing:>9', 'inputs:>7', 'mean:>6.2f', 'p50:>6.2f', 'p95:>6.2f', 'p99:>6.2f', 'max:>6.2f',
+                  'fps:>7.0f', 'frame p50/p99 ms:>17')
+    table.print_header()
+    for mode in args.modes:
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), mode, '--child',
+                                 '--seconds', str(args.seconds), '--seed', str(args.seed)],
+                                cwd=ROOT, env=HEADLESS_ENV, capture_output=True, text=True, check=True)
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        latency = stats['latency']
+        table.row(mode, latency['count'], latency['mean_ms'], latency['p50_ms'], latency['p95_ms'],
+                  latency['p99_ms'], latency['max_ms'], stats['fps'],
+                  f"{stats['interval_p50_ms']:.2f}/{stats['interval_p99_ms']:.2f}")
+
+
+if __name__ == '__main__':
+    main()
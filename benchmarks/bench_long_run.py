@@ -0,0 +1,41 @@
+import time
+
+from common import Table, parser
+from config import TICK_RATE
+from simulation import FlappySimulation
+
+# Simulates an hour of continuous play and reports the cost per tick in
+# consecutive windows. With bounded pipe storage the numbers stay flat; if
+# pipes were never released they would climb with every window.
+
+
+def main():
+    arguments = parser('Per-tick cost over a long run')
+    arguments.add_argument('--minutes', type=float, default=60)
+    arguments.add_argument('--windows', type=int, default=12)
+    args = arguments.parse_args()
+
+    total_ticks = int(args.minutes * 60 * TICK_RATE)
+    window = max(1, total_ticks // args.windows)
+    sim = FlappySimulation(args.seed)
+    obs = sim.observe()
+
+    table = Table('minute:>7.1f', 'us/tick:>8.2f', 'live pipes:>11', 'spawned:>8')
+    table.print_header()
+    first = None
+    for w in range(args.windows):
+        start = time.perf_counter()
+        for _ in range(window):
+            obs, _, done, _ = sim.step(obs[0] > obs[3] + 40 and obs[1] >= 0)
+            if done:
+                # Keep flying through deaths so an hour of pipes goes by
+                sim.done = False
+        cost = (time.perf_counter() - start) / window * 1e6
+        first = first or cost
+        minute = (w + 1) * window / TICK_RATE / 60
+        table.row(minute, cost, len(sim.pipes), sim.pipes.spawned)
+    print(f'last/first window cost: {cost / first:.2f}x')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+import math
+import random
+import time
+
+from common import Table, parser, use_dummy_drivers
+
+use_dummy_drivers()
+import pygame
+
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, FPS, SCORE_PARTICLE_COLOR
+from particles import ParticlePool
+
+# Update + draw cost per frame with a steady population of live particles,
+# for the ParticlePool and for the one-object-and-surface-per-particle
+# approach it replaced (reproduced below for comparison).
+
+EMIT = dict(angle=(0, math.pi * 2), speed=(2, 5), size=(4, 7), lifetime=(15, 25))
+
+
+class ObjectParticle:
+    def __init__(self, x, y, color, size, velocity, lifetime):
+        self.x, self.y, self.color, self.size = x, y, color, size
+        self.velocity, self.lifetime, self.age = velocity, lifetime, 0
+
+    def update(self, dt):
+        self.x += self.velocity[0] * dt
+        self.y += self.velocity[1] * dt
+        self.age += dt
+        self.size *= 0.95
+        return self.age < self.lifetime
+
+    def draw(self, screen):
+        if self.size > 0:
+            alpha = int(255 * (1 - self.age / self.lifetime))
+            surf = pygame.Surface((int(self.size * 2), int(self.size * 2)), pygame.SRCALPHA)
+            pygame.draw.circle(surf, (*self.color, alpha), (int(self.size), int(self.size)), int(self.size))
+            screen.blit(surf, (int(self.x - self.size), int(self.y - self.size)))
+
+
+def run_objects(screen, target, frames, rng):
+    particles = []
+    start = time.perf_counter()
+    for _ in range(frames):
+        while len(particles) < target:
+            angle, speed = rng.uniform(*EMIT['angle']), rng.uniform(*EMIT['speed'])
+            particles.append(ObjectParticle(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT),
+                                            SCORE_PARTICLE_COLOR, rng.uniform(*EMIT['size']),
+                                            (math.cos(angle) * speed, math.sin(angle) * speed),
+                                            rng.uniform(*EMIT['lifetime'])))
+        particles = [p for p in particles if p.update(1)]
+        for p in particles:
+            p.draw(screen)
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def run_pool(screen, target, frames, rng):
+    pool = ParticlePool([SCORE_PARTICLE_COLOR], capacity=max(target * 2, 1024), seed=0)
+    start = time.perf_counter()
+    for _ in range(frames):
+        # Emit in bursts of 8 at random spots, like repeated score bursts
+        while len(pool) < target:
+            pool.emit(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT),
+                      SCORE_PARTICLE_COLOR, count=8, **EMIT)
+        pool.update(1)
+        pool.draw(screen)
+    return (time.perf_counter() - start) / frames * 1000
+
+
+def main():
+    arguments = parser('Particle update + draw cost', seed=None)
+    arguments.add_argument('--counts', type=int, nargs='+', default=[300, 1000, 5000])
+    arguments.add_argument('--frames', type=int, default=300)
+    args = arguments.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    budget = 1000 / FPS
+    print(f'frame budget {budget:.1f} ms')
+    table = Table('live:>6', 'objects ms:>11.2f', 'pool ms:>8.2f')
+    table.print_header()
+    for count in args.counts:
+        objects_ms = run_objects(screen, count, args.frames, random.Random(0))
+        pool_ms = run_pool(screen, count, args.frames, random.Random(0))
+        table.row(count, objects_ms, pool_ms)
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
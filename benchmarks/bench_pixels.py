@@ -0,0 +1,96 @@
+import multiprocessing
+import os
+import time
+
+from common import ROOT, Table, parser, use_dummy_drivers
+
+os.chdir(ROOT)
+use_dummy_drivers()
+
+import numpy as np
+import pygame
+
+from observation import PixelFlappyEnv, PixelObserver, OBS_SIZE
+
+# Cost of one pixel observation: the old way (screen.copy(), array3d, then
+# NumPy resizing and grayscale) against PixelObserver in each of its modes,
+# all on the same drawn frame. Then whole PixelFlappyEnv steps (simulate,
+# draw, observe) per second in one process and across a worker pool; the
+# frame's blits dominate a step, so throughput scales with processes.
+
+
+def copy_and_convert(screen, size=OBS_SIZE):
+    frame = pygame.surfarray.array3d(screen.copy())
+    width, height = size
+    rows = np.arange(height) * frame.shape[1] // height
+    columns = np.arange(width) * frame.shape[0] // width
+    small = frame[columns][:, rows].astype(np.float32)
+    return (small @ np.array([0.299, 0.587, 0.114], dtype=np.float32)).T.astype(np.uint8)
+
+
+def time_per_call(function, seconds):
+    calls = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        function()
+        calls += 1
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def play(args):
+    seed, steps = args
+    env = PixelFlappyEnv(seed)
+    rng = np.random.default_rng(seed)
+    env.reset()
+    start = time.perf_counter()
+    for _ in range(steps):
+        _, _, done, _ = env.step(rng.random() < 0.1)
+        if done:
+            env.reset()
+    elapsed = time.perf_counter() - start
+    env.close()
+    return steps, elapsed
+
+
+def main():
+    arguments = parser('Pixel observation cost and env throughput', seed=None)
+    arguments.add_argument('--seconds', type=float, default=2.0, help='per observation method')
+    arguments.add_argument('--steps', type=int, default=5000, help='env steps per worker')
+    arguments.add_argument('--workers', type=int, default=os.cpu_count())
+    args = arguments.parse_args()
+
+    env = PixelFlappyEnv(seed=0)
+    env.reset()
+    for _ in range(30):
+        env.step(False)
+    screen = env.game.screen
+    methods = [('screen.copy + numpy', lambda: copy_and_convert(screen))]
+    for grayscale in (True, False):
+        for smooth in (False, True):
+            observer = PixelObserver(screen, grayscale=grayscale, smooth=smooth)
+            name = f"observer {'gray' if grayscale else 'rgb'} {'smooth' if smooth else 'nearest'}"
+            methods.append((name, observer.observe))
+    table = Table('observation:<24', 'us/obs:>8.1f', 'obs/s:>9,.0f')
+    table.print_header()
+    for name, method in methods:
+        cost = time_per_call(method, args.seconds)
+        table.row(name, cost, 1e6 / cost)
+    env.close()
+
+    print()
+    table = Table('processes:>9', 'env steps/s:>12,.0f')
+    table.print_header()
+    steps, elapsed = play((0, args.steps))
+    table.row(1, steps / elapsed)
+    if args.workers > 1:
+        with multiprocessing.Pool(args.workers) as pool:
+            start = time.perf_counter()
+            results = pool.map(play, [(seed, args.steps) for seed in range(args.workers)])
+            elapsed = time.perf_counter() - start
+            pool.close()
+            pool.join()
+        table.row(args.workers, sum(steps for steps, _ in results) / elapsed)
+
+
+if __name__ == '__main__':
+    main()
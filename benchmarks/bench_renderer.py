@@ -0,0 +1,52 @@
+import os
+import time
+
+from common import ROOT, Table, parser, use_dummy_drivers
+
+use_dummy_drivers()
+os.chdir(ROOT)
+
+import pygame
+
+import game
+from renderer import RENDERERS, SCREEN_AREA
+
+# Plays the same scripted session with each renderer and reports the time
+# spent drawing + presenting and the share of the window pushed per frame.
+
+
+def play(mode, frames, seed):
+    g = game.FlappyBirdGame(seed, renderer=mode, score_file=None)
+    g.record_run = lambda: None
+    draw_time = 0.0
+    for frame in range(frames):
+        obs = g.sim.observe()
+        if g.game_state != 'game':
+            if frame % 120 == 0:
+                g.handle_jump(measured=False)
+        elif obs[0] > obs[3] + 40 and obs[1] >= 0:
+            g.handle_jump(measured=False)
+        g.update_tick()
+        start = time.perf_counter()
+        g.draw_frame()
+        g.canvas.present()
+        draw_time += time.perf_counter() - start
+    canvas = g.canvas
+    return draw_time / frames * 1000, canvas.pixels_pushed / canvas.frames / SCREEN_AREA
+
+
+def main():
+    arguments = parser('Full-frame vs dirty-rect rendering', seed=1)
+    arguments.add_argument('--frames', type=int, default=3000)
+    args = arguments.parse_args()
+
+    table = Table('renderer:>9', 'draw+present ms:>16.3f', 'window pushed:>14.1%')
+    table.print_header()
+    for mode in sorted(RENDERERS, reverse=True):
+        ms, share = play(mode, args.frames, args.seed)
+        table.row(mode, ms, share)
+        pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
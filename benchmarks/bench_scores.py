@@ -0,0 +1,111 @@
+import os
+import random
+import signal
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+from common import ROOT, Table, parser
+from scores import ScoreStore
+
+# The score store at growing sizes: what record() costs the caller (the
+# render thread at game over), how long the writer takes to commit, and
+# what top-N and per-day best queries cost. Then a crash test: a process
+# recording runs is killed with SIGKILL and the store must still pass
+# SQLite's integrity check with every committed run intact.
+
+SIZES = (1_000, 100_000, 1_000_000)
+DAY = 24 * 60 * 60
+
+CRASH_WRITER = '''
+import sys, time
+sys.path.insert(0, sys.argv[2])
+from scores import ScoreStore
+store = ScoreStore(sys.argv[1], legacy_file=None)
+score = 0
+while True:
+    store.record(score % 500, ticks=score, seed=score)
+    score += 1
+    if score % 100 == 0:
+        time.sleep(0.001)
+'''
+
+
+def fill(store, runs, rng, start_time):
+    for index in range(runs):
+        store.record(rng.randrange(500), ticks=rng.randrange(60_000), seed=rng.getrandbits(63),
+                     timestamp=start_time + index * 37.0)
+    store.flush()
+
+
+def time_calls(function, repeats):
+    samples = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1e6, samples[int(len(samples) * 0.99)] * 1e6, samples[-1] * 1e6
+
+
+def crash_test(directory, seconds):
+    path = os.path.join(directory, 'crash.db')
+    process = subprocess.Popen([sys.executable, '-c', CRASH_WRITER, path, ROOT])
+    time.sleep(seconds)
+    process.send_signal(signal.SIGKILL)
+    process.wait()
+    connection = sqlite3.connect(path)
+    integrity = connection.execute('PRAGMA integrity_check').fetchone()[0]
+    runs, first, last = connection.execute('SELECT count(*), min(ticks), max(ticks) FROM runs').fetchone()
+    connection.close()
+    # Runs are committed in order, so the committed ones must be a gap-free prefix
+    contiguous = runs == 0 or (first == 0 and last == runs - 1)
+    return integrity, runs, contiguous
+
+
+def main():
+    arguments = parser('Score store write latency, query cost and crash safety', seed=None)
+    arguments.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    arguments.add_argument('--crash-seconds', type=float, default=2.0)
+    args = arguments.parse_args()
+
+    rng = random.Random(0)
+    failed = False
+    with tempfile.TemporaryDirectory() as directory:
+        store = ScoreStore(os.path.join(directory, 'scores.db'), legacy_file=None)
+        start_time = time.time() - max(args.sizes) * 37.0
+        table = Table('runs:>10,', 'fill s:>7.1f', 'record us p50/p99/max:>23', 'commit ms:>10.2f',
+                      'top10 us:>9.1f', 'day best us:>12.1f')
+        table.print_header()
+        recorded = 0
+        for size in sorted(args.sizes):
+            fill_start = time.perf_counter()
+            fill(store, size - recorded, rng, start_time + recorded * 37.0)
+            fill_seconds = time.perf_counter() - fill_start
+            recorded = size
+
+            # One game over: the call the render thread makes, then the commit behind it
+            record = time_calls(lambda: store.record(rng.randrange(500), 3600, rng.getrandbits(63)), 200)
+            commit_start = time.perf_counter()
+            store.flush()
+            commit_ms = (time.perf_counter() - commit_start) * 1000
+            recorded += 200
+
+            top = time_calls(lambda: store.top(10), 200)[0]
+            day = time_calls(lambda: store.day_best(), 200)[0]
+            table.row(size, fill_seconds, f'{record[0]:.1f}/{record[1]:.1f}/{record[2]:.1f}', commit_ms, top, day)
+        failed |= store.failures > 0
+        store.close()
+
+        integrity, runs, contiguous = crash_test(directory, args.crash_seconds)
+        print(f'\nSIGKILL during writes: integrity {integrity}, {runs:,} committed runs, '
+              f'{"gap-free" if contiguous else "GAPS"}')
+        failed |= integrity != 'ok' or not contiguous or runs == 0
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
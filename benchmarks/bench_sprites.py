@@ -0,0 +1,83 @@
+import os
+import time
+
+from common import ROOT, parser, use_dummy_drivers
+
+use_dummy_drivers()
+os.chdir(ROOT)
+
+import pygame
+
+from config import SCREEN_WIDTH, SCREEN_HEIGHT, TRAIL_LENGTH
+from sprites import SpriteCache, TRAIL_ALPHAS
+
+# Frame time of the bird, trail and pipe drawing with per-frame surface work
+# (rotozoom, flip, copy + set_alpha) against lookups in the SpriteCache.
+
+
+def load_surfaces():
+    names = ['downflap', 'midflap', 'upflap']
+    frames = [pygame.transform.scale2x(pygame.image.load(f'assets/yellowbird-{name}.png').convert_alpha())
+              for name in names]
+    pipe = pygame.transform.scale2x(pygame.image.load('assets/pipe-green.png').convert())
+    return frames, pipe
+
+
+def draw_uncached(screen, frames, pipe, frame_index, rotation, pipes):
+    bird = frames[frame_index]
+    for alpha in TRAIL_ALPHAS:
+        ghost = bird.copy()
+        ghost.set_alpha(alpha)
+        screen.blit(ghost, (66, 360))
+    for bottom, top in pipes:
+        screen.blit(pipe, bottom)
+        screen.blit(pygame.transform.flip(pipe, False, True), top)
+    rotated = pygame.transform.rotozoom(bird, rotation, 1)
+    screen.blit(rotated, rotated.get_rect(center=(100, 384)))
+
+
+def draw_cached(screen, cache, frame_index, rotation, pipes):
+    for alpha in TRAIL_ALPHAS:
+        screen.blit(cache.trail_ghost(frame_index, alpha), (66, 360))
+    for bottom, top in pipes:
+        screen.blit(cache.pipe_bottom, bottom)
+        screen.blit(cache.pipe_top, top)
+    rotated, half_width, half_height = cache.rotated_bird(frame_index, rotation)
+    screen.blit(rotated, (100 - half_width, 384 - half_height))
+
+
+def main():
+    arguments = parser('Sprite cache frame time', seed=None)
+    arguments.add_argument('--frames', type=int, default=5000)
+    args = arguments.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    frames, pipe = load_surfaces()
+
+    start = time.perf_counter()
+    cache = SpriteCache(frames, pipe)
+    build_ms = (time.perf_counter() - start) * 1000
+    pipes = [((200, 400), (200, -256)), ((400, 300), (400, -356))]
+    angles = cache.angles
+
+    results = {}
+    for name in ('uncached', 'cached'):
+        start = time.perf_counter()
+        for i in range(args.frames):
+            frame_index, rotation = i // 10 % len(frames), angles[i % len(angles)]
+            if name == 'uncached':
+                draw_uncached(screen, frames, pipe, frame_index, rotation, pipes)
+            else:
+                draw_cached(screen, cache, frame_index, rotation, pipes)
+        results[name] = (time.perf_counter() - start) / args.frames * 1e6
+
+    print(f'cache build: {build_ms:.1f} ms for {len(frames) * len(angles)} rotations, '
+          f'{len(frames) * TRAIL_LENGTH} trail ghosts')
+    print(f"uncached: {results['uncached']:.1f} us/frame")
+    print(f"cached:   {results['cached']:.1f} us/frame ({results['uncached'] / results['cached']:.1f}x faster)")
+    pygame.quit()
+
+
+if __name__ == '__main__':
+    main()
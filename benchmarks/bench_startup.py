@@ -0,0 +1,73 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+from common import HEADLESS_ENV, ROOT, Table, parser
+
+os.chdir(ROOT)
+
+from config import ASSET_PACK_FILE
+
+# Time to first frame from a cold interpreter, with the assets decoded from
+# the source files and with them mapped from the asset pack. Every launch is
+# a fresh process so nothing is shared between runs (the OS page cache is,
+# which is also the case for a player starting the game twice).
+
+LAUNCH = '''
+import time
+start = time.perf_counter()
+import json, os, sys
+import pygame
+from game import FlappyBirdGame
+imported = time.perf_counter()
+game = FlappyBirdGame(seed=0, asset_pack=sys.argv[1] or None, score_file=None)
+constructed = time.perf_counter()
+game.draw_frame(0)
+game.canvas.present()
+first_frame = time.perf_counter()
+game.sound_loader.join()
+sounds = time.perf_counter()
+print(json.dumps({
+    'source': game.assets.source,
+    'import_ms': (imported - start) * 1000,
+    'construct_ms': (constructed - imported) * 1000,
+    'first_frame_ms': (first_frame - start) * 1000,
+    'sounds_ms': (sounds - start) * 1000,
+}))
+'''
+
+
+def launch(pack):
+    result = subprocess.run([sys.executable, '-c', LAUNCH, pack or ''], cwd=ROOT, env=HEADLESS_ENV,
+                            capture_output=True, text=True, check=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def main():
+    arguments = parser('Time to first frame with and without the asset pack', seed=None)
+    arguments.add_argument('--launches', type=int, default=10)
+    args = arguments.parse_args()
+
+    if not os.path.exists(ASSET_PACK_FILE):
+        print(f'{ASSET_PACK_FILE} not found; build it first with python assetpack.py')
+        sys.exit(1)
+
+    table = Table('assets:>7', 'import ms:>10.1f', 'construct ms:>13.1f', 'first frame ms:>15.1f', 'p95:>7.1f',
+                  'sounds ready ms:>16.1f')
+    table.print_header()
+    for pack in (None, ASSET_PACK_FILE):
+        runs = [launch(pack) for _ in range(args.launches)]
+        source = runs[0]['source']
+        if pack and source != 'pack':
+            print(f'{ASSET_PACK_FILE} was not used; is it older than the assets?')
+            sys.exit(1)
+        first = sorted(run['first_frame_ms'] for run in runs)
+        table.row(source, statistics.median(run['import_ms'] for run in runs),
+                  statistics.median(run['construct_ms'] for run in runs), statistics.median(first),
+                  first[int(0.95 * (len(first) - 1))], statistics.median(run['sounds_ms'] for run in runs))
+
+
+if __name__ == '__main__':
+    main()
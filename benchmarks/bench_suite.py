@@ -0,0 +1,196 @@
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import time
+
+from common import ROOT, Table, parser, percentile, use_dummy_drivers
+
+use_dummy_drivers()
+
+# Headless regression suite for game.py. Every scenario plays a scripted,
+# seeded session through the real update_tick()/draw_frame()/present() path,
+# one tick per frame and no frame cap, in a fresh process so peak RSS belongs
+# to that scenario alone. Results are compared with a stored baseline and the
+# run fails if any of them got worse by more than the tolerance.
+
+BASELINE_FILE = os.path.join(ROOT, 'benchmarks', 'baseline.json')
+DEFAULT_TOLERANCE = 0.3
+# Past this score difficulty_for_score() returns MAX_PIPE_SPEED and MIN_PIPE_SPAWN_RATE
+LATE_GAME_SCORE = 20
+STORM_PARTICLES_PER_FRAME = 64
+# Metrics checked against the baseline; all of them are "lower is better"
+CHECKED = ('mean_ms', 'p99_ms', 'peak_rss_mb')
+
+
+def autopilot(g, frame):
+    # Flap when the bird falls below the gap; restart shortly after dying
+    if g.game_state != 'game':
+        if frame % 30 == 0:
+            g.handle_jump(measured=False)
+        return
+    bird_y, movement, _, gap_center = g.sim.observe()
+    if bird_y > gap_center + 40 and movement >= 0:
+        g.handle_jump(measured=False)
+
+
+def menu_idle(g, frame):
+    pass
+
+
+def steady(g, frame):
+    autopilot(g, frame)
+
+
+def late_game(g, frame):
+    autopilot(g, frame)
+    sim = g.sim
+    if g.game_state == 'game' and sim.tick == 0:
+        sim.score = LATE_GAME_SCORE
+        sim.update_difficulty()
+
+
+def particle_storm(g, frame):
+    autopilot(g, frame)
+    if g.game_state == 'game':
+        for _ in range(STORM_PARTICLES_PER_FRAME // 8):
+            g.create_score_particles()
+
+
+def shake_flash(g, frame):
+    autopilot(g, frame)
+    g.shake_count = max(g.shake_count, 2)
+    g.flash_count = max(g.flash_count, 2)
+
+
+# name -> (script called before each frame, frames)
+SCENARIOS = {
+    'menu_idle': (menu_idle, 3000),
+    'steady': (steady, 5000),
+    'late_game': (late_game, 5000),
+    'particle_storm': (particle_storm, 3000),
+    'shake_flash': (shake_flash, 3000),
+    'long_run': (steady, 100000),
+}
+
+
+def run_scenario(name, renderer, seed, frame_scale):
+    import game
+    import pygame
+
+    script, frames = SCENARIOS[name]
+    frames = max(1, int(frames * frame_scale))
+    os.chdir(ROOT)
+    # Benchmarks must not touch the player's scores or replay folder
+    g = game.FlappyBirdGame(seed, renderer=renderer, score_file=None)
+    g.record_run = lambda: None
+    clock = time.perf_counter
+    times = [0.0] * frames
+    start = clock()
+    for frame in range(frames):
+        frame_start = clock()
+        script(g, frame)
+        g.handle_events()
+        g.update_tick()
+        g.draw_frame()
+        g.canvas.present()
+        times[frame] = clock() - frame_start
+    elapsed = clock() - start
+    pygame.quit()
+
+    times = sorted(t * 1000 for t in times)
+    return {
+        'frames': frames,
+        'fps': frames / elapsed,
+        'mean_ms': sum(times) / frames,
+        'p50_ms': percentile(times, 0.50),
+        'p95_ms': percentile(times, 0.95),
+        'p99_ms': percentile(times, 0.99),
+        'max_ms': times[-1],
+        # ru_maxrss is in kilobytes on Linux
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def run_isolated(name, renderer, seed, frame_scale):
+    context = multiprocessing.get_context('spawn')
+    with context.Pool(1) as pool:
+        result = pool.apply(run_scenario, (name, renderer, seed, frame_scale))
+        # Let the worker exit on its own; SDL turns SIGTERM from terminate() into a QUIT event
+        pool.close()
+        pool.join()
+    return result
+
+
+def regressions(results, baseline, tolerance):
+    found = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if not expected or expected.get('frames') != result['frames']:
+            continue
+        for metric in CHECKED:
+            limit = expected[metric] * (1 + tolerance)
+            if result[metric] > limit:
+                found.append(f'{name}: {metric} {result[metric]:.2f} > {limit:.2f} '
+                             f'(baseline {expected[metric]:.2f})')
+    return found
+
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    arguments = parser('Headless benchmark scenarios with a regression check', seed=1)
+    arguments.add_argument('scenarios', nargs='*', metavar='SCENARIO',
+                        help=f'scenarios to run (default: all): {", ".join(SCENARIOS)}')
+    arguments.add_argument('--renderer', choices=['full', 'dirty'], default='full', help='canvas to benchmark')
+    arguments.add_argument('--frame-scale', type=float, default=1.0,
+                        help='multiply every scenario length, e.g. 0.1 for a quick run; '
+                             'results are only compared with a baseline of the same length')
+    arguments.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help='allowed slowdown or memory growth over the baseline (0.3 = 30%%)')
+    arguments.add_argument('--baseline', default=BASELINE_FILE)
+    arguments.add_argument('--update-baseline', action='store_true',
+                        help='store these results as the new baseline instead of checking them')
+    args = arguments.parse_args()
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = [name for name in names if name not in SCENARIOS]
+    if unknown:
+        arguments.error(f'unknown scenario(s): {", ".join(unknown)}')
+    results = {}
+    table = Table('scenario:>15', 'frames:>7', 'fps:>8.0f', 'mean ms:>8.3f', 'p95 ms:>7.3f', 'p99 ms:>7.3f',
+                  'max ms:>7.2f', 'RSS MB:>7.1f')
+    table.print_header()
+    for name in names:
+        result = results[name] = run_isolated(name, args.renderer, args.seed, args.frame_scale)
+        table.row(name, result['frames'], result['fps'], result['mean_ms'], result['p95_ms'], result['p99_ms'],
+                  result['max_ms'], result['peak_rss_mb'])
+
+    baselines = load_baseline(args.baseline)
+    if args.update_baseline:
+        baselines.setdefault(args.renderer, {}).update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f'baseline for the {args.renderer} renderer written to {args.baseline}')
+        return
+
+    baseline = baselines.get(args.renderer, {})
+    compared = [name for name in results if baseline.get(name, {}).get('frames') == results[name]['frames']]
+    failures = regressions(results, baseline, args.tolerance)
+    for failure in failures:
+        print(f'REGRESSION {failure}')
+    if not compared:
+        print('no baseline of matching length to compare with; run with --update-baseline')
+    elif not failures:
+        print(f'{len(compared)} scenario(s) within {args.tolerance:.0%} of the baseline')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
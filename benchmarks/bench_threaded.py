@@ -0,0 +1,105 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from common import HEADLESS_ENV, ROOT, Table, parser, percentile
+from config import TICK_RATE
+
+# Tick timing with and without --threaded while rendering spikes. Each mode
+# runs the real game loop headless in its own process with the autopilot
+# playing. Every --spike-every frames, present() stalls for --spike-ms, the
+# way a slow display update does (it sleeps, so the GIL is released like in
+# SDL). Reports the interval between simulation ticks, which should stay at
+# 1/TICK_RATE, plus the render side: frames, dropped frames and buffer swaps.
+
+MODES = ('single', 'threaded')
+
+
+def play(mode, seconds, spike_ms, spike_every, seed):
+    import pygame
+    import game
+
+    os.chdir(ROOT)
+    g = game.FlappyBirdGame(seed, score_file=None, autopilot=True, threaded=mode == 'threaded')
+    g.record_run = lambda: None
+    ticks = []
+    update_tick = g.update_tick
+
+    def timed_tick():
+        ticks.append(time.perf_counter())
+        update_tick()
+    g.update_tick = timed_tick
+
+    presents = []
+    present = g.canvas.present
+
+    def spiking_present():
+        present()
+        presents.append(time.perf_counter())
+        if len(presents) % spike_every == 0:
+            time.sleep(spike_ms / 1000)
+    g.canvas.present = spiking_present
+
+    def stop():
+        time.sleep(seconds)
+        pygame.event.post(pygame.event.Event(pygame.QUIT))
+
+    threading.Thread(target=stop, daemon=True).start()
+    try:
+        g.run_threaded() if g.threaded else g.run()
+    except SystemExit:
+        pass
+    intervals = sorted((b - a) * 1000 for a, b in zip(ticks, ticks[1:]))
+    frames = len(presents) / (presents[-1] - presents[0]) if len(presents) > 1 else 0.0
+    result = {
+        'ticks_per_s': len(ticks) / (ticks[-1] - ticks[0]),
+        'tick_p50_ms': percentile(intervals, 0.5),
+        'tick_p99_ms': percentile(intervals, 0.99),
+        'tick_max_ms': intervals[-1],
+        # Ticks run back to back to catch up after a stall
+        'bunched': sum(interval < 1000 / TICK_RATE / 2 for interval in intervals),
+        'fps': frames,
+        'dropped': 0, 'swaps': 0, 'overwritten': 0,
+    }
+    if g.threaded:
+        result.update(dropped=g.render_stats.dropped, swaps=g.snapshots.swaps, overwritten=g.snapshots.overwritten)
+    return result
+
+
+def main():
+    arguments = parser('Simulation tick timing under render spikes, with and without --threaded')
+    arguments.add_argument('modes', nargs='*', default=list(MODES))
+    arguments.add_argument('--seconds', type=float, default=20)
+    arguments.add_argument('--spike-ms', type=float, default=50)
+    arguments.add_argument('--spike-every', type=int, default=30, help='frames between spikes')
+    arguments.add_argument('--child', action='store_true', help=argparse.SUPPRESS)
+    args = arguments.parse_args()
+    unknown = set(args.modes) - set(MODES)
+    if unknown:
+        arguments.error(f"unknown mode(s): {', '.join(sorted(unknown))}")
+
+    if args.child:
+        print(json.dumps(play(args.modes[0], args.seconds, args.spike_ms, args.spike_every, args.seed)))
+        return
+
+    print(f'{args.spike_ms:g} ms render spike every {args.spike_every} frames; '
+          f'ticks are due every {1000 / TICK_RATE:.2f} ms')
+    table = Table('mode:>9', 'ticks/s:>8.1f', 'tick p50:>9.2f', 'p99:>7.2f', 'max:>7.2f', 'bunched:>8',
+                  'fps:>6.1f', 'dropped:>8', 'swaps:>7', 'undrawn:>8')
+    table.print_header()
+    for mode in args.modes:
+        result = subprocess.run([sys.executable, os.path.abspath(__file__), mode, '--child',
+                                 '--seconds', str(args.seconds), '--spike-ms', str(args.spike_ms),
+                                 '--spike-every', str(args.spike_every), '--seed', str(args.seed)],
+                                cwd=ROOT, env=HEADLESS_ENV, capture_output=True, text=True, check=True)
+        stats = json.loads(result.stdout.strip().splitlines()[-1])
+        table.row(mode, stats['ticks_per_s'], stats['tick_p50_ms'], stats['tick_p99_ms'], stats['tick_max_ms'],
+                  stats['bunched'], stats['fps'], stats['dropped'], stats['swaps'], stats['overwritten'])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+import random
+import sys
+import time
+
+from common import Table, parser
+from batch_env import BatchFlappyEnv
+from config import TICK_RATE, JUMP_STRENGTH
+from rollout import flap_below_gap
+from simulation import FlappySimulation
+
+# Coarse decision rates. First a tunneling check: before every coarse step
+# the game is forked and the same ticks are sub-stepped one by one, and the
+# swept step must find exactly the deaths the sub-steps do. Every episode is
+# also played at TICK_RATE with the bird flapping on the same ticks; coarse
+# steps move the pipes in a straight line and change difficulty at the end of
+# the step, so some runs drift apart, which is reported but allowed. The last
+# column counts deaths between two step boundaries that a single collision
+# test at the end of the step would have missed. Then steps/s and simulated
+# seconds per wall-clock second for each rate.
+
+RATES = (TICK_RATE, 30, 20, 15)
+NOISE = 0.05
+
+
+def coarse_policy(rng):
+    # Mostly sensible, sometimes random, so birds die on every kind of edge
+    def policy(obs):
+        return flap_below_gap(obs) or rng.random() < NOISE
+    return policy
+
+
+def missed_by_end_of_step_check(sim, ticks_left):
+    # Would a single test after the remaining ticks of this step still see a hit?
+    ghost = sim.fork()
+    ghost.done = False
+    ghost.check_collision = lambda: None
+    for _ in range(ticks_left):
+        ghost.advance_tick()
+    return FlappySimulation.check_collision(ghost) is None
+
+
+def substep_died(sim, flap):
+    # The next coarse step of sim played tick by tick on a fork
+    ghost = sim.fork()
+    if flap:
+        ghost.bird_movement = JUMP_STRENGTH
+    for _ in range(sim.ticks_per_step):
+        ghost.advance_tick()
+        if ghost.done:
+            break
+    return ghost.death_cause
+
+
+def check_rate(tick_rate, episodes, seed, max_steps):
+    per_step = TICK_RATE // tick_rate
+    coarse = FlappySimulation(tick_rate=tick_rate)
+    reference = FlappySimulation()
+    differs = disagreements = tunneled = deaths = 0
+    for episode in range(episodes):
+        policy = coarse_policy(random.Random(seed * 1_000_003 + episode))
+        obs = coarse.reset(seed + episode)
+        reference.reset(seed + episode)
+        for _ in range(max_steps):
+            flap = policy(obs)
+            substepped = substep_died(coarse, flap)
+            obs, _, done, _ = coarse.step(flap)
+            disagreements += coarse.death_cause != substepped
+            for sub in range(per_step):
+                reference.step(flap and sub == 0)
+                if reference.done:
+                    break
+            if done or reference.done:
+                break
+        if (coarse.done, coarse.score, coarse.death_cause) != \
+                (reference.done, reference.score, reference.death_cause):
+            differs += 1
+        if reference.done:
+            deaths += 1
+            ticks_left = -reference.tick % per_step
+            if ticks_left and missed_by_end_of_step_check(reference, ticks_left):
+                tunneled += 1
+    return disagreements, differs, tunneled, deaths
+
+
+def scalar_throughput(tick_rate, steps, seed):
+    sim = FlappySimulation(seed, tick_rate=tick_rate)
+    obs = sim.observe()
+    start = time.perf_counter()
+    for _ in range(steps):
+        obs, _, done, _ = sim.step(flap_below_gap(obs))
+        if done:
+            obs = sim.reset()
+    return steps / (time.perf_counter() - start)
+
+
+def batch_throughput(tick_rate, num_envs, steps, seed):
+    env = BatchFlappyEnv(num_envs, seed=seed, tick_rate=tick_rate)
+    obs = env.observe()
+    start = time.perf_counter()
+    for _ in range(steps):
+        obs, _, _, _ = env.step(obs[:, 0] > obs[:, 3] + 40)
+    return num_envs * steps / (time.perf_counter() - start)
+
+
+def main():
+    arguments = parser('Tunneling check and throughput at coarse tick rates')
+    arguments.add_argument('--episodes', type=int, default=2000)
+    arguments.add_argument('--steps', type=int, default=100_000, help='steps for the scalar throughput run')
+    arguments.add_argument('--envs', type=int, default=4096)
+    arguments.add_argument('--batch-steps', type=int, default=500)
+    args = arguments.parse_args()
+
+    table = Table('rate:>5', 'episodes:>9', 'vs sub-steps:>13', 'vs 60 Hz:>9', 'deaths:>7',
+                  'missed by end-of-step test:>27')
+    table.print_header()
+    failed = False
+    for rate in RATES[1:]:
+        disagreements, differs, tunneled, deaths = check_rate(rate, args.episodes, args.seed, max_steps=10_000)
+        failed |= disagreements > 0
+        table.row(rate, args.episodes, disagreements, differs, deaths, tunneled)
+
+    print()
+    table = Table('rate:>5', 'sim steps/s:>12,.0f', 'sim game-s/s:>13,.0f', 'batch steps/s:>14,.0f',
+                  'batch game-s/s:>15,.0f')
+    table.print_header()
+    for rate in RATES:
+        scalar = scalar_throughput(rate, args.steps, args.seed)
+        batch = batch_throughput(rate, args.envs, args.batch_steps, args.seed)
+        table.row(rate, scalar, scalar / rate, batch, batch / rate)
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
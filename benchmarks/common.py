@@ -0,0 +1,61 @@
+import argparse
+import os
+import re
+import sys
+import time
+
+# Shared by the benchmark scripts. Importing it puts the repository root on
+# sys.path, so the game's modules import the same way they do for game.py.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# For child processes that run the game without a display or audio device
+HEADLESS_ENV = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+
+
+def use_dummy_drivers():
+    # Before pygame is initialized in this process; explicit drivers win
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+
+def parser(description, seed=0):
+    # argparse with the --seed every game-playing benchmark takes (seed=None: none)
+    arguments = argparse.ArgumentParser(description=description)
+    if seed is not None:
+        arguments.add_argument('--seed', type=int, default=seed)
+    return arguments
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def per_call(function, calls):
+    # Microseconds per call
+    start = time.perf_counter()
+    for _ in range(calls):
+        function()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+class Table:
+    # Columns are 'title:spec'; values are formatted with the spec, the title
+    # with the spec's alignment and width. print_header() once, then row().
+
+    def __init__(self, *columns):
+        self.titles = []
+        self.specs = []
+        for column in columns:
+            title, spec = column.rsplit(':', 1)
+            align, width = re.match(r'([<>^]?)(\d*)', spec).groups()
+            self.titles.append(format(title, (align or '>') + width))
+            self.specs.append(spec)
+
+    def print_header(self):
+        print(' '.join(self.titles))
+
+    def row(self, *values):
+        print(' '.join(format(value, spec) for value, spec in zip(values, self.specs)), flush=True)
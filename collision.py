@@ -0,0 +1,67 @@
+import pygame
+
+from config import BIRD_FRAME_FILES, BIRD_START_X, PIPE_GAP, PIPE_HEIGHT, PIPE_WIDTH
+from simulation import COLLISION_PIXEL
+from sprites import SpriteCache
+
+# Pixel-accurate narrow phase for FlappySimulation. The simulation stays
+# pygame-free and only asks a collider two things: the bird's tight bounding
+# box (for the rect broad phase) and, when that box touches a pipe, whether
+# the drawn bird pixels actually overlap it. Masks are built once for every
+# flap frame and rotation angle the renderer can draw.
+
+class PixelCollider:
+    mode = COLLISION_PIXEL
+
+    def __init__(self, sprites):
+        self.sprites = sprites
+        # Pipes are drawn opaque (loaded with convert()), so their masks are solid
+        self.pipe_mask = pygame.Mask((PIPE_WIDTH, PIPE_HEIGHT), fill=True)
+        self.narrow_checks = 0
+
+        # entries[frame][angle index] -> (mask, sprite left, sprite top,
+        # tight left, top, right, bottom), all relative to the bird's center
+        self.entries = []
+        for rotations in sprites.rotated:
+            entries = []
+            for surface, half_width, half_height in rotations:
+                mask = pygame.mask.from_surface(surface)
+                rects = mask.get_bounding_rects()
+                tight = rects[0].unionall(rects[1:]) if rects else pygame.Rect(half_width, half_height, 0, 0)
+                entries.append((mask, -half_width, -half_height,
+                                tight.left - half_width, tight.top - half_height,
+                                tight.right - half_width, tight.bottom - half_height))
+            self.entries.append(entries)
+
+    @classmethod
+    def from_assets(cls):
+        # For headless use (e.g. verifying replays): no display needed
+        frames = [pygame.transform.scale2x(pygame.image.load(path)) for path in BIRD_FRAME_FILES]
+        return cls(SpriteCache(frames, pygame.Surface((PIPE_WIDTH, PIPE_HEIGHT))))
+
+    def entry(self, frame_index, rotation):
+        return self.entries[frame_index][self.sprites.angle_index(rotation)]
+
+    def bounds(self, frame_index, rotation, bird_y):
+        _, _, _, left, top, right, bottom = self.entry(frame_index, rotation)
+        return BIRD_START_X + left, bird_y + top, BIRD_START_X + right, bird_y + bottom
+
+    def hits_pipe(self, frame_index, rotation, bird_y, pipe_left, gap_y):
+        self.narrow_checks += 1
+        mask, sprite_left, sprite_top = self.entry(frame_index, rotation)[:3]
+        x = pipe_left - BIRD_START_X - sprite_left
+        y = bird_y + sprite_top
+        pipe_mask = self.pipe_mask
+        return (mask.overlap(pipe_mask, (x, gap_y - y)) is not None
+                or mask.overlap(pipe_mask, (x, gap_y - PIPE_GAP - PIPE_HEIGHT - y)) is not None)
+
+
+_shared = None
+
+
+def shared_pixel_collider():
+    # One collider per process, built from the asset files on first use
+    global _shared
+    if _shared is None:
+        _shared = PixelCollider.from_assets()
+    return _shared
@@ -0,0 +1,85 @@
+# Configuration
+SCREEN_WIDTH = 432
+SCREEN_HEIGHT = 768
+FPS = 60
+# Simulation ticks per second; every physics constant below is per tick
+TICK_RATE = 60
+# Most ticks one frame plays when unthrottled (--replay-speed max): 16x at
+# 60 FPS, so the run can still be watched
+MAX_SPEED_TICKS_PER_FRAME = 16
+
+# Game physics
+GRAVITY = 0.25
+JUMP_STRENGTH = -6
+BASE_PIPE_SPEED = 5
+FLOOR_SPEED = 1
+BASE_PIPE_SPAWN_RATE = 1200
+PIPE_GAP = 150
+PIPE_HEIGHTS = [300, 400, 500]
+FLOOR_Y = 650
+CEILING_Y = -100
+
+# Sprite sizes after scale2x, needed by the headless simulation
+PIPE_WIDTH = 82
+PIPE_HEIGHT = 506
+PIPE_SPAWN_X = SCREEN_WIDTH + 50
+BIRD_WIDTH = 68
+BIRD_HEIGHT = 48
+
+# Asset files; assetpack.py bakes them into ASSET_PACK_FILE
+FONT_FILE = '04B_19.TTF'
+MESSAGE_IMAGE = 'assets/message.png'
+BACKGROUND_IMAGE = 'assets/background-night.png'
+FLOOR_IMAGE = 'assets/floor.png'
+PIPE_IMAGE = 'assets/pipe-green.png'
+FLAP_SOUND = 'sound/sfx_wing.wav'
+HIT_SOUND = 'sound/sfx_hit.wav'
+SCORE_SOUND = 'sound/sfx_point.wav'
+ASSET_PACK_FILE = 'assets.pack'
+
+# Bird settings
+BIRD_START_X = 100
+BIRD_START_Y = 384
+BIRD_FLAP_RATE = 10
+BIRD_FRAME_COUNT = 3
+BIRD_FRAME_FILES = [
+    'assets/yellowbird-downflap.png',
+    'assets/yellowbird-midflap.png',
+    'assets/yellowbird-upflap.png',
+]
+MAX_BIRD_ROTATION = 30
+MIN_BIRD_ROTATION = -90
+ROTATION_SPEED = 5
+
+# Audio
+AUDIO_FREQUENCY = 44100
+AUDIO_SIZE = -16
+AUDIO_CHANNELS = 2
+AUDIO_BUFFER = 512
+VOLUME = 0.1
+
+# Effects
+FLASH_DURATION = 5
+SHAKE_DURATION = 10
+SHAKE_INTENSITY = 3
+TRAIL_LENGTH = 5
+JUMP_PARTICLE_COLOR = (255, 255, 255)
+SCORE_PARTICLE_COLOR = (255, 215, 0)
+
+# Profiler overlay
+PROFILE_TEXT_COLOR = (180, 255, 180)
+PROFILE_PANEL_COLOR = (0, 0, 0, 170)
+PROFILE_HUD_REFRESH = 15
+
+# Difficulty
+DIFFICULTY_SCALE = 0.5
+MAX_PIPE_SPEED = 8
+MIN_PIPE_SPAWN_RATE = 800
+SPAWN_RATE_STEP = 30
+
+# Score
+# Every run is kept in SCORE_DB_FILE; HIGH_SCORE_FILE is only read once, to import the old best
+SCORE_DB_FILE = 'scores.db'
+HIGH_SCORE_FILE = 'high_score.json'
+# Both rects of a pipe pair count once each when the bird passes them
+POINTS_PER_PIPE = 2
@@ -1,101 +1,87 @@
+import argparse
+import io
 import os
 import random
+import sqlite3
+import sys
+import threading
+import time
 import pygame
-import json
 import math
+from collections import deque
 
-# Configuration
-SCREEN_WIDTH = 432
-SCREEN_HEIGHT = 768
-FPS = 60
+from config import (
+    SCREEN_WIDTH, SCREEN_HEIGHT, FPS, TICK_RATE, FLOOR_SPEED, PIPE_GAP, FLOOR_Y,
+    PIPE_WIDTH, ASSET_PACK_FILE, BIRD_START_X, BIRD_FRAME_COUNT, AUDIO_FREQUENCY,
+    AUDIO_SIZE, AUDIO_CHANNELS, AUDIO_BUFFER, VOLUME, FLASH_DURATION,
+    SHAKE_DURATION, SHAKE_INTENSITY, TRAIL_LENGTH, JUMP_PARTICLE_COLOR,
+    SCORE_PARTICLE_COLOR, PROFILE_TEXT_COLOR, PROFILE_PANEL_COLOR,
+    PROFILE_HUD_REFRESH, SCORE_DB_FILE, MAX_SPEED_TICKS_PER_FRAME,
+)
+from simulation import FlappySimulation, DEATH_PIPE, COLLISION_RECT, COLLISION_PIXEL, COLLISION_MODES
+from collision import PixelCollider
+from sprites import SpriteCache, TRAIL_START_ALPHA, TRAIL_FADE
+from overlays import OverlayCache, DigitAtlas
+from particles import ParticlePool
+from renderer import RENDERERS
+from scheduler import FixedTimestep
+from replay import Replay, ReplayRecorder
+from profiler import FrameProfiler
+from assetpack import open_assets
+from scores import ScoreStore
+from pacing import PACERS, PACING_MODES, InputLatency
+from autopilot import Autopilot, SoakLog, PIXEL_MARGIN, RESTART_TICKS
+from neuroevolution import (
+    GenomePilot, train, DEFAULT_POPULATION, DEFAULT_GENERATIONS, DEFAULT_MAX_TICKS, CHECKPOINT_FILE,
+)
+from threaded import (
+    FrameSnapshot, SnapshotBuffer, SimulationThread, RenderStats, SWITCH_INTERVAL, print_threaded_summary,
+)
 
-# Game physics
-GRAVITY = 0.25
-JUMP_STRENGTH = -6
-BASE_PIPE_SPEED = 5
-FLOOR_SPEED = 1
-BASE_PIPE_SPAWN_RATE = 1200
-PIPE_GAP = 150
-PIPE_HEIGHTS = [300, 400, 500]
-FLOOR_Y = 650
-
-# Bird settings
-BIRD_START_X = 100
-BIRD_START_Y = 384
-BIRD_FLAP_RATE = 10
-MAX_BIRD_ROTATION = 30
-MIN_BIRD_ROTATION = -90
-ROTATION_SPEED = 5
-
-# Audio
-AUDIO_FREQUENCY = 44100
-AUDIO_SIZE = -16
-AUDIO_CHANNELS = 2
-AUDIO_BUFFER = 512
-VOLUME = 0.1
-
-# Effects
-FLASH_DURATION = 5
-SHAKE_DURATION = 10
-SHAKE_INTENSITY = 3
-TRAIL_LENGTH = 5
-
-# Difficulty
-DIFFICULTY_SCALE = 0.5
-MAX_PIPE_SPEED = 8
-MIN_PIPE_SPAWN_RATE = 800
-
-# Score
-HIGH_SCORE_FILE = 'high_score.json'
-
-class Particle:
-    def __init__(self, x, y, color, size, velocity, lifetime):
-        self.x = x
-        self.y = y
-        self.color = color
-        self.size = size
-        self.velocity = velocity
-        self.lifetime = lifetime
-        self.age = 0
-        
-    def update(self, dt):
-        self.x += self.velocity[0] * dt
-        self.y += self.velocity[1] * dt
-        self.age += dt
-        self.size *= 0.95
-        return self.age < self.lifetime
-        
-    def draw(self, screen):
-        if self.size > 0:
-            alpha = int(255 * (1 - self.age / self.lifetime))
-            particle_surf = pygame.Surface((int(self.size * 2), int(self.size * 2)), pygame.SRCALPHA)
-            pygame.draw.circle(particle_surf, (*self.color, alpha), (int(self.size), int(self.size)), int(self.size))
-            screen.blit(particle_surf, (int(self.x - self.size), int(self.y - self.size)))
 
 class FlappyBirdGame:
-    def __init__(self):
+    def __init__(self, seed=None, renderer='full', speed=1.0, replay=None, profile=False, profile_out=None,
+                 collision=COLLISION_RECT, asset_pack=ASSET_PACK_FILE, score_file=SCORE_DB_FILE,
+                 pacing='tick', autopilot=False, soak_log=None, soak_minutes=None, threaded=False):
+        self.launch_time = time.perf_counter()
+        self.first_frame_ms = None
         pygame.mixer.pre_init(frequency=AUDIO_FREQUENCY, size=AUDIO_SIZE, 
                              channels=AUDIO_CHANNELS, buffer=AUDIO_BUFFER)
-        pygame.init()
+        # The mixer is opened later, off the main thread, by load_sounds()
+        pygame.display.init()
+        pygame.font.init()
         
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        self.clock = pygame.time.Clock()
-        self.game_font = pygame.font.Font('04B_19.TTF', 40)
-        self.small_font = pygame.font.Font('04B_19.TTF', 20)
-        
-        # Initialize timers before reset_game
-        self.SPAWNPIPE = pygame.USEREVENT
-        
-        # Difficulty variables
-        self.current_pipe_speed = BASE_PIPE_SPEED
-        self.current_spawn_rate = BASE_PIPE_SPAWN_RATE
-        pygame.time.set_timer(self.SPAWNPIPE, self.current_spawn_rate)
-        
-        # Bird animation timer
-        self.bird_flap_timer = 0
+        self.canvas = RENDERERS[renderer](self.screen)
+        self.pacing = pacing
+        self.pacer = PACERS[pacing]()
+        # SPACE/click to the present that shows it, reported on exit
+        self.latency = InputLatency()
+        self.timestep = FixedTimestep(TICK_RATE, speed)
+        self.assets = open_assets(asset_pack)
+        
+        # Physics, pipes, collision and scoring live in the headless simulation;
+        # this class only turns its state into pixels and sound
+        self.sim = FlappySimulation(seed)
+        # Cosmetic randomness gets its own stream so it never shifts the pipes
+        self.rng = random.Random(seed)
+        self.flap_queued = False
+        # Per-phase timings; F3 shows them, --profile-out writes them on exit
+        self.profiler = FrameProfiler(enabled=profile or bool(profile_out))
+        # With --threaded the ticks run on their own thread and get their own profiler
+        self.tick_profiler = FrameProfiler(enabled=self.profiler.enabled) if threaded else self.profiler
+        self.tick_profiler.instrument(self.sim, ('rotate_bird', 'move_pipes', 'check_collision', 'check_score'),
+                                      prefix='sim.')
+        self.profile_out = profile_out
+        self.show_profile = profile
+        self.profile_hud = None
+        self.profile_hud_age = 0
+        # Every run is recorded; when watching a replay its flaps drive the bird
+        self.replay = replay
+        self.recorder = None
         
         # Effect variables
-        self.particles = []
+        self.particles = ParticlePool([JUMP_PARTICLE_COLOR, SCORE_PARTICLE_COLOR], seed=seed)
         self.trail = []
         self.flash_count = 0
         self.shake_count = 0
@@ -108,472 +94,665 @@ class FlappyBirdGame:
         self.sound_enabled = True
         
         self.load_assets()
-        self.load_high_score()
+        self.sound_loader = threading.Thread(target=self.load_sounds, name='sound-loader', daemon=True)
+        self.sound_loader.start()
+        # A replay is re-simulated with the collision test it was recorded with
+        if self.replay:
+            collision = self.replay.collision
+        if collision == COLLISION_PIXEL:
+            self.sim.collider = PixelCollider(self.sprites)
+            if self.replay:
+                self.replay.collider = self.sim.collider
+        try:
+            self.scores = ScoreStore(score_file)
+        except sqlite3.Error as e:
+            # An unwritable directory or a locked or corrupt store: play on without saving runs
+            print(f"Could not open {score_file}, runs will not be saved: {e}")
+            self.scores = ScoreStore(None, legacy_file=None)
+        self.high_score = self.scores.best()
+        # The autopilot presses SPACE through handle_jump(), like a player,
+        # but its presses are left out of the input latency figures.
+        # True means the lookahead planner; any object with decide(sim) also works.
+        self.autopilot = None
+        if autopilot is True and not self.replay:
+            self.autopilot = Autopilot(margin=PIXEL_MARGIN if collision == COLLISION_PIXEL else 0)
+        elif autopilot and not self.replay:
+            self.autopilot = autopilot
+        self.autopilot_wait = 0
+        self.soak = SoakLog(soak_log, soak_minutes) if soak_log else None
+        # --threaded: input becomes commands for the simulation thread, which
+        # publishes snapshots for the render loop to draw
+        self.threaded = threaded
+        self.commands = deque() if threaded else None
+        self.snapshots = SnapshotBuffer() if threaded else None
+        self.sim_thread = None
+        self.render_stats = RenderStats() if threaded else None
         self.reset_game()
         
         self.game_state = 'menu'
+        if self.replay:
+            self.start_game()
         
     def load_assets(self):
+        # What the first frame needs. Sounds follow on a background thread.
+        assets = self.assets
         try:
-            self.game_over_surface = pygame.transform.scale2x(
-                pygame.image.load('assets/message.png').convert_alpha()
-            )
+            font = assets.blob('font')
+            self.game_font = pygame.font.Font(io.BytesIO(font), 40)
+            self.small_font = pygame.font.Font(io.BytesIO(font), 20)
+            
+            self.game_over_surface = assets.image('message')
             self.game_over_rect = self.game_over_surface.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
+            self.overlays = OverlayCache(self.game_font, self.small_font, self.game_over_surface)
+            self.score_digits = DigitAtlas(self.game_font)
             
-            self.bg = pygame.image.load('assets/background-night.png').convert()
-            self.bg = pygame.transform.scale(self.bg, (SCREEN_WIDTH, SCREEN_HEIGHT))
+            self.bg = assets.image('background')
             self.bg_x = 0
             
-            self.floor = pygame.image.load('assets/floor.png').convert()
-            self.floor = pygame.transform.scale2x(self.floor)
+            self.floor = assets.image('floor')
             self.floor_x_pos = 0
             
-            bird_down = pygame.transform.scale2x(pygame.image.load('assets/yellowbird-downflap.png').convert_alpha())
-            bird_mid = pygame.transform.scale2x(pygame.image.load('assets/yellowbird-midflap.png').convert_alpha())
-            bird_up = pygame.transform.scale2x(pygame.image.load('assets/yellowbird-upflap.png').convert_alpha())
-            self.bird_frames = [bird_down, bird_mid, bird_up]
+            self.bird_frames = [assets.image(f'bird{index}') for index in range(BIRD_FRAME_COUNT)]
             
-            self.pipe_surface = pygame.image.load('assets/pipe-green.png').convert()
-            self.pipe_surface = pygame.transform.scale2x(self.pipe_surface)
+            self.pipe_surface = assets.image('pipe')
+            self.sprites = SpriteCache(self.bird_frames, self.pipe_surface)
+            self.pipe_rects = [(self.pipe_surface.get_rect(), self.pipe_surface.get_rect())
+                               for _ in range(self.sim.pipes.capacity)]
             
-            pygame.mixer.init()
-            self.flap_sound = pygame.mixer.Sound('sound/sfx_wing.wav')
-            self.flap_sound.set_volume(VOLUME)
-            self.hit_sound = pygame.mixer.Sound('sound/sfx_hit.wav')
-            self.hit_sound.set_volume(VOLUME)
-            self.score_sound = pygame.mixer.Sound('sound/sfx_point.wav')
-            self.score_sound.set_volume(VOLUME)
+            # Silent until load_sounds() has finished
+            self.flap_sound = self.hit_sound = self.score_sound = None
             
         except FileNotFoundError as e:
             print(f"Error loading assets: {e}")
             pygame.quit()
             exit()
             
-    def load_high_score(self):
-        try:
-            if os.path.exists(HIGH_SCORE_FILE):
-                with open(HIGH_SCORE_FILE, 'r') as f:
-                    data = json.load(f)
-                    self.high_score = data.get('high_score', 0)
-            else:
-                self.high_score = 0
-        except:
-            self.high_score = 0
-            
-    def save_high_score(self):
+    def load_sounds(self):
         try:
-            with open(HIGH_SCORE_FILE, 'w') as f:
-                json.dump({'high_score': self.high_score}, f)
-        except:
-            pass
+            pygame.mixer.init()
+            sounds = [self.assets.sound(name) for name in ('flap', 'hit', 'score')]
+        except (pygame.error, FileNotFoundError) as e:
+            print(f"Sound disabled: {e}")
+            return
+        self.flap_sound, self.hit_sound, self.score_sound = sounds
+        self.apply_volume()
             
     def reset_game(self):
-        self.bird_index = 0
+        if self.replay:
+            self.replay.start(self.sim)
+            self.recorder = None
+        else:
+            self.sim.reset()
+            self.recorder = ReplayRecorder(self.sim)
+        self.flap_queued = False
+        self.bird_index = self.sim.bird_index
         self.bird = self.bird_frames[self.bird_index]
-        self.bird_rect = self.bird.get_rect(center=(BIRD_START_X, BIRD_START_Y))
-        self.bird_movement = 0
-        self.bird_rotation = 0
-        self.bird_flap_timer = 0
-        self.pipe_list = []
-        self.score = 0
-        self.passed_pipes = set()
-        self.particles = []
+        self.bird_rect = self.bird.get_rect(center=(BIRD_START_X, self.sim.bird_y))
+        self.particles.clear()
         self.trail = []
-        self.current_pipe_speed = BASE_PIPE_SPEED
-        self.current_spawn_rate = BASE_PIPE_SPAWN_RATE
-        pygame.time.set_timer(self.SPAWNPIPE, self.current_spawn_rate)
+        
+    @property
+    def score(self):
+        return self.sim.score
+
+    # The rest of what draw_frame() reads; FrameSnapshot has the same names
+    @property
+    def pipes(self):
+        return self.sim.pipes
+
+    @property
+    def bird_y(self):
+        return self.sim.bird_y
+
+    @property
+    def prev_bird_y(self):
+        return self.sim.prev_bird_y
+
+    @property
+    def bird_rotation(self):
+        return self.sim.bird_rotation
+
+    @property
+    def camera(self):
+        return int(self.shake_offset[0]), int(self.shake_offset[1])
         
     def create_jump_particles(self):
-        for _ in range(5):
-            angle = random.uniform(math.pi * 0.7, math.pi * 0.9)
-            speed = random.uniform(2, 4)
-            velocity = (math.cos(angle) * speed, math.sin(angle) * speed)
-            particle = Particle(
-                self.bird_rect.centerx - 10,
-                self.bird_rect.centery + 10,
-                (255, 255, 255),
-                random.uniform(3, 6),
-                velocity,
-                random.uniform(10, 20)
-            )
-            self.particles.append(particle)
+        self.particles.emit(
+            self.bird_rect.centerx - 10,
+            self.bird_rect.centery + 10,
+            JUMP_PARTICLE_COLOR,
+            count=5,
+            angle=(math.pi * 0.7, math.pi * 0.9),
+            speed=(2, 4),
+            size=(3, 6),
+            lifetime=(10, 20)
+        )
             
     def create_score_particles(self):
-        for _ in range(8):
-            angle = random.uniform(0, math.pi * 2)
-            speed = random.uniform(2, 5)
-            velocity = (math.cos(angle) * speed, math.sin(angle) * speed)
-            particle = Particle(
-                self.bird_rect.centerx,
-                self.bird_rect.centery,
-                (255, 215, 0),
-                random.uniform(4, 7),
-                velocity,
-                random.uniform(15, 25)
-            )
-            self.particles.append(particle)
+        self.particles.emit(
+            self.bird_rect.centerx,
+            self.bird_rect.centery,
+            SCORE_PARTICLE_COLOR,
+            count=8,
+            angle=(0, math.pi * 2),
+            speed=(2, 5),
+            size=(4, 7),
+            lifetime=(15, 25)
+        )
             
     def update_trail(self):
         self.trail.append({
             'rect': self.bird_rect.copy(),
-            'alpha': 200
+            'alpha': TRAIL_START_ALPHA
         })
         if len(self.trail) > TRAIL_LENGTH:
             self.trail.pop(0)
         for t in self.trail:
-            t['alpha'] = max(0, t['alpha'] - 15)
+            t['alpha'] = max(0, t['alpha'] - TRAIL_FADE)
             
-    def draw_trail(self):
-        for t in self.trail:
+    def draw_trail(self, trail, bird_index):
+        for t in trail:
             if t['alpha'] > 0:
-                trail_surf = self.bird.copy()
-                trail_surf.set_alpha(t['alpha'])
-                self.screen.blit(trail_surf, t['rect'])
+                self.canvas.blit(self.sprites.trail_ghost(bird_index, t['alpha']), t['rect'])
                 
-    def update_difficulty(self):
-        new_speed = min(MAX_PIPE_SPEED, BASE_PIPE_SPEED + self.score * DIFFICULTY_SCALE)
-        new_spawn_rate = max(MIN_PIPE_SPAWN_RATE, BASE_PIPE_SPAWN_RATE - self.score * 30)
+    def draw_floor(self, floor_x_pos):
+        self.canvas.blit(self.floor, (floor_x_pos, FLOOR_Y))
+        self.canvas.blit(self.floor, (floor_x_pos + SCREEN_WIDTH, FLOOR_Y))
         
-        if abs(new_speed - self.current_pipe_speed) > 0.01:
-            self.current_pipe_speed = new_speed
-        if abs(new_spawn_rate - self.current_spawn_rate) > 1:
-            self.current_spawn_rate = int(new_spawn_rate)
-            pygame.time.set_timer(self.SPAWNPIPE, self.current_spawn_rate)
-            
-    def draw_floor(self):
-        self.screen.blit(self.floor, (self.floor_x_pos, FLOOR_Y))
-        self.screen.blit(self.floor, (self.floor_x_pos + SCREEN_WIDTH, FLOOR_Y))
-        
-    def create_pipe(self):
-        random_pipe_pos = random.choice(PIPE_HEIGHTS)
-        bottom_pipe = self.pipe_surface.get_rect(midtop=(SCREEN_WIDTH + 50, random_pipe_pos))
-        top_pipe = self.pipe_surface.get_rect(midbottom=(SCREEN_WIDTH + 50, random_pipe_pos - PIPE_GAP))
-        return bottom_pipe, top_pipe
-        
-    def move_pipes(self, pipes):
+    def draw_pipes(self, pipes, alpha=1.0):
         for pipe in pipes:
-            pipe.centerx -= self.current_pipe_speed
-        return pipes
-        
-    def draw_pipes(self, pipes):
-        for pipe in pipes:
-            if pipe.bottom >= 600:
-                self.screen.blit(self.pipe_surface, pipe)
-            else:
-                flip_pipe = pygame.transform.flip(self.pipe_surface, False, True)
-                self.screen.blit(flip_pipe, pipe)
+            # One pair of Rects per ring slot, reused as pipes are recycled
+            bottom_rect, top_rect = self.pipe_rects[pipe.slot]
+            left = round(pipe.prev_centerx + (pipe.centerx - pipe.prev_centerx) * alpha) - PIPE_WIDTH // 2
+            bottom_rect.topleft = (left, pipe.gap_y)
+            top_rect.bottomleft = (left, pipe.gap_y - PIPE_GAP)
+            self.canvas.blit(self.sprites.pipe_bottom, bottom_rect)
+            self.canvas.blit(self.sprites.pipe_top, top_rect)
                 
-    def check_collision(self, pipes):
-        for pipe in pipes:
-            if self.bird_rect.colliderect(pipe):
-                if self.sound_enabled:
-                    self.hit_sound.play()
-                self.shake_count = SHAKE_DURATION
-                return False
-        if self.bird_rect.top <= -100 or self.bird_rect.bottom >= FLOOR_Y:
-            self.shake_count = SHAKE_DURATION
-            return False
-        return True
+    def handle_death(self, death_cause):
+        if death_cause == DEATH_PIPE and self.sound_enabled and self.hit_sound:
+            self.hit_sound.play()
+        self.shake_count = SHAKE_DURATION
         
-    def rotate_bird(self):
-        # Target rotation based on movement
-        if self.bird_movement < 0:
-            target_rotation = MAX_BIRD_ROTATION
-        else:
-            target_rotation = MIN_BIRD_ROTATION
-        
-        # Smoothly interpolate towards target
-        if self.bird_rotation < target_rotation:
-            self.bird_rotation += ROTATION_SPEED
-            if self.bird_rotation > target_rotation:
-                self.bird_rotation = target_rotation
-        elif self.bird_rotation > target_rotation:
-            self.bird_rotation -= ROTATION_SPEED
-            if self.bird_rotation < target_rotation:
-                self.bird_rotation = target_rotation
-        
-        rotated_bird = pygame.transform.rotozoom(self.bird, self.bird_rotation, 1)
-        rotated_rect = rotated_bird.get_rect(center=self.bird_rect.center)
-        return rotated_bird, rotated_rect
+    def rotate_bird(self, alpha=1.0, state=None):
+        state = self if state is None else state
+        rotated_bird, half_width, half_height = self.sprites.rotated_bird(state.bird_index, state.bird_rotation)
+        centery = round(state.prev_bird_y + (state.bird_y - state.prev_bird_y) * alpha)
+        return rotated_bird, (state.bird_rect.centerx - half_width, centery - half_height)
         
     def bird_animation(self):
         new_bird = self.bird_frames[self.bird_index]
-        new_bird_rect = new_bird.get_rect(center=self.bird_rect.center)
+        new_bird_rect = new_bird.get_rect(center=(BIRD_START_X, self.sim.bird_y))
         return new_bird, new_bird_rect
         
-    def check_score(self):
-        for pipe in self.pipe_list:
-            pipe_id = id(pipe)
-            if pipe.centerx < self.bird_rect.centerx and pipe_id not in self.passed_pipes:
-                self.score += 1
-                self.passed_pipes.add(pipe_id)
-                if self.sound_enabled:
-                    self.score_sound.play()
-                self.flash_count = FLASH_DURATION
-                self.create_score_particles()
-                self.update_difficulty()
+    def handle_score(self, points):
+        for _ in range(points):
+            if self.sound_enabled and self.score_sound:
+                self.score_sound.play()
+            self.flash_count = FLASH_DURATION
+            self.create_score_particles()
                 
-    def score_display(self, game_state):
-        if game_state == 'main_game':
-            score_surface = self.game_font.render(str(int(self.score)), True, (255, 255, 255))
-            score_rect = score_surface.get_rect(center=(SCREEN_WIDTH//2, 100))
-            
-            score_shadow = self.game_font.render(str(int(self.score)), True, (0, 0, 0))
-            score_shadow_rect = score_shadow.get_rect(center=(SCREEN_WIDTH//2 + 2, 102))
-            
-            self.screen.blit(score_shadow, score_shadow_rect)
-            self.screen.blit(score_surface, score_rect)
-        elif game_state == 'game_over':
-            score_surface = self.game_font.render(f'Score: {int(self.score)}', True, (255, 255, 255))
-            score_rect = score_surface.get_rect(center=(SCREEN_WIDTH//2, 100))
-            self.screen.blit(score_surface, score_rect)
-            
-            high_score_surface = self.game_font.render(f'High Score: {int(self.high_score)}', True, (255, 215, 0))
-            high_score_rect = high_score_surface.get_rect(center=(SCREEN_WIDTH//2, 50))
-            self.screen.blit(high_score_surface, high_score_rect)
-            
-            if self.score >= self.high_score and self.score > 0:
-                new_record_text = self.small_font.render('NEW RECORD!', True, (255, 100, 100))
-                new_record_rect = new_record_text.get_rect(center=(SCREEN_WIDTH//2, 130))
-                self.screen.blit(new_record_text, new_record_rect)
+    def score_display(self, score):
+        self.score_digits.draw(self.canvas, score, (SCREEN_WIDTH//2, 100))
                 
-    def menu_display(self):
-        self.screen.blit(self.game_over_surface, self.game_over_rect)
+    def menu_display(self, high_score):
+        overlay, pos = self.overlays.menu(high_score)
+        self.canvas.blit(overlay, pos)
         
-        if self.high_score > 0:
-            high_score_surface = self.game_font.render(f'High Score: {int(self.high_score)}', True, (255, 215, 0))
-            high_score_rect = high_score_surface.get_rect(center=(SCREEN_WIDTH//2, 50))
-            self.screen.blit(high_score_surface, high_score_rect)
-            
-        # Create semi-transparent background for text
-        text_bg = pygame.Surface((SCREEN_WIDTH - 40, 160), pygame.SRCALPHA)
-        text_bg.fill((0, 0, 0, 150))
-        text_bg_rect = text_bg.get_rect(center=(SCREEN_WIDTH//2, 480))
-        self.screen.blit(text_bg, text_bg_rect)
-        
-        # Split text into two lines
-        start_line1 = self.game_font.render('Press SPACE', True, (255, 255, 255))
-        start_line1_rect = start_line1.get_rect(center=(SCREEN_WIDTH//2, 440))
-        
-        for offset_x, offset_y in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-            start_line1_outline = self.game_font.render('Press SPACE', True, (0, 0, 0))
-            start_line1_outline_rect = start_line1_outline.get_rect(center=(SCREEN_WIDTH//2 + offset_x, 440 + offset_y))
-            self.screen.blit(start_line1_outline, start_line1_outline_rect)
-        self.screen.blit(start_line1, start_line1_rect)
-        
-        start_line2 = self.game_font.render('or Click to Start', True, (255, 255, 255))
-        start_line2_rect = start_line2.get_rect(center=(SCREEN_WIDTH//2, 475))
-        
-        for offset_x, offset_y in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-            start_line2_outline = self.game_font.render('or Click to Start', True, (0, 0, 0))
-            start_line2_outline_rect = start_line2_outline.get_rect(center=(SCREEN_WIDTH//2 + offset_x, 475 + offset_y))
-            self.screen.blit(start_line2_outline, start_line2_outline_rect)
-        self.screen.blit(start_line2, start_line2_rect)
-        
-        controls_text = self.small_font.render('SPACE: Jump | P: Pause | M: Toggle Sound', True, (255, 255, 200))
-        controls_rect = controls_text.get_rect(center=(SCREEN_WIDTH//2, 520))
-        
-        for offset_x, offset_y in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-            controls_outline = self.small_font.render('SPACE: Jump | P: Pause | M: Toggle Sound', True, (0, 0, 0))
-            controls_outline_rect = controls_outline.get_rect(center=(SCREEN_WIDTH//2 + offset_x, 520 + offset_y))
-            self.screen.blit(controls_outline, controls_outline_rect)
-        self.screen.blit(controls_text, controls_rect)
+    def game_over_display(self, score, high_score):
+        overlay, pos = self.overlays.game_over(score, high_score)
+        self.canvas.blit(overlay, pos)
         
     def pause_display(self):
-        pause_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-        pause_surface.fill((0, 0, 0, 128))
-        self.screen.blit(pause_surface, (0, 0))
-        
-        pause_text = self.game_font.render('PAUSED', True, (255, 255, 255))
-        pause_rect = pause_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2))
-        self.screen.blit(pause_text, pause_rect)
-        
-        resume_text = self.small_font.render('Press P or SPACE to Resume', True, (200, 200, 200))
-        resume_rect = resume_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 50))
-        self.screen.blit(resume_text, resume_rect)
+        overlay, pos = self.overlays.pause()
+        self.canvas.blit(overlay, pos)
         
-    def handle_jump(self):
+    def handle_jump(self, stamp=None, measured=True):
+        # measured=False for presses no player made, which have no input latency
+        if stamp is None:
+            stamp = time.perf_counter()
         if self.paused:
             self.paused = False
+            if measured:
+                self.latency.input(stamp)
         elif not self.game_active:
-            self.game_active = True
-            self.game_state = 'game'
-            self.reset_game()
-        elif self.game_active:
-            self.bird_movement = JUMP_STRENGTH
-            if self.sound_enabled:
-                self.flap_sound.play()
-            self.create_jump_particles()
+            self.start_game()
+            if measured:
+                self.latency.input(stamp)
+        elif self.game_active and not self.replay:
+            self.flap_queued = True
+            if measured:
+                self.latency.input(stamp, applied=False)
+            self.flap_effects()
+            
+    def drive_autopilot(self):
+        # Runs before every tick: starts runs from the menu at once and from
+        # the game-over screen after RESTART_TICKS, and flaps when the planner says so
+        if self.paused:
+            return
+        if not self.game_active:
+            self.autopilot_wait += 1
+            if self.game_state == 'menu' or self.autopilot_wait >= RESTART_TICKS:
+                self.autopilot_wait = 0
+                self.handle_jump(measured=False)
+            return
+        with self.tick_profiler.phase('autopilot'):
+            flap = self.autopilot.decide(self.sim)
+        if flap and not self.flap_queued:
+            self.handle_jump(measured=False)
+            
+    def start_game(self):
+        self.game_active = True
+        self.game_state = 'game'
+        self.reset_game()
+        
+    def flap_effects(self):
+        if self.sound_enabled and self.flap_sound:
+            self.flap_sound.play()
+        self.create_jump_particles()
+        
+    def report_divergence(self):
+        # A replay from another config or other collision assets can play out
+        # differently; say so rather than show a different run as the recorded one
+        replay, sim = self.replay, self.sim
+        if sim.done and (sim.tick, sim.score) == (replay.ticks, replay.score):
+            return
+        ending = f'died with {sim.score} at tick {sim.tick}' if sim.done else f'still alive with {sim.score}'
+        print(f"Replay diverged: recorded {replay.score} points in {replay.ticks} ticks, re-simulated run {ending}")
+        
+    def record_run(self):
+        # Queued for the score store's writer thread, replay file included,
+        # so game over costs no disk I/O on this thread
+        replay = (self.recorder.path(), self.recorder.to_bytes(self.sim))
+        self.scores.record(self.score, self.sim.tick, self.sim.seed, replay)
             
     def toggle_sound(self):
         self.sound_enabled = not self.sound_enabled
+        self.apply_volume()
+        
+    def apply_volume(self):
         vol = VOLUME if self.sound_enabled else 0
-        self.flap_sound.set_volume(vol)
-        self.hit_sound.set_volume(vol)
-        self.score_sound.set_volume(vol)
+        for sound in (self.flap_sound, self.hit_sound, self.score_sound):
+            if sound:
+                sound.set_volume(vol)
             
     def update_effects(self, dt):
-        self.particles = [p for p in self.particles if p.update(dt)]
+        self.particles.update(dt)
         
         if self.flash_count > 0:
             self.flash_count -= 1
             
+    def update_shake(self):
+        # Shake moves the camera; draw_frame() has the canvas offset every blit by it
         if self.shake_count > 0:
             self.shake_offset = [
-                random.uniform(-SHAKE_INTENSITY, SHAKE_INTENSITY),
-                random.uniform(-SHAKE_INTENSITY, SHAKE_INTENSITY)
+                self.rng.uniform(-SHAKE_INTENSITY, SHAKE_INTENSITY),
+                self.rng.uniform(-SHAKE_INTENSITY, SHAKE_INTENSITY)
             ]
             self.shake_count -= 1
         else:
             self.shake_offset = [0, 0]
             
-    def draw_effects(self):
-        for particle in self.particles:
-            particle.draw(self.screen)
+    def draw_effects(self, particles, flash_count):
+        self.canvas.draw_group(particles.bounds(), particles.draw)
             
-        if self.flash_count > 0:
-            self.screen.blit(self.flash_surface, (0, 0))
+        if flash_count > 0:
+            self.canvas.blit(self.flash_surface, (0, 0))
             
-    def run(self):
-        while True:
-            dt = self.clock.tick(FPS) / 1000.0 * 60
+    def toggle_profile(self):
+        self.profiler.enable()
+        self.tick_profiler.enable()
+        self.show_profile = not self.show_profile
+        self.profile_hud = None
+        
+    def profile_display(self):
+        # Re-rendering text every frame would show up in the numbers it reports
+        self.profile_hud_age -= 1
+        if self.profile_hud is None or self.profile_hud_age <= 0:
+            lines = [self.small_font.render(line, True, PROFILE_TEXT_COLOR)
+                     for line in self.profiler.hud_lines()]
+            height = sum(line.get_height() for line in lines)
+            hud = pygame.Surface((max(line.get_width() for line in lines) + 8, height + 8), pygame.SRCALPHA)
+            hud.fill(PROFILE_PANEL_COLOR)
+            y = 4
+            for line in lines:
+                hud.blit(line, (4, y))
+                y += line.get_height()
+            self.profile_hud = hud
+            self.profile_hud_age = PROFILE_HUD_REFRESH
+        self.canvas.blit(self.profile_hud, (0, 0))
+        
+    def quit(self):
+        if self.sim_thread:
+            self.sim_thread.stop()
+            print_threaded_summary(self.sim_thread, self.snapshots, self.render_stats)
+        self.scores.close()
+        if self.soak:
+            if self.game_active:
+                self.soak.run_ended(self.sim, self.autopilot, finished=False)
+            self.soak.close()
+        latency = self.latency.summary()
+        if latency['count']:
+            print(f"Input to present ({self.pacing} pacing, {latency['count']} inputs): "
+                  f"p50 {latency['p50_ms']:.1f}  p95 {latency['p95_ms']:.1f}  "
+                  f"p99 {latency['p99_ms']:.1f}  max {latency['max_ms']:.1f} ms")
+        if self.profile_out:
+            self.profiler.dump(self.profile_out)
+            print(f"Profile written to {self.profile_out}")
+            if self.tick_profiler is not self.profiler:
+                stem, ext = os.path.splitext(self.profile_out)
+                self.tick_profiler.dump(f'{stem}-sim{ext}')
+                print(f"Simulation thread profile written to {stem}-sim{ext}")
+        pygame.quit()
+        exit()
             
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.save_high_score()
-                    pygame.quit()
-                    exit()
-                    
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        self.handle_jump()
-                    elif event.key == pygame.K_p:
-                        if self.game_active:
-                            self.paused = not self.paused
-                    elif event.key == pygame.K_m:
-                        self.toggle_sound()
-                    elif event.key == pygame.K_ESCAPE:
-                        if self.paused:
-                            self.paused = False
-                        
-                if event.type == pygame.MOUSEBUTTONDOWN:
-                    self.handle_jump()
-                    
-                if event.type == self.SPAWNPIPE and self.game_active and not self.paused:
-                    self.pipe_list.extend(self.create_pipe())
-                    
-            self.screen.blit(self.bg, (0, 0))
-            
-            if self.game_state == 'menu':
-                self.menu_display()
+    def handle_events(self):
+        events = pygame.event.get()
+        now = time.perf_counter()
+        for event in events:
+            if event.type == pygame.QUIT:
+                self.quit()
                 
-            elif self.game_state == 'game':
-                # Update bird animation
-                self.bird_flap_timer += dt
-                if self.bird_flap_timer >= BIRD_FLAP_RATE:
-                    self.bird_index = (self.bird_index + 1) % len(self.bird_frames)
-                    self.bird, self.bird_rect = self.bird_animation()
-                    self.bird_flap_timer = 0
-                    
-                if self.game_active and not self.paused:
-                    self.bird_movement += GRAVITY
-                    self.bird_rect.centery = int(self.bird_rect.centery + self.bird_movement)
-                    
-                    rotated_bird, rotated_rect = self.rotate_bird()
-                    self.update_trail()
-                    
-                    self.pipe_list = self.move_pipes(self.pipe_list)
-                    self.draw_pipes(self.pipe_list)
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    self.command('handle_jump', getattr(event, 'stamp', now))
+                elif event.key == pygame.K_p:
+                    self.command('toggle_pause')
+                elif event.key == pygame.K_m:
+                    self.command('toggle_sound')
+                elif event.key == pygame.K_F3:
+                    self.toggle_profile()
+                elif event.key == pygame.K_ESCAPE:
+                    self.command('unpause')
                     
-                    self.draw_trail()
-                    self.screen.blit(rotated_bird, rotated_rect)
-                    
-                    self.game_active = self.check_collision(self.pipe_list)
-                    self.check_score()
-                    self.score_display('main_game')
-                    self.update_effects(dt)
-                    self.draw_effects()
-                    
-                    if not self.game_active:
-                        if self.score > self.high_score:
-                            self.high_score = int(self.score)
-                            self.save_high_score()
-                        self.game_state = 'game_over'
-                elif self.paused:
-                    self.pipe_list = self.move_pipes(self.pipe_list)
-                    self.draw_pipes(self.pipe_list)
-                    self.screen.blit(self.bird, self.bird_rect)
-                    self.score_display('main_game')
-                    self.pause_display()
-                else:
-                    self.screen.blit(self.game_over_surface, self.game_over_rect)
-                    self.score_display('game_over')
-                    
-                    # Create semi-transparent background for text
-                    text_bg = pygame.Surface((SCREEN_WIDTH - 40, 100), pygame.SRCALPHA)
-                    text_bg.fill((0, 0, 0, 150))
-                    text_bg_rect = text_bg.get_rect(center=(SCREEN_WIDTH//2, 520))
-                    self.screen.blit(text_bg, text_bg_rect)
-                    
-                    # Split text into two lines
-                    restart_line1 = self.game_font.render('Press SPACE', True, (255, 255, 255))
-                    restart_line1_rect = restart_line1.get_rect(center=(SCREEN_WIDTH//2, 500))
-                    
-                    for offset_x, offset_y in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-                        restart_line1_outline = self.game_font.render('Press SPACE', True, (0, 0, 0))
-                        restart_line1_outline_rect = restart_line1_outline.get_rect(center=(SCREEN_WIDTH//2 + offset_x, 500 + offset_y))
-                        self.screen.blit(restart_line1_outline, restart_line1_outline_rect)
-                    self.screen.blit(restart_line1, restart_line1_rect)
-                    
-                    restart_line2 = self.game_font.render('or Click to Restart', True, (255, 255, 255))
-                    restart_line2_rect = restart_line2.get_rect(center=(SCREEN_WIDTH//2, 535))
-                    
-                    for offset_x, offset_y in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-                        restart_line2_outline = self.game_font.render('or Click to Restart', True, (0, 0, 0))
-                        restart_line2_outline_rect = restart_line2_outline.get_rect(center=(SCREEN_WIDTH//2 + offset_x, 535 + offset_y))
-                        self.screen.blit(restart_line2_outline, restart_line2_outline_rect)
-                    self.screen.blit(restart_line2, restart_line2_rect)
-                    
-            elif self.game_state == 'game_over':
-                self.screen.blit(self.game_over_surface, self.game_over_rect)
-                self.score_display('game_over')
-                
-                # Create semi-transparent background for text
-                text_bg = pygame.Surface((SCREEN_WIDTH - 40, 100), pygame.SRCALPHA)
-                text_bg.fill((0, 0, 0, 150))
-                text_bg_rect = text_bg.get_rect(center=(SCREEN_WIDTH//2, 520))
-                self.screen.blit(text_bg, text_bg_rect)
-                
-                # Split text into two lines
-                restart_line1 = self.game_font.render('Press SPACE', True, (255, 255, 255))
-                restart_line1_rect = restart_line1.get_rect(center=(SCREEN_WIDTH//2, 500))
-                
-                for offset_x, offset_y in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-                    restart_line1_outline = self.game_font.render('Press SPACE', True, (0, 0, 0))
-                    restart_line1_outline_rect = restart_line1_outline.get_rect(center=(SCREEN_WIDTH//2 + offset_x, 500 + offset_y))
-                    self.screen.blit(restart_line1_outline, restart_line1_outline_rect)
-                self.screen.blit(restart_line1, restart_line1_rect)
+            if event.type == pygame.MOUSEBUTTONDOWN:
+                self.command('handle_jump', getattr(event, 'stamp', now))
                 
-                restart_line2 = self.game_font.render('or Click to Restart', True, (255, 255, 255))
-                restart_line2_rect = restart_line2.get_rect(center=(SCREEN_WIDTH//2, 535))
-                
-                for offset_x, offset_y in [(-2, -2), (-2, 2), (2, -2), (2, 2)]:
-                    restart_line2_outline = self.game_font.render('or Click to Restart', True, (0, 0, 0))
-                    restart_line2_outline_rect = restart_line2_outline.get_rect(center=(SCREEN_WIDTH//2 + offset_x, 535 + offset_y))
-                    self.screen.blit(restart_line2_outline, restart_line2_outline_rect)
-                self.screen.blit(restart_line2, restart_line2_rect)
-                
-            self.floor_x_pos -= FLOOR_SPEED
-            self.draw_floor()
-            if self.floor_x_pos <= -SCREEN_WIDTH:
-                self.floor_x_pos = 0
+    def command(self, name, *args):
+        # Input that changes the game. With --threaded only the simulation
+        # thread touches the game state, so it runs these before its next tick.
+        if self.commands is None:
+            getattr(self, name)(*args)
+        else:
+            self.commands.append((name, args))
+            
+    def toggle_pause(self):
+        if self.game_active:
+            self.paused = not self.paused
+            
+    def unpause(self):
+        self.paused = False
+        
+    def threaded_tick(self):
+        # One tick on the simulation thread, with the input queued since the last
+        profiler = self.tick_profiler
+        profiler.begin_frame()
+        commands = self.commands
+        while commands:
+            name, args = commands.popleft()
+            getattr(self, name)(*args)
+        self.update_tick()
+        profiler.end_frame()
+
+    def update_tick(self):
+        # One fixed simulation tick. Effects were tuned in 60 Hz frames.
+        dt = 60 / TICK_RATE
+        if self.autopilot:
+            self.drive_autopilot()
+        if self.replay and self.game_active and self.sim.tick >= self.replay.ticks:
+            # The recording is over but the re-simulated run is not: stop
+            # instead of reading flaps past its end
+            self.game_active = False
+            self.game_state = 'game_over'
+            self.report_divergence()
+        if self.game_state == 'game' and self.game_active and not self.paused:
+            flap = self.flap_queued
+            if self.replay:
+                flap = self.replay.flap(self.sim.tick)
+                if flap:
+                    self.flap_effects()
+            elif self.recorder:
+                self.recorder.record(self.sim, flap)
+            with self.tick_profiler.phase('simulation'):
+                _, points, done, info = self.sim.step(flap)
+            if self.flap_queued:
+                self.latency.apply()
+            self.flap_queued = False
+            self.bird_index = self.sim.bird_index
+            self.bird, self.bird_rect = self.bird_animation()
+            self.update_trail()
+            
+            if done:
+                self.game_active = False
+                self.handle_death(info['death_cause'])
+            self.handle_score(points)
+            with self.tick_profiler.phase('particles'):
+                self.update_effects(dt)
+            
+            if not self.game_active:
+                if self.replay:
+                    self.report_divergence()
+                if self.recorder:
+                    self.record_run()
+                    if self.score > self.high_score:
+                        self.high_score = int(self.score)
+                if self.soak:
+                    self.soak.run_ended(self.sim, self.autopilot)
+                self.game_state = 'game_over'
                 
-            if self.shake_count > 0:
-                shake_surf = self.screen.copy()
-                self.screen.blit(shake_surf, (int(self.shake_offset[0]), int(self.shake_offset[1])))
+        if not self.paused:
+            with self.tick_profiler.phase('shake'):
+                self.update_shake()
+            
+        self.floor_x_pos -= FLOOR_SPEED
+        if self.floor_x_pos <= -SCREEN_WIDTH:
+            self.floor_x_pos = 0
+            
+    def draw_frame(self, alpha=1.0, state=None):
+        # alpha: how far between the previous and the current tick to draw.
+        # state: a FrameSnapshot to draw instead of the live game.
+        state = self if state is None else state
+        phase = self.profiler.phase
+        self.canvas.camera = state.camera
+        with phase('draw_background'):
+            self.canvas.blit(self.bg, (0, 0))
+        
+        if state.game_state == 'menu':
+            with phase('draw_overlay'):
+                self.menu_display(state.high_score)
+            
+        elif state.game_state == 'game':
+            if state.game_active and not state.paused:
+                with phase('draw_pipes'):
+                    self.draw_pipes(state.pipes, alpha)
+                with phase('draw_trail'):
+                    self.draw_trail(state.trail, state.bird_index)
+                with phase('draw_bird'):
+                    rotated_bird, rotated_rect = self.rotate_bird(alpha, state)
+                    self.canvas.blit(rotated_bird, rotated_rect)
+                with phase('draw_score'):
+                    self.score_display(state.score)
+                with phase('draw_effects'):
+                    self.draw_effects(state.particles, state.flash_count)
+            elif state.paused:
+                with phase('draw_pipes'):
+                    self.draw_pipes(state.pipes)
+                with phase('draw_bird'):
+                    self.canvas.blit(state.bird, state.bird_rect)
+                with phase('draw_score'):
+                    self.score_display(state.score)
+                with phase('draw_overlay'):
+                    self.pause_display()
                 
-            pygame.display.update()
+        elif state.game_state == 'game_over':
+            with phase('draw_overlay'):
+                self.game_over_display(state.score, state.high_score)
+            
+        with phase('draw_floor'):
+            self.draw_floor(state.floor_x_pos)
+        
+    def run(self):
+        pacer = self.pacer
+        soak = self.soak
+        last_present = None
+        while True:
+            elapsed = pacer.wait()
+            frame_start = time.perf_counter()
+            profiler = self.profiler
+            profiler.begin_frame()
+            with profiler.phase('events'):
+                self.handle_events()
+            if self.timestep.unthrottled:
+                self.fast_forward()
+            for tick in range(self.timestep.advance(elapsed)):
+                if pacer.late_input and tick:
+                    with profiler.phase('events'):
+                        self.handle_events()
+                self.update_tick()
+            self.draw_frame(self.timestep.alpha)
+            if self.show_profile:
+                self.profile_display()
+            with profiler.phase('present'):
+                self.canvas.present()
+            now = time.perf_counter()
+            self.latency.presented(now)
+            pacer.presented()
+            profiler.end_frame()
+            if soak:
+                soak.frame((now - frame_start) * 1000, None if last_present is None else (now - last_present) * 1000)
+                if soak.expired():
+                    self.quit()
+            last_present = now
+            if self.first_frame_ms is None:
+                self.first_frame_ms = (time.perf_counter() - self.launch_time) * 1000
+                print(f"First frame after {self.first_frame_ms:.1f} ms (assets from {self.assets.source})", flush=True)
+
+    def fast_forward(self):
+        # Unthrottled: up to MAX_SPEED_TICKS_PER_FRAME ticks within the frame
+        # budget, then draw once. Off the game screen that is one tick per
+        # frame, so shake and the floor keep moving on the menu and game-over
+        # screens.
+        deadline = time.perf_counter() + 1.0 / FPS
+        self.update_tick()
+        for _ in range(MAX_SPEED_TICKS_PER_FRAME - 1):
+            if self.game_state != 'game' or time.perf_counter() >= deadline:
+                break
+            self.update_tick()
+
+    def run_threaded(self):
+        # The simulation thread ticks on its own schedule; this loop reads
+        # input, draws the newest snapshot and presents it
+        sys.setswitchinterval(SWITCH_INTERVAL)
+        snapshots = self.snapshots
+        publish = lambda: snapshots.publish(FrameSnapshot.capture(self))
+        publish()
+        self.sim_thread = SimulationThread(self.threaded_tick, publish, TICK_RATE, self.timestep.speed)
+        self.sim_thread.start()
+        tick_time = self.sim_thread.tick_time
+        pacer = self.pacer
+        profiler = self.profiler
+        while True:
+            pacer.wait()
+            profiler.begin_frame()
+            with profiler.phase('events'):
+                self.handle_events()
+            self.sim_thread.check()
+            state, _ = snapshots.acquire()
+            # Between the snapshot's previous and current tick, as far as the
+            # time since it was taken; the next snapshot picks up from there
+            alpha = 1.0 if tick_time is None else min(1.0, (time.perf_counter() - state.time) / tick_time)
+            self.draw_frame(alpha, state)
+            if self.show_profile:
+                self.profile_display()
+            with profiler.phase('present'):
+                self.canvas.present()
+            now = time.perf_counter()
+            self.latency.presented(now, state.time)
+            self.render_stats.presented(now)
+            pacer.presented()
+            profiler.end_frame()
+            if self.first_frame_ms is None:
+                self.first_frame_ms = (time.perf_counter() - self.launch_time) * 1000
+                print(f"First frame after {self.first_frame_ms:.1f} ms (assets from {self.assets.source})", flush=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser(description='Flappy Bird')
+    parser.add_argument('--seed', type=int, default=None, help='seed for pipe heights and effects')
+    parser.add_argument('--renderer', choices=sorted(RENDERERS), default='full',
+                        help='full: redraw and push the whole window every frame; '
+                             'dirty: repaint and push only the regions that changed')
+    parser.add_argument('--speed', type=float, default=1.0,
+                        help='simulation speed multiplier, e.g. 4 to fast-forward')
+    parser.add_argument('--replay', metavar='FILE', help='watch a recorded run')
+    parser.add_argument('--replay-speed', choices=['1', '4', 'max'], default='1',
+                        help='playback speed for --replay')
+    parser.add_argument('--episodes', type=int, default=0,
+                        help='play this many headless episodes instead of opening a window')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='worker processes for --episodes and --train (default: one per CPU core)')
+    parser.add_argument('--tick-rate', type=int, default=TICK_RATE,
+                        help=f'decisions per second for --episodes; must divide {TICK_RATE} and be at least 2')
+    parser.add_argument('--train', action='store_true',
+                        help='evolve neural-network flap policies headless instead of opening a window')
+    parser.add_argument('--population', type=int, default=DEFAULT_POPULATION, help='genomes per generation for --train')
+    parser.add_argument('--generations', type=int, default=DEFAULT_GENERATIONS, help='generations for --train')
+    parser.add_argument('--train-ticks', type=int, default=DEFAULT_MAX_TICKS,
+                        help='longest game a genome plays per generation, in ticks')
+    parser.add_argument('--checkpoint', metavar='FILE', default=CHECKPOINT_FILE,
+                        help='--train saves the best genomes here after every generation and resumes from it')
+    parser.add_argument('--genome', metavar='FILE',
+                        help='let the best genome of a --train checkpoint play, restarting after every game over')
+    parser.add_argument('--collision', choices=COLLISION_MODES, default=COLLISION_RECT,
+                        help='rect: bird rect vs pipe rects; pixel: drawn bird pixels, rotation included')
+    parser.add_argument('--pacing', choices=PACING_MODES, default='tick',
+                        help='tick: clock.tick(FPS); busy: tick_busy_loop(FPS); uncapped: no frame cap, '
+                             'interpolated; late: read input just before the frame deadline and each tick')
+    parser.add_argument('--autopilot', action='store_true',
+                        help='let a lookahead planner play, restarting after every game over')
+    parser.add_argument('--soak-log', metavar='FILE',
+                        help='append one JSON line per run to FILE: score, frame times, hitches, '
+                             'planner times and memory')
+    parser.add_argument('--soak-minutes', type=float, default=None,
+                        help='quit after this many minutes, e.g. for an unattended --autopilot session')
+    parser.add_argument('--threaded', action='store_true',
+                        help='run the simulation on its own thread at a fixed rate; the main thread '
+                             'draws the newest state it published')
+    parser.add_argument('--no-asset-pack', action='store_true',
+                        help=f'decode the asset files even if {ASSET_PACK_FILE} is up to date')
+    parser.add_argument('--profile', action='store_true',
+                        help='time every frame phase and show the overlay (toggle with F3)')
+    parser.add_argument('--profile-out', metavar='FILE',
+                        help='write the phase timings to FILE (.json or .csv) on exit')
+    args = parser.parse_args()
+    if args.autopilot and args.replay:
+        parser.error('--autopilot cannot drive a --replay')
+    if args.genome and (args.autopilot or args.replay):
+        parser.error('--genome cannot be combined with --autopilot or --replay')
+    if args.threaded and args.soak_log:
+        parser.error('--soak-log times the single-threaded loop; it cannot be combined with --threaded')
+    return args
 
 if __name__ == '__main__':
-    game = FlappyBirdGame()
-    game.run()
+    args = parse_args()
+    if args.episodes:
+        from rollout import print_rollout_summary
+        print_rollout_summary(args.episodes, args.workers, seed=args.seed or 0, tick_rate=args.tick_rate)
+    elif args.train:
+        train(args.population, args.generations, args.workers, seed=args.seed or 0, max_ticks=args.train_ticks,
+              checkpoint=args.checkpoint)
+    else:
+        speed = args.speed
+        replay = None
+        if args.replay:
+            replay = Replay.load(args.replay)
+            speed = None if args.replay_speed == 'max' else float(args.replay_speed)
+        autopilot = GenomePilot.load(args.genome) if args.genome else args.autopilot
+        game = FlappyBirdGame(args.seed, renderer=args.renderer, speed=speed, replay=replay,
+                              profile=args.profile, profile_out=args.profile_out, collision=args.collision,
+                              asset_pack=None if args.no_asset_pack else ASSET_PACK_FILE, pacing=args.pacing,
+                              autopilot=autopilot, soak_log=args.soak_log, soak_minutes=args.soak_minutes,
+                              threaded=args.threaded)
+        if args.threaded:
+            game.run_threaded()
+        else:
+            game.run()
@@ -0,0 +1,174 @@
+import argparse
+import asyncio
+import random
+import time
+
+from config import TICK_RATE, PIPE_GAP
+from server import (
+    DEFAULT_HOST, DEFAULT_PORT, HELLO, HELLO_MAGIC, PROTOCOL_VERSION, FLAP, RECORD_SIZE, FLAPPED_BIT,
+    SessionView, raise_file_limit,
+)
+from simulation import DEATH_CAUSES
+from stats import Histogram
+
+# Load generator for server.py: opens many sessions from one process. Most
+# clients flap at random, about as often as a player, and only count what
+# they receive. The first --play clients rebuild their game from the records
+# with SessionView and play it with the flap-below-gap rule, which checks
+# the protocol and the scores end to end. Reports records per second against
+# the expected sessions * tick rate, and the time from sending a flap to
+# receiving the record of the tick that applied it.
+
+CONNECT_BATCH = 250
+FLAPS_PER_SECOND = 2.0
+REPORT_SECONDS = 5.0
+
+
+class LoadClient(asyncio.Protocol):
+    def __init__(self, stats, play):
+        self.stats = stats
+        self.view = SessionView() if play else None
+        self.transport = None
+        self.hello = b''
+        self.session = None
+        self.pending = b''
+        self.flap_sent = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def data_received(self, data):
+        if self.session is None:
+            self.hello += data
+            if len(self.hello) < HELLO.size:
+                return
+            magic, version, self.session, _ = HELLO.unpack_from(self.hello)
+            if magic != HELLO_MAGIC or version != PROTOCOL_VERSION:
+                raise ValueError(f'unexpected hello {self.hello[:HELLO.size]!r}')
+            data = self.hello[HELLO.size:]
+            self.stats.connected += 1
+        if self.pending:
+            data = self.pending + data
+        usable = len(data) - len(data) % RECORD_SIZE
+        self.pending = data[usable:]
+        stats = self.stats
+        stats.records += usable // RECORD_SIZE
+        stats.bytes += len(data)
+        if self.flap_sent is not None:
+            for offset in range(1, usable, RECORD_SIZE):
+                if data[offset] & FLAPPED_BIT:
+                    stats.flap_latency.add((time.perf_counter() - self.flap_sent) * 1000)
+                    self.flap_sent = None
+                    break
+        view = self.view
+        if view is not None:
+            for offset in range(0, usable, RECORD_SIZE):
+                dy = data[offset] - 256 if data[offset] > 127 else data[offset]
+                ended = view.apply(dy, data[offset + 1])
+                if ended:
+                    cause, score = ended
+                    stats.scores.append(score)
+                    stats.causes[DEATH_CAUSES[cause]] = stats.causes.get(DEATH_CAUSES[cause], 0) + 1
+
+    def connection_lost(self, exc):
+        if self.session is not None:
+            self.stats.disconnected += 1
+
+    def flap(self):
+        if self.transport.is_closing():
+            return
+        self.transport.write(FLAP)
+        if self.flap_sent is None:
+            self.flap_sent = time.perf_counter()
+
+    def wants_flap(self):
+        # Flap-below-gap on the rebuilt state (rollout.flap_below_gap)
+        view = self.view
+        pipe = view.next_pipe()
+        gap_center = (pipe[1] if pipe else 400) - PIPE_GAP / 2
+        return view.bird_y > gap_center + 40 and view.bird_movement >= 0
+
+
+class LoadStats:
+    def __init__(self):
+        self.connected = 0
+        self.disconnected = 0
+        self.records = 0
+        self.bytes = 0
+        self.flap_latency = Histogram()
+        self.scores = []
+        self.causes = {}
+
+
+async def connect(loop, host, port, stats, count, play):
+    clients = []
+    for start in range(0, count, CONNECT_BATCH):
+        batch = [loop.create_connection(lambda index=index: LoadClient(stats, index < play), host, port)
+                 for index in range(start, min(count, start + CONNECT_BATCH))]
+        for _, client in await asyncio.gather(*batch):
+            clients.append(client)
+        await asyncio.sleep(0.05)
+    return clients
+
+
+async def generate(host, port, sessions, seconds, play, seed):
+    loop = asyncio.get_running_loop()
+    stats = LoadStats()
+    rng = random.Random(seed)
+    clients = await connect(loop, host, port, stats, sessions, play)
+    players = clients[:play]
+    others = clients[play:]
+    print(f'{stats.connected} sessions open, {len(players)} playing from rebuilt state', flush=True)
+
+    interval = 1.0 / TICK_RATE
+    flaps_per_tick = FLAPS_PER_SECOND * len(others) / TICK_RATE
+    start = last_report = time.perf_counter()
+    records_at_report = 0
+    while time.perf_counter() - start < seconds:
+        await asyncio.sleep(interval)
+        for client in players:
+            if client.session is not None and client.wants_flap():
+                client.flap()
+        # Poisson-like: the expected number of random flappers per tick
+        count = int(flaps_per_tick) + (rng.random() < flaps_per_tick % 1)
+        for client in rng.sample(others, min(count, len(others))):
+            if client.session is not None:
+                client.flap()
+        now = time.perf_counter()
+        if now - last_report >= REPORT_SECONDS:
+            received = (stats.records - records_at_report) / (now - last_report)
+            expected = (stats.connected - stats.disconnected) * TICK_RATE
+            latency = stats.flap_latency.summary()
+            print(f'{received:>9,.0f} records/s of {expected:,} expected  '
+                  f"flap to record p50 {latency['p50_ms']:.1f} p99 {latency['p99_ms']:.1f} "
+                  f"max {latency['max_ms']:.1f} ms  disconnected {stats.disconnected}", flush=True)
+            stats.flap_latency = Histogram()
+            records_at_report = stats.records
+            last_report = now
+
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        client.transport.close()
+    print(f'{stats.records / elapsed:,.0f} records/s, {stats.bytes / elapsed / 1024:,.0f} KiB/s in over '
+          f'{elapsed:.0f} s')
+    if stats.scores:
+        scores = sorted(stats.scores)
+        print(f'{len(scores)} played games ended: median score {scores[len(scores) // 2]}, best {scores[-1]}, '
+              f'causes {stats.causes}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Drive server.py with many sessions')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--sessions', type=int, default=5000)
+    parser.add_argument('--seconds', type=float, default=30)
+    parser.add_argument('--play', type=int, default=20, help='sessions that play from the rebuilt game state')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    raise_file_limit()
+    asyncio.run(generate(args.host, args.port, args.sessions, args.seconds, args.play, args.seed))
+
+
+if __name__ == '__main__':
+    main()
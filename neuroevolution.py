@@ -0,0 +1,283 @@
+import multiprocessing
+import os
+import struct
+import time
+from multiprocessing.sharedctypes import RawArray
+
+import numpy as np
+
+from batch_env import BatchFlappyEnv
+from config import TICK_RATE, SCREEN_WIDTH, SCREEN_HEIGHT, POINTS_PER_PIPE
+from stats import Histogram
+
+# Evolves small neural-network flap policies (game.py --train). Every genome
+# is a 4-HIDDEN-1 tanh network in one flat float32 vector. Its inputs are the
+# observation of BatchFlappyEnv and FlappySimulation: bird y, bird velocity,
+# distance to the next pipe and that pipe's gap center. It flaps when its
+# output is positive.
+#
+# A generation plays one game per genome. The population is split into
+# CHUNK_SIZE slices, and each slice is one BatchFlappyEnv in a worker
+# process. The hidden layer for the whole slice is one batched matrix
+# multiply per tick, and a slice stops as soon as all of its games have
+# ended. Genomes and fitness live in shared arrays. Each slice has its own
+# seed, so results do not depend on the number of workers. Between
+# generations the parent keeps the elites, breeds the rest from the top
+# PARENT_FRACTION by uniform crossover, and mutates them with gaussian noise.
+#
+# Checkpoint layout (little endian):
+#   header   magic, version, inputs, hidden units, genome count, generation
+#   fitness  genome count float32, best first
+#   genomes  genome count * genome_size(hidden) float32
+
+INPUTS = 4
+HIDDEN = 8
+DEFAULT_POPULATION = 10_000
+DEFAULT_GENERATIONS = 50
+# One minute of game time per game; a genome that lasts that long is done
+DEFAULT_MAX_TICKS = 60 * TICK_RATE
+# Small and fixed, so every worker gets slices even for small populations and
+# the slices (and their seeds) are the same for any number of workers
+CHUNK_SIZE = 256
+# Fitness is ticks survived plus PIPE_FITNESS per pipe passed, minus
+# GAP_MISS_FITNESS per pixel between the bird and the gap center at death,
+# which ranks the many early deaths by how close they came
+PIPE_FITNESS = 100
+GAP_MISS_FITNESS = 1.0
+ELITE_FRACTION = 0.02
+PARENT_FRACTION = 0.2
+MUTATION_RATE = 0.2
+MUTATION_SIGMA = 0.3
+INIT_SIGMA = 1.0
+CHECKPOINT_FILE = 'genomes.fbne'
+CHECKPOINT_GENOMES = 16
+SEED_STRIDE = 2 ** 20
+
+MAGIC = b'FBNE'
+VERSION = 1
+HEADER = struct.Struct('<4sBBBHI')
+
+# Inputs are centered and scaled so that 100 pixels, or a velocity of 5,
+# is 1: fine enough that the few pixels between flying into and over a
+# pipe make a difference with weights near 1
+INPUT_OFFSET = np.array([SCREEN_HEIGHT / 2, 0.0, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2], dtype=np.float32)
+INPUT_SCALE = np.array([1 / 100, 1 / 5, 1 / 100, 1 / 100], dtype=np.float32)
+
+_population = None
+
+
+def genome_size(hidden=HIDDEN):
+    return INPUTS * hidden + hidden + hidden + 1
+
+
+def split_genomes(genomes, hidden=HIDDEN):
+    # Views into a (count, genome_size) array: w1 (count, INPUTS, hidden),
+    # b1 (count, hidden), w2 (count, hidden), b2 (count,)
+    count = len(genomes)
+    w1_end = INPUTS * hidden
+    w1 = genomes[:, :w1_end].reshape(count, INPUTS, hidden)
+    b1 = genomes[:, w1_end:w1_end + hidden]
+    w2 = genomes[:, w1_end + hidden:w1_end + 2 * hidden]
+    b2 = genomes[:, -1]
+    return w1, b1, w2, b2
+
+
+def decide(obs, layers):
+    # obs (count, INPUTS) -> flap (count,) for count genomes at once
+    w1, b1, w2, b2 = layers
+    x = (obs.astype(np.float32) - INPUT_OFFSET) * INPUT_SCALE
+    hidden = np.tanh(np.einsum('pi,pih->ph', x, w1) + b1)
+    return np.einsum('ph,ph->p', hidden, w2) + b2 > 0
+
+
+class Population:
+    # Genomes and their last fitness in shared memory for the worker pool
+    def __init__(self, size, hidden=HIDDEN):
+        self.size = size
+        self.hidden = hidden
+        self.genome_data = RawArray('f', size * genome_size(hidden))
+        self.fitness_data = RawArray('f', size)
+        self.pipes_data = RawArray('i', size)
+
+    @property
+    def genomes(self):
+        return np.frombuffer(self.genome_data, dtype=np.float32).reshape(self.size, genome_size(self.hidden))
+
+    @property
+    def fitness(self):
+        return np.frombuffer(self.fitness_data, dtype=np.float32)
+
+    @property
+    def pipes(self):
+        return np.frombuffer(self.pipes_data, dtype=np.int32)
+
+
+def _init_worker(population):
+    global _population
+    _population = population
+
+
+def _evaluate_chunk(args):
+    start, stop, seed, max_ticks = args
+    population = _population
+    layers = split_genomes(population.genomes[start:stop], population.hidden)
+    count = stop - start
+    env = BatchFlappyEnv(count, seed)
+    obs = env.observe()
+    alive = np.ones(count, dtype=bool)
+    ticks = np.full(count, max_ticks, dtype=np.int32)
+    pipes = np.zeros(count, dtype=np.int32)
+    miss = np.zeros(count, dtype=np.float32)
+    for tick in range(max_ticks):
+        last = obs
+        obs, _, done, info = env.step(decide(obs, layers))
+        ended = done & alive
+        if ended.any():
+            # Finished games restart at once; only the first game counts
+            ticks[ended] = tick + 1
+            pipes[ended] = info['episode_score'][ended] // POINTS_PER_PIPE
+            miss[ended] = np.abs(last[ended, 0] - last[ended, 3])
+            alive &= ~done
+            if not alive.any():
+                break
+    pipes[alive] = env.score[alive] // POINTS_PER_PIPE
+    population.fitness[start:stop] = ticks + PIPE_FITNESS * pipes - GAP_MISS_FITNESS * miss
+    population.pipes[start:stop] = pipes
+    return count
+
+
+def next_generation(genomes, fitness, rng):
+    # Elites unchanged, the rest bred from the top PARENT_FRACTION
+    size = len(genomes)
+    order = np.argsort(-fitness, kind='stable')
+    elites = max(1, int(size * ELITE_FRACTION))
+    parents = genomes[order[:max(2, int(size * PARENT_FRACTION))]]
+    children = size - elites
+    a = parents[rng.integers(len(parents), size=children)]
+    b = parents[rng.integers(len(parents), size=children)]
+    offspring = np.where(rng.random(a.shape) < 0.5, a, b)
+    mutate = rng.random(offspring.shape) < MUTATION_RATE
+    offspring += mutate * rng.normal(0, MUTATION_SIGMA, offspring.shape).astype(np.float32)
+    return np.concatenate([genomes[order[:elites]], offspring])
+
+
+def save_checkpoint(path, genomes, fitness, generation, hidden=HIDDEN):
+    header = HEADER.pack(MAGIC, VERSION, INPUTS, hidden, len(genomes), generation)
+    data = b''.join([header, np.asarray(fitness, dtype='<f4').tobytes(), np.asarray(genomes, dtype='<f4').tobytes()])
+    # Written aside and renamed, so an interrupted run keeps the previous checkpoint
+    temp = f'{path}.tmp'
+    with open(temp, 'wb') as f:
+        f.write(data)
+    os.replace(temp, path)
+
+
+def load_checkpoint(path):
+    # Returns (genomes, fitness, generation, hidden), best genome first
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        raise ValueError(f'{path} is not a genome checkpoint')
+    magic, version, inputs, hidden, count, generation = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION or inputs != INPUTS:
+        raise ValueError(f'{path} is not a genome checkpoint or has an unsupported version')
+    size = genome_size(hidden)
+    if len(data) != HEADER.size + 4 * count * (1 + size):
+        raise ValueError(f'{path} is truncated')
+    fitness = np.frombuffer(data, dtype='<f4', count=count, offset=HEADER.size)
+    genomes = np.frombuffer(data, dtype='<f4', count=count * size,
+                            offset=HEADER.size + 4 * count).reshape(count, size)
+    return genomes.astype(np.float32), fitness.astype(np.float32), generation, hidden
+
+
+class GenomePilot:
+    # Plays one genome in the real game through the autopilot hooks of
+    # FlappyBirdGame: decide(sim) is called before every tick
+    over_budget = 0
+    doomed = 0
+
+    def __init__(self, genome, hidden=HIDDEN):
+        self.layers = split_genomes(np.asarray(genome, dtype=np.float32).reshape(1, -1), hidden)
+        self.times = Histogram()
+
+    @classmethod
+    def load(cls, path):
+        genomes, _, _, hidden = load_checkpoint(path)
+        return cls(genomes[0], hidden)
+
+    def decide(self, sim):
+        start = time.perf_counter()
+        flap = bool(decide(np.array([sim.observe()]), self.layers)[0])
+        self.times.add((time.perf_counter() - start) * 1000)
+        return flap
+
+    def take_times(self):
+        times, self.times = self.times, Histogram()
+        return times
+
+
+def train(population_size=DEFAULT_POPULATION, generations=DEFAULT_GENERATIONS, workers=None, seed=0,
+          max_ticks=DEFAULT_MAX_TICKS, checkpoint=CHECKPOINT_FILE, hidden=HIDDEN):
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(seed)
+    population = Population(population_size, hidden)
+    genomes = population.genomes
+    first_generation = 0
+    genomes[:] = rng.normal(0, INIT_SIGMA, genomes.shape)
+    if checkpoint and os.path.exists(checkpoint):
+        # Resume: the saved genomes and mutants of them replace the random start
+        saved, _, first_generation, saved_hidden = load_checkpoint(checkpoint)
+        if saved_hidden != hidden:
+            raise ValueError(f'{checkpoint} has {saved_hidden} hidden units, not {hidden}')
+        parents = saved[rng.integers(len(saved), size=population_size)]
+        mutate = rng.random(parents.shape) < MUTATION_RATE
+        genomes[:] = parents + mutate * rng.normal(0, MUTATION_SIGMA, parents.shape)
+        genomes[:len(saved)] = saved
+        print(f'Resuming from {checkpoint} (generation {first_generation})')
+
+    slices = [(start, min(population_size, start + CHUNK_SIZE)) for start in range(0, population_size, CHUNK_SIZE)]
+    pool = None
+    if workers > 1:
+        pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=(population,))
+    else:
+        _init_worker(population)
+    print(f'Population {population_size} ({genome_size(hidden)} weights each) on {workers} worker(s), '
+          f'{len(slices)} slices, up to {max_ticks} ticks per game')
+    print(f"{'gen':>5} {'best fit':>9} {'best pipes':>10} {'mean pipes':>10} {'p90 pipes':>9} "
+          f"{'seconds':>8} {'gens/min':>8}")
+    start = time.perf_counter()
+    best = None
+    try:
+        for generation in range(first_generation, first_generation + generations):
+            generation_start = time.perf_counter()
+            # New pipes every generation, so genomes cannot memorize one course
+            tasks = [(low, high, (seed * SEED_STRIDE + generation) * SEED_STRIDE + index, max_ticks)
+                     for index, (low, high) in enumerate(slices)]
+            if pool:
+                for _ in pool.imap_unordered(_evaluate_chunk, tasks):
+                    pass
+            else:
+                for task in tasks:
+                    _evaluate_chunk(task)
+
+            fitness, pipes = population.fitness, population.pipes
+            order = np.argsort(-fitness, kind='stable')
+            top = order[:CHECKPOINT_GENOMES]
+            best = (float(fitness[top[0]]), int(pipes[top[0]]))
+            if checkpoint:
+                save_checkpoint(checkpoint, genomes[top], fitness[top], generation + 1, hidden)
+            elapsed = time.perf_counter() - start
+            done = generation + 1 - first_generation
+            print(f'{generation + 1:>5} {best[0]:>9.0f} {best[1]:>10} {pipes.mean():>10.2f} '
+                  f'{np.percentile(pipes, 90):>9.0f} {time.perf_counter() - generation_start:>8.2f} '
+                  f'{done / elapsed * 60:>8.1f}', flush=True)
+            genomes[:] = next_generation(genomes, fitness, rng)
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+    elapsed = time.perf_counter() - start
+    print(f'{generations} generations in {elapsed:.1f}s ({generations / elapsed * 60:.1f} generations/min)')
+    if checkpoint:
+        print(f'Best {CHECKPOINT_GENOMES} genomes in {checkpoint}; watch the best with '
+              f'python game.py --genome {checkpoint}')
+    return best
@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+import pygame
+
+from game import FlappyBirdGame
+from simulation import COLLISION_RECT
+
+# Pixel observations for agents that learn from the rendered frame.
+#
+# screen_array() exposes a surface as a NumPy array without copying. The
+# PixelObserver pipeline makes exactly one pixel copy per observation, and
+# it is at the reduced size: the frame is scaled into a small preallocated
+# surface by pygame, read through a zero-copy view, optionally converted to
+# grayscale, and written into a preallocated ring of recent frames. No
+# arrays or surfaces are created per observation.
+#
+# The ring holds every frame twice, at slot i and slot i + stack, so the last
+# `stack` frames are always one contiguous slice, oldest first, and stacking
+# needs no copy either.
+
+OBS_SIZE = (84, 84)
+FRAME_STACK = 4
+SKIP_TICKS = 4
+# ITU-R BT.601 luma in 8.8 fixed point
+LUMA_WEIGHTS = (77, 150, 29)
+
+
+def screen_array(surface):
+    # (height, width, 3) RGB view of the surface's pixels. The surface stays
+    # locked while the array exists, and blitting onto a locked surface
+    # fails, so drop the array before the next frame is drawn.
+    return pygame.surfarray.pixels3d(surface).transpose(1, 0, 2)
+
+
+class PixelObserver:
+    def __init__(self, surface, size=OBS_SIZE, grayscale=True, stack=FRAME_STACK, smooth=False):
+        self.surface = surface
+        self.size = size
+        self.grayscale = grayscale
+        self.stack = stack
+        # smoothscale averages each block of pixels; scale samples one per block
+        # and is roughly 20 times cheaper
+        self.scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+        self.small = pygame.Surface(size, 0, surface)
+        width, height = size
+        shape = (height, width) if grayscale else (height, width, 3)
+        self.ring = np.zeros((2 * stack,) + shape, dtype=np.uint8)
+        self.head = 0
+        self.luma = np.empty((width, height), dtype=np.uint16)
+        self.channel = np.empty((width, height), dtype=np.uint16)
+        self.observations = 0
+
+    def capture(self, slot):
+        self.scale(self.surface, self.size, self.small)
+        pixels = pygame.surfarray.pixels3d(self.small)
+        if self.grayscale:
+            luma, channel = self.luma, self.channel
+            red, green, blue = LUMA_WEIGHTS
+            np.multiply(pixels[:, :, 0], np.uint16(red), out=luma)
+            np.multiply(pixels[:, :, 1], np.uint16(green), out=channel)
+            luma += channel
+            np.multiply(pixels[:, :, 2], np.uint16(blue), out=channel)
+            luma += channel
+            np.right_shift(luma.T, 8, out=slot, casting='unsafe')
+        else:
+            np.copyto(slot, pixels.transpose(1, 0, 2))
+        del pixels
+
+    def observe(self):
+        # Adds the surface's current frame; returns the last `stack` frames,
+        # oldest first, as a view into the ring (valid until the next call)
+        ring, stack = self.ring, self.stack
+        head = self.head
+        self.capture(ring[head])
+        ring[head + stack] = ring[head]
+        self.head = (head + 1) % stack
+        self.observations += 1
+        return ring[head + 1:head + 1 + stack]
+
+    def reset(self):
+        # Fills the whole stack with the current frame, e.g. on a new episode
+        self.capture(self.ring[0])
+        self.ring[1:] = self.ring[0]
+        self.head = 0
+        return self.ring[1:1 + self.stack]
+
+
+class PixelFlappyEnv:
+    # The real game, drawn off screen, as an environment with pixel
+    # observations. step(flap) plays skip_ticks simulation ticks (the flap
+    # goes in on the first), draws one frame and observes it; reward is the
+    # points scored. Without a display it runs on SDL's dummy video driver,
+    # so nothing is shown and no window is needed.
+
+    def __init__(self, seed=None, skip_ticks=SKIP_TICKS, size=OBS_SIZE, grayscale=True, stack=FRAME_STACK,
+                 smooth=False, collision=COLLISION_RECT, headless=True):
+        if headless:
+            os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+            os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+        self.game = FlappyBirdGame(seed, score_file=None, collision=collision)
+        # Training runs are neither scored nor saved as replays
+        self.game.record_run = lambda: None
+        self.game.sound_enabled = False
+        self.skip_ticks = skip_ticks
+        self.observer = PixelObserver(self.game.screen, size, grayscale, stack, smooth)
+
+    def reset(self):
+        game = self.game
+        game.start_game()
+        game.draw_frame()
+        return self.observer.reset()
+
+    def step(self, flap):
+        game = self.game
+        if flap:
+            game.handle_jump(measured=False)
+        score = game.score
+        for _ in range(self.skip_ticks):
+            game.update_tick()
+            if not game.game_active:
+                break
+        game.draw_frame()
+        done = not game.game_active
+        info = {'score': game.score, 'tick': game.sim.tick}
+        if done:
+            info['death_cause'] = game.sim.death_cause
+        return self.observer.observe(), game.score - score, done, info
+
+    def close(self):
+        self.game.scores.close()
+        pygame.quit()
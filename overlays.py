@@ -0,0 +1,143 @@
+import pygame
+
+from config import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Static screens (menu, pause, game over) are composited into a single surface
+# the first time they are shown and reused until the numbers on them change.
+# The live score is drawn from a pre-rendered digit atlas.
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+GOLD = (255, 215, 0)
+CONTROLS_COLOR = (255, 255, 200)
+RECORD_COLOR = (255, 100, 100)
+RESUME_COLOR = (200, 200, 200)
+PANEL_COLOR = (0, 0, 0, 150)
+PAUSE_DIM_COLOR = (0, 0, 0, 128)
+OUTLINE_OFFSETS = [(-2, -2), (-2, 2), (2, -2), (2, 2)]
+OUTLINE_MARGIN = 2
+SCORE_SHADOW_OFFSET = (2, 2)
+
+
+def render_outlined(font, text, color, outline_color=BLACK):
+    inner = font.render(text, True, color)
+    outline = font.render(text, True, outline_color)
+    width, height = inner.get_size()
+    surface = pygame.Surface((width + OUTLINE_MARGIN * 2, height + OUTLINE_MARGIN * 2), pygame.SRCALPHA)
+    for offset_x, offset_y in OUTLINE_OFFSETS:
+        surface.blit(outline, (OUTLINE_MARGIN + offset_x, OUTLINE_MARGIN + offset_y))
+    surface.blit(inner, (OUTLINE_MARGIN, OUTLINE_MARGIN))
+    return surface
+
+
+def panel(width, height, color=PANEL_COLOR):
+    surface = pygame.Surface((width, height), pygame.SRCALPHA)
+    surface.fill(color)
+    return surface
+
+
+def compose(items):
+    # items: (surface, center) pairs, drawn in order onto one transparent
+    # surface that covers all of them. Returns (surface, topleft).
+    rects = [surface.get_rect(center=center) for surface, center in items]
+    bounds = rects[0].unionall(rects[1:])
+    composite = pygame.Surface(bounds.size, pygame.SRCALPHA)
+    for (surface, _), rect in zip(items, rects):
+        composite.blit(surface, rect.move(-bounds.x, -bounds.y))
+    return composite, bounds.topleft
+
+
+class DigitAtlas:
+    def __init__(self, font, color=WHITE, shadow_color=BLACK):
+        self.atlas, self.glyph_rects = self._build(font, color)
+        self.shadow_atlas, _ = self._build(font, shadow_color)
+        self.height = self.atlas.get_height()
+
+    @staticmethod
+    def _build(font, color):
+        glyphs = [font.render(str(digit), True, color) for digit in range(10)]
+        atlas = pygame.Surface((sum(g.get_width() for g in glyphs), max(g.get_height() for g in glyphs)),
+                               pygame.SRCALPHA)
+        rects = []
+        x = 0
+        for glyph in glyphs:
+            atlas.blit(glyph, (x, 0))
+            rects.append(pygame.Rect(x, 0, glyph.get_width(), glyph.get_height()))
+            x += glyph.get_width()
+        return atlas, rects
+
+    def width(self, text):
+        return sum(self.glyph_rects[ord(char) - 48].width for char in text)
+
+    def draw(self, screen, value, center, shadow=True):
+        text = str(int(value))
+        width = self.width(text)
+        left = x = center[0] - width // 2
+        y = center[1] - self.height // 2
+        shadow_x, shadow_y = SCORE_SHADOW_OFFSET
+        for char in text:
+            area = self.glyph_rects[ord(char) - 48]
+            if shadow:
+                screen.blit(self.shadow_atlas, (x + shadow_x, y + shadow_y), area)
+            screen.blit(self.atlas, (x, y), area)
+            x += area.width
+        # Area touched, including the shadow
+        return pygame.Rect(left, y, width + shadow_x, self.height + shadow_y)
+
+
+class OverlayCache:
+    def __init__(self, game_font, small_font, title_surface):
+        self.game_font = game_font
+        self.small_font = small_font
+        self.title_surface = title_surface
+        self.title_center = (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)
+        self._menu = None
+        self._game_over = None
+        self._pause = None
+
+    def high_score_text(self, high_score):
+        return self.game_font.render(f'High Score: {int(high_score)}', True, GOLD)
+
+    def menu(self, high_score):
+        key = int(high_score)
+        if self._menu is None or self._menu[0] != key:
+            items = [(self.title_surface, self.title_center)]
+            if high_score > 0:
+                items.append((self.high_score_text(high_score), (SCREEN_WIDTH // 2, 50)))
+            items += [
+                (panel(SCREEN_WIDTH - 40, 160), (SCREEN_WIDTH // 2, 480)),
+                (render_outlined(self.game_font, 'Press SPACE', WHITE), (SCREEN_WIDTH // 2, 440)),
+                (render_outlined(self.game_font, 'or Click to Start', WHITE), (SCREEN_WIDTH // 2, 475)),
+                (render_outlined(self.small_font, 'SPACE: Jump | P: Pause | M: Toggle Sound', CONTROLS_COLOR),
+                 (SCREEN_WIDTH // 2, 520)),
+            ]
+            self._menu = (key, compose(items))
+        return self._menu[1]
+
+    def game_over(self, score, high_score):
+        key = (int(score), int(high_score))
+        if self._game_over is None or self._game_over[0] != key:
+            items = [
+                (self.title_surface, self.title_center),
+                (self.game_font.render(f'Score: {int(score)}', True, WHITE), (SCREEN_WIDTH // 2, 100)),
+                (self.high_score_text(high_score), (SCREEN_WIDTH // 2, 50)),
+            ]
+            if score >= high_score and score > 0:
+                items.append((self.small_font.render('NEW RECORD!', True, RECORD_COLOR), (SCREEN_WIDTH // 2, 130)))
+            items += [
+                (panel(SCREEN_WIDTH - 40, 100), (SCREEN_WIDTH // 2, 520)),
+                (render_outlined(self.game_font, 'Press SPACE', WHITE), (SCREEN_WIDTH // 2, 500)),
+                (render_outlined(self.game_font, 'or Click to Restart', WHITE), (SCREEN_WIDTH // 2, 535)),
+            ]
+            self._game_over = (key, compose(items))
+        return self._game_over[1]
+
+    def pause(self):
+        if self._pause is None:
+            self._pause = compose([
+                (panel(SCREEN_WIDTH, SCREEN_HEIGHT, PAUSE_DIM_COLOR), (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)),
+                (self.game_font.render('PAUSED', True, WHITE), (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2)),
+                (self.small_font.render('Press P or SPACE to Resume', True, RESUME_COLOR),
+                 (SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 + 50)),
+            ])
+        return self._pause
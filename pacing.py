@@ -0,0 +1,137 @@
+import threading
+import time
+
+import pygame
+
+from config import FPS
+from stats import Histogram
+
+# Frame pacing: how the main loop waits for the next frame and when it reads
+# input. The simulation always advances in fixed ticks (see scheduler.py);
+# only the render loop around it changes.
+#
+#   tick      clock.tick(FPS). Sleeps with SDL_Delay, which has millisecond
+#             granularity and can oversleep.
+#   busy      clock.tick_busy_loop(FPS). Spins through the end of the wait
+#             for an exact cadence, at the cost of a busy core.
+#   uncapped  No cap: frames are drawn as fast as the machine allows and
+#             interpolate between ticks, so input waits for one short frame.
+#   late      Each frame has a present deadline. The loop sleeps until the
+#             deadline minus the longest recent frame's work, then reads
+#             input, and reads it again just before every simulation tick.
+
+PACING_MODES = ('tick', 'busy', 'uncapped', 'late')
+LATE_WORK_WINDOW = 30
+LATE_MARGIN = 0.0005
+# time.sleep() may overshoot; the last stretch before waking is spun
+SPIN_TIME = 0.002
+
+
+class FramePacer:
+    late_input = False
+
+    def __init__(self, fps=FPS):
+        self.fps = fps
+        self.clock = pygame.time.Clock()
+
+    def wait(self):
+        # Returns the seconds since the previous frame
+        return self.clock.tick(self.fps) / 1000.0
+
+    def presented(self):
+        pass
+
+
+class BusyPacer(FramePacer):
+    def wait(self):
+        return self.clock.tick_busy_loop(self.fps) / 1000.0
+
+
+class UncappedPacer(FramePacer):
+    def wait(self):
+        return self.clock.tick() / 1000.0
+
+
+class LatePacer(FramePacer):
+    late_input = True
+
+    def __init__(self, fps=FPS):
+        super().__init__(fps)
+        self.frame_time = 1.0 / fps
+        self.last_wake = time.perf_counter()
+        self.deadline = self.last_wake + self.frame_time
+        self.work = [0.0] * LATE_WORK_WINDOW
+        self.frames = 0
+
+    def wait(self):
+        wake = self.deadline - max(self.work) - LATE_MARGIN
+        while True:
+            now = time.perf_counter()
+            if now >= wake:
+                break
+            if wake - now > SPIN_TIME:
+                time.sleep(wake - now - SPIN_TIME)
+        elapsed = now - self.last_wake
+        self.last_wake = now
+        self.clock.tick()
+        return elapsed
+
+    def presented(self):
+        now = time.perf_counter()
+        self.work[self.frames % LATE_WORK_WINDOW] = now - self.last_wake
+        self.frames += 1
+        self.deadline += self.frame_time
+        if self.deadline < now:
+            # Missed a deadline: restart the cadence instead of rushing to catch up
+            self.deadline = now + self.frame_time
+
+
+PACERS = {'tick': FramePacer, 'busy': BusyPacer, 'uncapped': UncappedPacer, 'late': LatePacer}
+
+
+class InputLatency:
+    # Time from a SPACE/click to the first present that shows its effect. A
+    # flap shows once a simulation tick has applied it; starting or
+    # unpausing shows on the next present. The input time is when the game
+    # read the event, or the event's `stamp` attribute when the sender set
+    # one (the latency benchmark does, to include the time spent queued).
+    # With --threaded, inputs are applied on the simulation thread and a
+    # present only shows what was applied before its snapshot was taken.
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.waiting = []
+        # (input stamp, when it was applied)
+        self.applied = []
+        self.histogram = Histogram()
+
+    def input(self, stamp, applied=True):
+        with self.lock:
+            if applied:
+                self.applied.append((stamp, time.perf_counter()))
+            else:
+                self.waiting.append(stamp)
+
+    def apply(self):
+        # A tick consumed the queued flap
+        with self.lock:
+            if self.waiting:
+                now = time.perf_counter()
+                self.applied.extend((stamp, now) for stamp in self.waiting)
+                self.waiting.clear()
+
+    def presented(self, now, shown=None):
+        # shown: when the drawn snapshot was taken; None means the live game
+        with self.lock:
+            if not self.applied:
+                return
+            pending = []
+            for stamp, applied in self.applied:
+                if shown is None or applied <= shown:
+                    self.histogram.add((now - stamp) * 1000)
+                else:
+                    pending.append((stamp, applied))
+            self.applied = pending
+
+    def summary(self):
+        return self.histogram.summary()
@@ -0,0 +1,143 @@
+import numpy as np
+import pygame
+
+# Fixed-capacity particle pool. Live particles occupy the first `count` slots
+# of parallel NumPy arrays; update() advances and compacts them in one pass,
+# and draw() blits pre-rendered circles picked by (color, radius, alpha bucket).
+
+DEFAULT_CAPACITY = 8192
+SIZE_DECAY = 0.95
+MAX_RADIUS = 8
+ALPHA_BUCKETS = 16
+
+
+class ParticlePool:
+    def __init__(self, colors, capacity=DEFAULT_CAPACITY, seed=None):
+        self.colors = list(colors)
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+        self.count = 0
+
+        self.x = np.zeros(capacity)
+        self.y = np.zeros(capacity)
+        self.vx = np.zeros(capacity)
+        self.vy = np.zeros(capacity)
+        self.size = np.zeros(capacity)
+        self.age = np.zeros(capacity)
+        self.lifetime = np.ones(capacity)
+        self.color = np.zeros(capacity, dtype=np.intp)
+
+        # sprites[color][radius][bucket] -> circle surface
+        self.sprites = [[[self._circle(color, radius, bucket) for bucket in range(ALPHA_BUCKETS)]
+                         for radius in range(MAX_RADIUS + 1)]
+                        for color in self.colors]
+
+    @staticmethod
+    def _circle(color, radius, bucket):
+        size = max(1, radius * 2)
+        surface = pygame.Surface((size, size), pygame.SRCALPHA)
+        if radius > 0:
+            alpha = round(255 * (bucket + 1) / ALPHA_BUCKETS)
+            pygame.draw.circle(surface, (*color, alpha), (radius, radius), radius)
+        return surface
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self.count = 0
+
+    def emit(self, x, y, color, count, angle, speed, size, lifetime):
+        # angle, speed, size and lifetime are (low, high) ranges sampled uniformly
+        count = min(count, self.capacity - self.count)
+        if count <= 0:
+            return
+        start, stop = self.count, self.count + count
+        rng = self.rng
+        angles = rng.uniform(angle[0], angle[1], count)
+        speeds = rng.uniform(speed[0], speed[1], count)
+        self.x[start:stop] = x
+        self.y[start:stop] = y
+        self.vx[start:stop] = np.cos(angles) * speeds
+        self.vy[start:stop] = np.sin(angles) * speeds
+        self.size[start:stop] = rng.uniform(size[0], size[1], count)
+        self.age[start:stop] = 0
+        self.lifetime[start:stop] = rng.uniform(lifetime[0], lifetime[1], count)
+        self.color[start:stop] = self.colors.index(color)
+        self.count = stop
+
+    def update(self, dt):
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.vx[:n] * dt
+        self.y[:n] += self.vy[:n] * dt
+        self.age[:n] += dt
+        self.size[:n] *= SIZE_DECAY
+
+        alive = self.age[:n] < self.lifetime[:n]
+        live = int(np.count_nonzero(alive))
+        if live < n:
+            for array in (self.x, self.y, self.vx, self.vy, self.size, self.age, self.lifetime, self.color):
+                array[:live] = array[:n][alive]
+        self.count = live
+
+    def bounds(self):
+        n = self.count
+        if not n:
+            return None
+        return _bounds(self.x[:n], self.y[:n], self.size[:n])
+
+    def draw(self, screen, camera=(0, 0)):
+        n = self.count
+        if not n:
+            return
+        _draw(screen, camera, self.sprites, self.x[:n], self.y[:n], self.size[:n], self.age[:n],
+              self.lifetime[:n], self.color[:n])
+
+    def snapshot(self):
+        # A frozen copy of the live particles that draws like the pool
+        n = self.count
+        return ParticleSnapshot(self.sprites, *(array[:n].copy() for array in
+                                                (self.x, self.y, self.size, self.age, self.lifetime, self.color)))
+
+
+class ParticleSnapshot:
+    __slots__ = ('sprites', 'x', 'y', 'size', 'age', 'lifetime', 'color')
+
+    def __init__(self, sprites, x, y, size, age, lifetime, color):
+        self.sprites = sprites
+        self.x, self.y, self.size, self.age, self.lifetime, self.color = x, y, size, age, lifetime, color
+
+    def __len__(self):
+        return len(self.x)
+
+    def bounds(self):
+        return _bounds(self.x, self.y, self.size) if len(self.x) else None
+
+    def draw(self, screen, camera=(0, 0)):
+        if len(self.x):
+            _draw(screen, camera, self.sprites, self.x, self.y, self.size, self.age, self.lifetime, self.color)
+
+
+def _bounds(x, y, size):
+    left = int((x - size).min())
+    top = int((y - size).min())
+    right = int((x + size).max()) + 1
+    bottom = int((y + size).max()) + 1
+    return pygame.Rect(left, top, right - left, bottom - top)
+
+
+def _draw(screen, camera, sprites, x, y, size, age, lifetime, color):
+    radius = np.minimum(size.astype(np.intp), MAX_RADIUS)
+    fade = 1 - age / lifetime
+    bucket = np.clip((fade * ALPHA_BUCKETS).astype(np.intp), 0, ALPHA_BUCKETS - 1)
+    left = (x - size).astype(np.intp) + camera[0]
+    top = (y - size).astype(np.intp) + camera[1]
+
+    visible = radius > 0
+    screen.blits([(sprites[c][r][b], (px, py))
+                  for c, r, b, px, py in zip(color[visible].tolist(), radius[visible].tolist(),
+                                             bucket[visible].tolist(), left[visible].tolist(),
+                                             top[visible].tolist())],
+                 doreturn=False)
@@ -0,0 +1,230 @@
+import csv
+import json
+import threading
+import time
+from collections import deque
+
+import pygame
+
+from stats import BUCKET_MS, Histogram, rolling_percentile
+
+# Per-phase frame profiler. Code under test wraps each phase in
+# `with profiler.phase('name'):`; phases are summed per frame, kept in a
+# rolling window for the live HUD and in fixed-bucket histograms for the
+# whole run, which can be written to JSON or CSV.
+
+ROLLING_WINDOW = 300
+FRAME = 'frame'
+ALLOCATIONS = 'surface_allocations'
+
+
+class _NullPhase:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+
+class AllocationCounter:
+    # Counts surfaces created through pygame.Surface and pygame.transform by
+    # swapping in counting wrappers. Only installed while profiling. There is
+    # one counter for the process, so the functions are wrapped once however
+    # many profilers run, and it counts per thread: with --threaded the tick
+    # profiler sees only the simulation thread's surfaces, the frame profiler
+    # only the render thread's.
+    TRANSFORMS = ('rotozoom', 'rotate', 'flip', 'scale', 'scale2x', 'smoothscale')
+
+    def __init__(self):
+        self.counts = {}
+        self.originals = {}
+
+    @property
+    def count(self):
+        # Surfaces created by the calling thread since its last reset()
+        return self.counts.get(threading.get_ident(), 0)
+
+    def reset(self):
+        self.counts[threading.get_ident()] = 0
+
+    def _add(self):
+        thread = threading.get_ident()
+        self.counts[thread] = self.counts.get(thread, 0) + 1
+
+    def install(self):
+        if self.originals:
+            return
+        counter = self
+
+        class CountingSurface(pygame.Surface):
+            def __init__(self, *args, **kwargs):
+                counter._add()
+                super().__init__(*args, **kwargs)
+
+        self.originals['Surface'] = (pygame, pygame.Surface)
+        pygame.Surface = CountingSurface
+        for name in self.TRANSFORMS:
+            original = getattr(pygame.transform, name)
+            self.originals[name] = (pygame.transform, original)
+            setattr(pygame.transform, name, self._wrap(original))
+
+    def _wrap(self, function):
+        def counted(*args, **kwargs):
+            self._add()
+            return function(*args, **kwargs)
+        return counted
+
+    def uninstall(self):
+        for name, (module, original) in self.originals.items():
+            setattr(module, 'Surface' if name == 'Surface' else name, original)
+        self.originals = {}
+
+
+ALLOCATION_COUNTER = AllocationCounter()
+
+
+class FrameProfiler:
+    def __init__(self, enabled=False, window=ROLLING_WINDOW):
+        self.enabled = False
+        self.window = window
+        self.current = {}
+        self.rolling = {}
+        self.histograms = {}
+        self.allocations = ALLOCATION_COUNTER
+        self.allocations_per_frame = deque(maxlen=window)
+        self.allocation_total = 0
+        self.allocation_max = 0
+        self.frame_start = None
+        self._null = _NullPhase()
+        self._phases = {}
+        self._targets = []
+        if enabled:
+            self.enable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        self.allocations.install()
+        for obj, names, prefix in self._targets:
+            self._wrap_methods(obj, names, prefix)
+
+    def instrument(self, obj, names, prefix=''):
+        # Time methods that are called from inside another phase, e.g. the
+        # parts of FlappySimulation.step(). The instance attribute shadows the
+        # class method, so the object itself needs no profiling hooks.
+        self._targets.append((obj, names, prefix))
+        if self.enabled:
+            self._wrap_methods(obj, names, prefix)
+
+    def _wrap_methods(self, obj, names, prefix):
+        for name in names:
+            method = getattr(obj, name)
+            phase = self.phase(prefix + name)
+
+            def timed(*args, _method=method, _phase=phase, **kwargs):
+                with _phase:
+                    return _method(*args, **kwargs)
+            setattr(obj, name, timed)
+
+    def phase(self, name):
+        if not self.enabled:
+            return self._null
+        phase = self._phases.get(name)
+        if phase is None:
+            phase = self._phases[name] = _Phase(self, name)
+        return phase
+
+    def begin_frame(self):
+        if self.enabled:
+            self.frame_start = time.perf_counter()
+            self.allocations.reset()
+
+    def end_frame(self):
+        if not self.enabled or self.frame_start is None:
+            return
+        self.current[FRAME] = time.perf_counter() - self.frame_start
+        for name, seconds in self.current.items():
+            self._record(name, seconds * 1000)
+        count = self.allocations.count
+        self.allocations_per_frame.append(count)
+        self.allocation_total += count
+        self.allocation_max = max(self.allocation_max, count)
+        self.current = {}
+
+    def _record(self, name, value):
+        if name not in self.histograms:
+            self.histograms[name] = Histogram()
+            self.rolling[name] = deque(maxlen=self.window)
+        self.histograms[name].add(value)
+        self.rolling[name].append(value)
+
+    def hud_lines(self):
+        frames = self.rolling.get(FRAME)
+        if not frames:
+            return ['profiler: no frames yet']
+        lines = [
+            f'frame p50 {rolling_percentile(frames, 0.5):.2f}  '
+            f'p95 {rolling_percentile(frames, 0.95):.2f}  '
+            f'p99 {rolling_percentile(frames, 0.99):.2f} ms',
+            f'surfaces/frame {sum(self.allocations_per_frame) / len(self.allocations_per_frame):.1f}',
+        ]
+        phases = [(sum(samples) / len(samples), name) for name, samples in self.rolling.items()
+                  if name != FRAME]
+        for mean, name in sorted(phases, reverse=True):
+            lines.append(f'{name:<20} {mean:.3f} ms')
+        return lines
+
+    def summary(self):
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def allocation_summary(self):
+        frames = self.histograms[FRAME].total if FRAME in self.histograms else 0
+        return {
+            'total': self.allocation_total,
+            'per_frame_mean': self.allocation_total / frames if frames else 0.0,
+            'per_frame_max': self.allocation_max,
+        }
+
+    def dump(self, path):
+        summary = self.summary()
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(['phase', 'count', 'mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms'])
+                for name, stats in summary.items():
+                    writer.writerow([name, stats['count']] + [f'{stats[key]:.4f}' for key in
+                                                              ('mean_ms', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms')])
+                allocations = self.allocation_summary()
+                writer.writerow([])
+                writer.writerow(['surface_allocations', 'total', 'per_frame_mean', 'per_frame_max'])
+                writer.writerow(['', allocations['total'], f"{allocations['per_frame_mean']:.2f}",
+                                 allocations['per_frame_max']])
+        else:
+            frame = self.histograms.get(FRAME)
+            with open(path, 'w') as f:
+                json.dump({
+                    'phases': summary,
+                    ALLOCATIONS: self.allocation_summary(),
+                    'frame_histogram': {
+                        'bucket_ms': BUCKET_MS,
+                        'counts': frame.counts if frame else [],
+                    },
+                }, f, indent=2)
@@ -0,0 +1,162 @@
+import pygame
+
+from config import SCREEN_WIDTH, SCREEN_HEIGHT
+
+# Two interchangeable canvases for FlappyBirdGame. Drawing code calls
+# canvas.blit() and canvas.draw_group() exactly like Surface.blit(); the
+# canvas applies the camera offset (used for screen shake) and decides how
+# much of the window to push in present().
+
+SCREEN_RECT = pygame.Rect(0, 0, SCREEN_WIDTH, SCREEN_HEIGHT)
+SCREEN_AREA = SCREEN_WIDTH * SCREEN_HEIGHT
+
+
+def _dest_rect(surface, dest, area, camera):
+    if isinstance(dest, pygame.Rect):
+        x, y = dest.topleft
+    else:
+        x, y = dest
+    if area is None:
+        width, height = surface.get_size()
+    else:
+        width, height = area[2], area[3]
+    return pygame.Rect(x + camera[0], y + camera[1], width, height)
+
+
+class FullFrameRenderer:
+    mode = 'full'
+
+    def __init__(self, screen):
+        self.screen = screen
+        self.camera = (0, 0)
+        self.frames = 0
+        self.pixels_pushed = 0
+
+    def blit(self, surface, dest, area=None):
+        rect = _dest_rect(surface, dest, area, self.camera)
+        self.screen.blit(surface, rect, area)
+        return rect
+
+    def draw_group(self, rect, draw):
+        # draw(screen, camera) blits a group of sprites, e.g. the particle pool
+        if rect is not None:
+            draw(self.screen, self.camera)
+
+    def present(self):
+        pygame.display.update()
+        self.frames += 1
+        self.pixels_pushed += SCREEN_AREA
+
+
+class DirtyRectRenderer:
+    # Keeps the display list of the previous frame. Anything that appeared,
+    # disappeared or moved marks its old and new rect dirty; only those
+    # regions are repainted (every item overlapping them, in order, clipped
+    # to the region) and pushed to the window. The first item of each frame
+    # is the background, so repainting a region also restores what was behind.
+
+    mode = 'dirty'
+
+    def __init__(self, screen, full_redraw_ratio=0.6):
+        self.screen = screen
+        self.camera = (0, 0)
+        self.full_redraw_ratio = full_redraw_ratio
+        self.items = []
+        self.previous = []
+        self.needs_full_redraw = True
+        self.frames = 0
+        self.pixels_pushed = 0
+
+    def blit(self, surface, dest, area=None):
+        rect = _dest_rect(surface, dest, area, self.camera)
+        self.items.append((surface, rect, area))
+        return rect
+
+    def draw_group(self, rect, draw):
+        if rect is not None:
+            camera = self.camera
+            self.items.append((None, rect.move(camera), lambda screen: draw(screen, camera)))
+
+    def invalidate(self):
+        self.needs_full_redraw = True
+
+    @staticmethod
+    def _key(item):
+        surface, rect, area = item
+        return (id(surface), rect.x, rect.y, rect.w, rect.h, None if area is None else tuple(area))
+
+    def dirty_rects(self):
+        if self.needs_full_redraw:
+            return [SCREEN_RECT.copy()]
+
+        previous = {}
+        for item in self.previous:
+            if item[0] is not None:
+                key = self._key(item)
+                previous[key] = previous.get(key, 0) + 1
+
+        dirty = []
+        for item in self.items:
+            if item[0] is None:
+                dirty.append(item[1])
+                continue
+            key = self._key(item)
+            if previous.get(key):
+                previous[key] -= 1
+            else:
+                dirty.append(item[1])
+        for item in self.previous:
+            if item[0] is None:
+                dirty.append(item[1])
+            else:
+                key = self._key(item)
+                if previous.get(key):
+                    previous[key] -= 1
+                    dirty.append(item[1])
+
+        dirty = [rect.clip(SCREEN_RECT) for rect in dirty]
+        dirty = self._merge([rect for rect in dirty if rect.w and rect.h])
+        if sum(rect.w * rect.h for rect in dirty) > SCREEN_AREA * self.full_redraw_ratio:
+            return [SCREEN_RECT.copy()]
+        return dirty
+
+    @staticmethod
+    def _merge(rects):
+        # Union overlapping rects so no region is repainted twice
+        merged = []
+        for rect in rects:
+            rect = rect.copy()
+            hits = rect.collidelistall(merged)
+            while hits:
+                for index in reversed(hits):
+                    rect.union_ip(merged.pop(index))
+                hits = rect.collidelistall(merged)
+            merged.append(rect)
+        return merged
+
+    def present(self):
+        dirty = self.dirty_rects()
+        screen = self.screen
+        for region in dirty:
+            screen.set_clip(region)
+            for surface, rect, area in self.items:
+                if rect.colliderect(region):
+                    if surface is None:
+                        area(screen)
+                    else:
+                        screen.blit(surface, rect, area)
+        screen.set_clip(None)
+
+        if dirty:
+            pygame.display.update(dirty)
+        self.frames += 1
+        self.pixels_pushed += sum(rect.w * rect.h for rect in dirty)
+        self.previous = self.items
+        self.items = []
+        self.needs_full_redraw = False
+
+
+RENDERERS = {
+    FullFrameRenderer.mode: FullFrameRenderer,
+    DirtyRectRenderer.mode: DirtyRectRenderer,
+}
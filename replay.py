@@ -0,0 +1,241 @@
+import argparse
+import multiprocessing
+import os
+import struct
+import sys
+import time
+
+from config import SCORE_DB_FILE
+from scores import ScoreStore, write_new
+from simulation import FlappySimulation, SimState, DEATH_CAUSES, COLLISION_MODES, COLLISION_RECT
+
+# Replay files: the run's seed, one bit per tick saying whether the bird
+# flapped, and a snapshot of the simulation every SNAPSHOT_INTERVAL ticks.
+# Re-simulating the flap stream from the seed reproduces the run exactly;
+# the snapshots let a player jump to any tick by restoring the nearest one
+# and simulating only the ticks after it.
+#
+# Layout (little endian):
+#   header    magic, version, seed, ticks, score, death cause,
+#             snapshot interval, snapshot count, collision mode (version 2+)
+#   flaps     ceil(ticks / 8) bytes, bit (tick % 8) of byte (tick // 8)
+#   snapshots snapshot count records, see pack_state()
+
+MAGIC = b'FBRP'
+VERSION = 2
+SNAPSHOT_INTERVAL = 600
+REPLAY_DIR = 'replays'
+REPLAY_SUFFIX = '.fbr'
+
+HEADER = struct.Struct('<4sBQIIbIIB')
+HEADER_V1 = struct.Struct('<4sBQIIbII')
+STATE = struct.Struct('<IiidhBBIIdIIIQIIB')
+PIPE = struct.Struct('<iih')
+
+
+def pack_state(sim):
+    state = sim.snapshot()
+    count = state.pipe_count
+    return STATE.pack(
+        state.tick, state.bird_y, state.prev_bird_y, state.bird_movement, state.bird_rotation,
+        state.bird_index, state.bird_flap_timer, state.score, state.next_pipe_index,
+        state.current_pipe_speed, state.current_spawn_rate, state.spawn_interval,
+        state.spawn_timer, state.rng_counter, state.pipes_head, state.pipes_head + count, count,
+    ) + struct.pack('<' + PIPE.format[1:] * count, *state.pipes)
+
+
+def unpack_state(sim, seed, buffer, offset=0):
+    state = SimState()
+    (state.tick, state.bird_y, state.prev_bird_y, state.bird_movement, state.bird_rotation,
+     state.bird_index, state.bird_flap_timer, state.score, state.next_pipe_index,
+     state.current_pipe_speed, state.current_spawn_rate, state.spawn_interval,
+     state.spawn_timer, state.rng_counter, state.pipes_head, _, count) = STATE.unpack_from(buffer, offset)
+    offset += STATE.size
+    # Snapshots are taken before a step, so the bird is always alive
+    state.seed = seed
+    state.done = False
+    state.death_cause = None
+    state.pipes = struct.unpack_from('<' + PIPE.format[1:] * count, buffer, offset)
+    sim.restore(state)
+    return offset + PIPE.size * count
+
+
+class ReplayRecorder:
+    def __init__(self, sim, snapshot_interval=SNAPSHOT_INTERVAL):
+        self.seed = sim.seed
+        self.collision = sim.collision_mode
+        self.snapshot_interval = snapshot_interval
+        self.flaps = bytearray()
+        self.snapshots = []
+        self.ticks = 0
+
+    def record(self, sim, flap):
+        # Call before sim.step(flap)
+        tick = self.ticks
+        if tick % self.snapshot_interval == 0:
+            self.snapshots.append(pack_state(sim))
+        if tick % 8 == 0:
+            self.flaps.append(0)
+        if flap:
+            self.flaps[-1] |= 1 << (tick % 8)
+        self.ticks += 1
+
+    def to_bytes(self, sim):
+        header = HEADER.pack(MAGIC, VERSION, self.seed, self.ticks, sim.score,
+                             DEATH_CAUSES.index(sim.death_cause), self.snapshot_interval,
+                             len(self.snapshots), COLLISION_MODES.index(self.collision))
+        return b''.join([header, bytes(self.flaps)] + self.snapshots)
+
+    def path(self, directory=REPLAY_DIR):
+        # Down to the millisecond; a name that is still taken gets a suffix when written
+        now = time.time()
+        stamp = f'{time.strftime("%Y%m%d-%H%M%S", time.localtime(now))}.{int(now % 1 * 1000):03d}'
+        return os.path.join(directory, f'{stamp}-{self.seed:016x}{REPLAY_SUFFIX}')
+
+    def save(self, sim, directory=REPLAY_DIR):
+        # The path actually written, which never replaces an earlier replay
+        return write_new(self.path(directory), self.to_bytes(sim))
+
+
+class Replay:
+    def __init__(self, data, collider=None):
+        magic, version = data[:4], data[4] if len(data) > 4 else None
+        if magic != MAGIC or version not in (1, VERSION):
+            raise ValueError('not a replay file or unsupported version')
+        if version == 1:
+            header = HEADER_V1.unpack_from(data, 0) + (COLLISION_MODES.index(COLLISION_RECT),)
+        else:
+            header = HEADER.unpack_from(data, 0)
+        (_, _, self.seed, self.ticks, self.score, cause,
+         self.snapshot_interval, snapshot_count, collision) = header
+        self.death_cause = DEATH_CAUSES[cause]
+        self.collision = COLLISION_MODES[collision]
+        # Pixel-collision runs must be re-simulated with the same narrow phase
+        self.collider = collider
+        offset = HEADER_V1.size if version == 1 else HEADER.size
+        self.flaps = data[offset:offset + (self.ticks + 7) // 8]
+        offset += len(self.flaps)
+
+        # Snapshots are variable length; index where each one starts
+        self.data = data
+        self.snapshot_offsets = []
+        probe = FlappySimulation(0)
+        for _ in range(snapshot_count):
+            self.snapshot_offsets.append(offset)
+            offset = unpack_state(probe, self.seed, data, offset)
+
+    @classmethod
+    def load(cls, path, collider=None):
+        with open(path, 'rb') as f:
+            return cls(f.read(), collider)
+
+    def new_simulation(self):
+        if self.collision != COLLISION_RECT and self.collider is None:
+            # Imported here so rect-only verification never needs pygame
+            from collision import shared_pixel_collider
+            self.collider = shared_pixel_collider()
+        return FlappySimulation(self.seed, collider=self.collider)
+
+    def flap(self, tick):
+        return bool(self.flaps[tick >> 3] >> (tick & 7) & 1)
+
+    def start(self, sim):
+        sim.reset(self.seed)
+
+    def seek(self, sim, tick):
+        # Restore the nearest snapshot at or before tick, then re-simulate
+        tick = max(0, min(tick, self.ticks))
+        index = min(tick // self.snapshot_interval, len(self.snapshot_offsets) - 1)
+        if index < 0:
+            sim.reset(self.seed)
+        else:
+            unpack_state(sim, self.seed, self.data, self.snapshot_offsets[index])
+        while sim.tick < tick and not sim.done:
+            sim.step(self.flap(sim.tick))
+        return sim
+
+    def simulate(self, sim=None):
+        sim = sim or self.new_simulation()
+        self.start(sim)
+        step, flap = sim.step, self.flap
+        for tick in range(self.ticks):
+            if step(flap(tick))[2]:
+                break
+        return sim
+
+
+def verify_file(path):
+    # Returns (path, recorded score, simulated score, ok)
+    try:
+        replay = Replay.load(path)
+    except (OSError, ValueError, struct.error) as e:
+        return path, None, None, f'unreadable: {e}'
+    sim = replay.simulate()
+    if not sim.done or sim.tick != replay.ticks:
+        return path, replay.score, sim.score, 'run does not end where the recording does'
+    if sim.score != replay.score or sim.death_cause != replay.death_cause:
+        return path, replay.score, sim.score, 'score mismatch'
+    return path, replay.score, sim.score, None
+
+
+def replay_files(paths):
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(REPLAY_SUFFIX):
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def verify(paths, workers=None, score_file=SCORE_DB_FILE):
+    files = list(replay_files(paths))
+    start = time.perf_counter()
+    if workers == 1:
+        results = [verify_file(path) for path in files]
+    else:
+        with multiprocessing.Pool(workers) as pool:
+            results = pool.map(verify_file, files, chunksize=64)
+    elapsed = time.perf_counter() - start
+
+    failures = [result for result in results if result[3]]
+    for path, recorded, simulated, problem in failures:
+        print(f'FAIL {path}: {problem} (recorded {recorded}, simulated {simulated})')
+    best = max((result[2] for result in results if not result[3]), default=0)
+    print(f'{len(files) - len(failures)}/{len(files)} replays verified in {elapsed:.2f}s, best score {best}')
+
+    ok = not failures
+    if score_file and os.path.exists(score_file):
+        store = ScoreStore(score_file, legacy_file=None)
+        claimed = store.best()
+        store.close()
+        if claimed > best:
+            print(f'FAIL {score_file}: claims {claimed}, no verified replay above {best}')
+            ok = False
+        else:
+            print(f'{score_file}: high score {claimed} is backed by a verified replay')
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Inspect and verify replay files')
+    commands = parser.add_subparsers(dest='command', required=True)
+    info = commands.add_parser('info', help='print what a replay contains')
+    info.add_argument('path')
+    check = commands.add_parser('verify', help='re-simulate replays and check their scores')
+    check.add_argument('paths', nargs='+', help='replay files or directories')
+    check.add_argument('--workers', type=int, default=None)
+    check.add_argument('--scores', default=SCORE_DB_FILE, help='score store whose best run must be verified')
+    args = parser.parse_args()
+
+    if args.command == 'info':
+        replay = Replay.load(args.path)
+        print(f'seed {replay.seed}, {replay.ticks} ticks, score {replay.score}, {replay.collision} collision, '
+              f'died on {replay.death_cause}, {len(replay.snapshot_offsets)} snapshots, '
+              f'{len(replay.data)} bytes')
+    else:
+        sys.exit(0 if verify(args.paths, args.workers, args.scores) else 1)
+
+
+if __name__ == '__main__':
+    main()
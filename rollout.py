@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import time
+from multiprocessing.sharedctypes import RawArray
+
+from config import TICK_RATE
+from simulation import FlappySimulation, DEATH_CAUSES
+
+# Plays many headless episodes across a process pool. Workers write their
+# results straight into shared arrays indexed by episode, so nothing but a
+# completed-episode count is pickled back to the parent.
+
+DEFAULT_MAX_STEPS = 100_000
+SEED_STRIDE = 2 ** 32
+
+_results = None
+
+
+def episode_seed(seed, episode):
+    # Every episode gets its own stream, independent of which worker runs it,
+    # so results do not change with the number of workers
+    return seed * SEED_STRIDE + episode
+
+
+def flap_below_gap(obs):
+    bird_y, bird_movement, _, gap_center = obs
+    return bird_y > gap_center + 40 and bird_movement >= 0
+
+
+class RolloutResults:
+    def __init__(self, episodes):
+        self.episodes = episodes
+        self.scores = RawArray('i', episodes)
+        self.lengths = RawArray('i', episodes)
+        self.causes = RawArray('b', episodes)
+
+    def death_cause(self, episode):
+        return DEATH_CAUSES[self.causes[episode]]
+
+    def cause_counts(self):
+        counts = {}
+        for code in self.causes:
+            cause = DEATH_CAUSES[code] or 'timeout'
+            counts[cause] = counts.get(cause, 0) + 1
+        return counts
+
+
+def _init_worker(results):
+    global _results
+    _results = results
+
+
+def _run_chunk(args):
+    start, stop, seed, policy, max_steps, tick_rate = args
+    sim = FlappySimulation(tick_rate=tick_rate)
+    scores, lengths, causes = _results.scores, _results.lengths, _results.causes
+    for episode in range(start, stop):
+        obs = sim.reset(episode_seed(seed, episode))
+        step = sim.step
+        for _ in range(max_steps):
+            obs, _, done, _ = step(policy(obs))
+            if done:
+                break
+        scores[episode] = sim.score
+        lengths[episode] = sim.tick
+        causes[episode] = DEATH_CAUSES.index(sim.death_cause)
+    return stop - start
+
+
+def run_rollouts(episodes, workers=None, seed=0, policy=flap_below_gap,
+                 max_steps=DEFAULT_MAX_STEPS, chunks_per_worker=4, tick_rate=TICK_RATE):
+    workers = workers or os.cpu_count() or 1
+    results = RolloutResults(episodes)
+    chunk = max(1, episodes // (workers * chunks_per_worker))
+    tasks = [(start, min(episodes, start + chunk), seed, policy, max_steps, tick_rate)
+             for start in range(0, episodes, chunk)]
+
+    if workers == 1:
+        _init_worker(results)
+        for task in tasks:
+            _run_chunk(task)
+    else:
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=(results,)) as pool:
+            for _ in pool.imap_unordered(_run_chunk, tasks):
+                pass
+    return results
+
+
+def print_rollout_summary(episodes, workers, seed=0, max_steps=DEFAULT_MAX_STEPS, tick_rate=TICK_RATE):
+    workers = workers or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = run_rollouts(episodes, workers=workers, seed=seed, max_steps=max_steps, tick_rate=tick_rate)
+    elapsed = time.perf_counter() - start
+
+    total_steps = sum(results.lengths)
+    scores = results.scores
+    print(f'Episodes: {episodes} on {workers} worker(s) at {tick_rate} Hz in {elapsed:.2f}s')
+    print(f'Throughput: {episodes / elapsed:,.1f} episodes/s, {total_steps / elapsed:,.0f} steps/s')
+    print(f'Score: mean {sum(scores) / episodes:.2f}, max {max(scores)}')
+    print('Deaths: ' + ', '.join(f'{cause} {count}' for cause, count in sorted(results.cause_counts().items())))
+    return results
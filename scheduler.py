@@ -0,0 +1,43 @@
+from config import TICK_RATE
+
+# Fixed-timestep scheduling: wall-clock time is poured into an accumulator and
+# drained in whole simulation ticks, so the game advances the same way no
+# matter how fast frames are drawn. What is left over is the fraction of a
+# tick the renderer interpolates across.
+
+MAX_FRAME_TIME = 0.25
+
+
+class FixedTimestep:
+    def __init__(self, tick_rate=TICK_RATE, speed=1.0, max_frame_time=MAX_FRAME_TIME):
+        self.tick_time = 1.0 / tick_rate
+        # speed None means as fast as possible; the caller decides how many
+        # ticks fit in a frame and advance() yields none
+        self.speed = speed
+        # A long stall (window drag, debugger) is dropped instead of replayed
+        # as a burst of catch-up ticks
+        self.max_frame_time = max_frame_time
+        self.accumulator = 0.0
+        self.ticks = 0
+
+    @property
+    def unthrottled(self):
+        return self.speed is None
+
+    def advance(self, elapsed):
+        if self.unthrottled:
+            return 0
+        self.accumulator += min(elapsed, self.max_frame_time) * self.speed
+        ticks = int(self.accumulator / self.tick_time)
+        self.accumulator -= ticks * self.tick_time
+        self.ticks += ticks
+        return ticks
+
+    @property
+    def alpha(self):
+        if self.unthrottled:
+            return 1.0
+        return self.accumulator / self.tick_time
+
+    def reset(self):
+        self.accumulator = 0.0
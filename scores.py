@@ -0,0 +1,267 @@
+import argparse
+import itertools
+import json
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+
+from config import SCORE_DB_FILE, HIGH_SCORE_FILE, TICK_RATE
+
+# Every finished run, kept in SQLite. The game only ever enqueues: a writer
+# thread owns the write connection, writes the run's replay file, and
+# commits whatever runs have queued up in one transaction. SQLite's journal
+# makes each commit atomic, so a crash loses at most the runs that were
+# still queued and never leaves a half-written store.
+#
+# The game's reads never scan the runs: top-N walks the score index and
+# stops after N rows, and a trigger keeps one row per day in daily_best, so
+# both cost the same with a thousand runs or a million. Only count(), for the
+# command line, reads the whole index.
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    ticks INTEGER,
+    seed INTEGER,
+    timestamp REAL NOT NULL,
+    day TEXT NOT NULL,
+    replay TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_by_score ON runs (score DESC, id);
+CREATE TABLE IF NOT EXISTS daily_best (
+    day TEXT PRIMARY KEY,
+    score INTEGER NOT NULL,
+    run_id INTEGER NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS runs_daily_best AFTER INSERT ON runs BEGIN
+    INSERT INTO daily_best (day, score, run_id) VALUES (new.day, new.score, new.id)
+    ON CONFLICT (day) DO UPDATE SET score = excluded.score, run_id = excluded.run_id
+    WHERE excluded.score > daily_best.score;
+END;
+'''
+
+RUN_COLUMNS = 'id, score, ticks, seed, timestamp, day, replay'
+INSERT = 'INSERT INTO runs (score, ticks, seed, timestamp, day, replay) VALUES (?, ?, ?, ?, ?, ?)'
+# Runs queued while the writer was busy go into the same transaction
+MAX_BATCH = 1024
+
+_memory_names = itertools.count()
+
+
+def day_of(timestamp):
+    return time.strftime('%Y-%m-%d', time.localtime(timestamp))
+
+
+def _signed_seed(seed):
+    # SQLite integers are signed 64-bit; simulation seeds are unsigned
+    if seed is None:
+        return None
+    return seed - (1 << 64) if seed >= 1 << 63 else seed
+
+
+def _unsigned_seed(seed):
+    if seed is None:
+        return None
+    return seed & ((1 << 64) - 1)
+
+
+def _row(row):
+    run_id, score, ticks, seed, timestamp, day, replay = row
+    return {
+        'id': run_id,
+        'score': score,
+        'ticks': ticks,
+        'duration': ticks / TICK_RATE if ticks is not None else None,
+        'seed': _unsigned_seed(seed),
+        'timestamp': timestamp,
+        'day': day,
+        'replay': replay,
+    }
+
+
+class ScoreStore:
+    def __init__(self, path=SCORE_DB_FILE, legacy_file=HIGH_SCORE_FILE):
+        # path=None keeps the runs in memory for this process only
+        if path is None:
+            self.path = f'file:scores-{os.getpid()}-{next(_memory_names)}?mode=memory&cache=shared'
+        else:
+            self.path = path
+        self.reader = self._connect()
+        try:
+            self.reader.executescript(SCHEMA)
+            if legacy_file:
+                self._import_legacy(legacy_file)
+        except sqlite3.Error:
+            self.reader.close()
+            raise
+        self.pending = queue.Queue()
+        self.failures = 0
+        self.writer = threading.Thread(target=self._write_loop, name='score-writer', daemon=True)
+        self.writer.start()
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, uri=self.path.startswith('file:'),
+                                     check_same_thread=False, isolation_level=None)
+        try:
+            connection.execute('PRAGMA journal_mode=WAL')
+            # Writes are off the render thread, so they can afford a full sync
+            connection.execute('PRAGMA synchronous=FULL')
+        except sqlite3.Error:
+            connection.close()
+            raise
+        return connection
+
+    def _import_legacy(self, legacy_file):
+        # The old high_score.json only knew the best score; keep it as a run
+        if not os.path.exists(legacy_file):
+            return
+        if self.reader.execute('SELECT 1 FROM runs LIMIT 1').fetchone():
+            return
+        try:
+            with open(legacy_file) as f:
+                score = int(json.load(f).get('high_score', 0))
+        except (OSError, ValueError, AttributeError) as e:
+            print(f"Ignoring {legacy_file}: {e}")
+            return
+        if score > 0:
+            timestamp = os.path.getmtime(legacy_file)
+            self.reader.execute(INSERT, (score, None, None, timestamp, day_of(timestamp), None))
+
+    def record(self, score, ticks=None, seed=None, replay=None, timestamp=None):
+        # Never blocks. replay is an optional (path, bytes) pair written by the
+        # writer before the run that refers to it is committed.
+        if timestamp is None:
+            timestamp = time.time()
+        self.pending.put((score, ticks, seed, timestamp, replay))
+
+    def _write_loop(self):
+        connection = self._connect()
+        while True:
+            batch = [self.pending.get()]
+            while len(batch) < MAX_BATCH:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            stop = None in batch
+            runs = [run for run in batch if run is not None]
+            if runs:
+                self._commit(connection, runs)
+            for _ in batch:
+                self.pending.task_done()
+            if stop:
+                connection.close()
+                return
+
+    def _commit(self, connection, runs):
+        rows = []
+        for score, ticks, seed, timestamp, replay in runs:
+            path = None
+            if replay:
+                path, data = replay
+                try:
+                    path = write_new(path, data)
+                except OSError as e:
+                    print(f"Could not save replay: {e}")
+                    path = None
+            rows.append((score, ticks, _signed_seed(seed), timestamp, day_of(timestamp), path))
+        try:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.executemany(INSERT, rows)
+            connection.execute('COMMIT')
+        except sqlite3.Error as e:
+            self.failures += len(rows)
+            print(f"Could not save {len(rows)} run(s) to {self.path}: {e}")
+            if connection.in_transaction:
+                connection.execute('ROLLBACK')
+
+    def flush(self):
+        # Wait until every run recorded so far is committed (or has failed)
+        self.pending.join()
+
+    def close(self):
+        if self.writer.is_alive():
+            self.pending.put(None)
+            self.writer.join()
+        self.reader.close()
+
+    def best(self):
+        row = self.reader.execute('SELECT score FROM runs ORDER BY score DESC, id LIMIT 1').fetchone()
+        return row[0] if row else 0
+
+    def top(self, n=10):
+        rows = self.reader.execute(f'SELECT {RUN_COLUMNS} FROM runs ORDER BY score DESC, id LIMIT ?', (n,))
+        return [_row(row) for row in rows]
+
+    def day_best(self, day=None):
+        if day is None:
+            day = day_of(time.time())
+        row = self.reader.execute(
+            f'SELECT {", ".join("runs." + c for c in RUN_COLUMNS.split(", "))} '
+            'FROM daily_best JOIN runs ON runs.id = daily_best.run_id WHERE daily_best.day = ?', (day,)).fetchone()
+        return _row(row) if row else None
+
+    def daily_bests(self, days=7):
+        rows = self.reader.execute('SELECT day, score FROM daily_best ORDER BY day DESC LIMIT ?', (days,))
+        return rows.fetchall()
+
+    def count(self):
+        # Walks the score index (about 5 ms at a million runs); max(id) would
+        # be instant but overcounts once ids skip, e.g. after a failed insert
+        return self.reader.execute('SELECT count(*) FROM runs').fetchone()[0]
+
+
+def write_new(path, data):
+    # Written to a temporary file first, then linked into place, which fails
+    # rather than replacing a file that is already there; a taken name gets a
+    # -1, -2, ... suffix. Returns the path written.
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    fd, temp = tempfile.mkstemp(suffix='.tmp', dir=directory or None)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        stem, suffix = os.path.splitext(path)
+        for attempt in itertools.count(1):
+            try:
+                os.link(temp, path)
+                return path
+            except FileExistsError:
+                path = f'{stem}-{attempt}{suffix}'
+    finally:
+        os.unlink(temp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the recorded runs')
+    parser.add_argument('--file', default=SCORE_DB_FILE)
+    parser.add_argument('--top', type=int, default=10, help='best runs to list')
+    parser.add_argument('--days', type=int, default=7, help='days of daily bests to list')
+    args = parser.parse_args()
+    if not os.path.exists(args.file):
+        print(f'{args.file} not found; play a game first')
+        return
+
+    store = ScoreStore(args.file, legacy_file=None)
+    print(f'{store.count()} runs, best {store.best()}')
+    print(f"\n{'score':>6} {'seconds':>8} {'seed':>20}  {'played':<19}  replay")
+    for run in store.top(args.top):
+        duration = f"{run['duration']:.1f}" if run['duration'] is not None else '-'
+        seed = run['seed'] if run['seed'] is not None else '-'
+        played = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(run['timestamp']))
+        print(f"{run['score']:>6} {duration:>8} {seed:>20}  {played:<19}  {run['replay'] or '-'}")
+    print(f"\n{'day':<10} {'best':>6}")
+    for day, score in store.daily_bests(args.days):
+        print(f'{day:<10} {score:>6}')
+    store.close()
+
+
+if __name__ == '__main__':
+    main()
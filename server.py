@@ -0,0 +1,306 @@
+import argparse
+import asyncio
+import resource
+import struct
+import time
+
+import numpy as np
+
+from batch_env import BatchFlappyEnv
+from config import (
+    TICK_RATE, GRAVITY, JUMP_STRENGTH, PIPE_HEIGHTS, PIPE_WIDTH, PIPE_SPAWN_X,
+    BIRD_START_X, BIRD_START_Y, BASE_PIPE_SPEED, POINTS_PER_PIPE,
+)
+from simulation import PIPE_SLOTS, difficulty_for_score
+from stats import Histogram
+
+# Many headless games in one asyncio process. Every session is one row of a
+# BatchFlappyEnv, so a tick of all sessions is one batched step, and each
+# client is a TCP connection.
+#
+# Protocol. The server opens with a HELLO (magic, version, session id, tick
+# rate). The client sends one FLAP byte per flap; it applies on the next
+# tick. The server sends two bytes per session per tick:
+#
+#   byte 0  change of bird_y on this tick, int8 (0 on the tick the bird dies)
+#   byte 1  bits 0-1  new pipe: 0 none, else index into PIPE_HEIGHTS + 1
+#           bit  2    a pipe was passed (POINTS_PER_PIPE points)
+#           bits 3-4  death cause code (simulation.DEATH_CAUSES); a new game
+#                     starts at once, with the bird at BIRD_START_Y
+#           bit  5    a flap was applied on this tick
+#
+# Pipe x positions, the speed and the score follow from the game rules, so a
+# client rebuilds the whole state from these (SessionView does). Records
+# are collected for flush_ticks ticks and sent as one write per session,
+# since the per-connection send dominates the cost of a tick.
+
+PROTOCOL_VERSION = 1
+HELLO = struct.Struct('<2sBIH')
+HELLO_MAGIC = b'FB'
+FLAP = b'\x01'
+RECORD_SIZE = 2
+NEW_PIPE_MASK = 0x03
+SCORED_BIT = 0x04
+CAUSE_SHIFT = 3
+CAUSE_MASK = 0x03
+FLAPPED_BIT = 0x20
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_CAPACITY = 5000
+FLUSH_TICKS = 6
+REPORT_SECONDS = 5.0
+# A client this far behind on reading is disconnected
+MAX_BUFFERED_BYTES = 64 * 1024
+# Past this many ticks behind, the schedule restarts instead of catching up
+MAX_CATCH_UP_TICKS = 30
+
+
+def raise_file_limit():
+    # Every session is a socket; lift the soft descriptor limit to the hard one
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    return hard
+
+
+class SessionView:
+    # A client's copy of one session, rebuilt from its records
+
+    def __init__(self):
+        self.games = 0
+        self.reset()
+
+    def reset(self):
+        self.bird_y = BIRD_START_Y
+        self.bird_movement = 0.0
+        self.score = 0
+        self.speed = BASE_PIPE_SPEED
+        self.pipes = []
+
+    def apply(self, dy, events):
+        # Returns (death cause code, final score) when the game ended on this tick
+        score = self.score + (POINTS_PER_PIPE if events & SCORED_BIT else 0)
+        cause = (events >> CAUSE_SHIFT) & CAUSE_MASK
+        if cause:
+            self.games += 1
+            self.reset()
+            return cause, score
+        if events & FLAPPED_BIT:
+            self.bird_movement = JUMP_STRENGTH
+        self.bird_movement += GRAVITY
+        self.bird_y += dy
+        new_pipe = events & NEW_PIPE_MASK
+        if new_pipe:
+            self.pipes.append([PIPE_SPAWN_X, PIPE_HEIGHTS[new_pipe - 1]])
+        # Same order as the simulation: move, drop pipes that left the screen, then score
+        pipes = self.pipes
+        for pipe in pipes:
+            pipe[0] = round(pipe[0] - self.speed)
+        while pipes and pipes[0][0] - PIPE_WIDTH // 2 + PIPE_WIDTH <= 0:
+            pipes.pop(0)
+        if score != self.score:
+            self.score = score
+            self.speed = difficulty_for_score(score)[0]
+        return None
+
+    def next_pipe(self):
+        for x, gap_y in self.pipes:
+            if x >= BIRD_START_X:
+                return x, gap_y
+        return None
+
+
+class SessionProtocol(asyncio.Protocol):
+    def __init__(self, server):
+        self.server = server
+        self.transport = None
+        self.slot = None
+        # Records of the current flush window before this session existed are skipped
+        self.first_record = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+        self.slot = self.server.open_session(self)
+        if self.slot is None:
+            transport.close()
+
+    def data_received(self, data):
+        if self.slot is not None and FLAP in data:
+            self.server.flaps[self.slot] = True
+
+    def connection_lost(self, exc):
+        if self.slot is not None:
+            self.server.close_session(self.slot)
+            self.slot = None
+
+
+class GameServer:
+    def __init__(self, capacity=DEFAULT_CAPACITY, seed=None, tick_rate=TICK_RATE, flush_ticks=FLUSH_TICKS):
+        self.capacity = capacity
+        self.tick_rate = tick_rate
+        self.flush_ticks = flush_ticks
+        self.env = BatchFlappyEnv(capacity, seed)
+        self.flaps = np.zeros(capacity, dtype=bool)
+        self.sessions = {}
+        self.free = list(range(capacity - 1, -1, -1))
+        self.restarts = np.zeros(capacity, dtype=bool)
+        self.next_id = 0
+        self.tick = 0
+        # One row of flush_ticks records per session, sent as one write
+        self.records = np.zeros((capacity, flush_ticks * RECORD_SIZE), dtype=np.uint8)
+        self.record_index = 0
+        gap_codes = np.zeros(max(PIPE_HEIGHTS) + 1, dtype=np.uint8)
+        gap_codes[PIPE_HEIGHTS] = np.arange(1, len(PIPE_HEIGHTS) + 1)
+        self.gap_codes = gap_codes
+        self._rows = np.arange(capacity)
+        self.reset_stats()
+        self.dropped = 0
+        self.refused = 0
+
+    def reset_stats(self):
+        # Per report interval: how late each tick started, and what it cost
+        self.latency = Histogram()
+        self.work = Histogram()
+        self.flush_work = Histogram()
+        self.ticks_run = 0
+        self.skipped = 0
+        self.bytes_sent = 0
+        self.stats_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+
+    def open_session(self, protocol):
+        if not self.free:
+            self.refused += 1
+            return None
+        slot = self.free.pop()
+        self.sessions[slot] = protocol
+        self.restarts[slot] = True
+        self.flaps[slot] = False
+        protocol.first_record = self.record_index
+        protocol.transport.write(HELLO.pack(HELLO_MAGIC, PROTOCOL_VERSION, self.next_id, self.tick_rate))
+        self.next_id += 1
+        return slot
+
+    def close_session(self, slot):
+        del self.sessions[slot]
+        self.free.append(slot)
+
+    def step(self):
+        env = self.env
+        if self.restarts.any():
+            env.reset_games(self.restarts)
+            self.restarts[:] = False
+        actions = self.flaps
+        self.flaps = np.zeros(self.capacity, dtype=bool)
+        bird_y = env.bird_y
+        spawned = env.pipes_spawned.copy()
+        _, reward, done, info = env.step(actions)
+
+        dy = np.clip(env.bird_y - bird_y, -128, 127).astype(np.int8)
+        dy[done] = 0
+        new_pipe = (env.pipes_spawned > spawned) & ~done
+        slot = (env.pipes_spawned - 1) % PIPE_SLOTS
+        gap_code = np.where(new_pipe, self.gap_codes[env.pipe_gap[self._rows, slot]], 0)
+        events = (gap_code.astype(np.uint8)
+                  | np.where(reward > 0, SCORED_BIT, 0).astype(np.uint8)
+                  | (np.where(done, info['death_cause'], 0).astype(np.uint8) << CAUSE_SHIFT)
+                  | np.where(actions, FLAPPED_BIT, 0).astype(np.uint8))
+        column = self.record_index * RECORD_SIZE
+        self.records[:, column] = dy.view(np.uint8)
+        self.records[:, column + 1] = events
+        self.record_index += 1
+        self.tick += 1
+        if self.record_index == self.flush_ticks:
+            self.flush()
+
+    def flush(self):
+        start = time.perf_counter()
+        # One copy of all records; every session's write is a slice of it
+        records = memoryview(self.records.tobytes())
+        row = self.flush_ticks * RECORD_SIZE
+        sent = 0
+        slow = []
+        for slot, protocol in self.sessions.items():
+            transport = protocol.transport
+            if transport.get_write_buffer_size() > MAX_BUFFERED_BYTES:
+                slow.append(transport)
+                continue
+            start_byte = slot * row
+            data = records[start_byte + protocol.first_record * RECORD_SIZE:start_byte + row]
+            protocol.first_record = 0
+            transport.write(data)
+            sent += len(data)
+        for transport in slow:
+            self.dropped += 1
+            transport.abort()
+        self.record_index = 0
+        self.bytes_sent += sent
+        self.flush_work.add((time.perf_counter() - start) * 1000)
+
+    async def run(self):
+        interval = 1.0 / self.tick_rate
+        next_tick = time.perf_counter()
+        report_at = next_tick + REPORT_SECONDS
+        while True:
+            now = time.perf_counter()
+            if next_tick > now:
+                await asyncio.sleep(next_tick - now)
+                now = time.perf_counter()
+            else:
+                # Behind schedule: still let the loop read flaps and accept clients
+                await asyncio.sleep(0)
+            if now - next_tick > MAX_CATCH_UP_TICKS * interval:
+                self.skipped += int((now - next_tick) / interval)
+                next_tick = now
+            self.latency.add((now - next_tick) * 1000)
+            self.step()
+            self.work.add((time.perf_counter() - now) * 1000)
+            self.ticks_run += 1
+            next_tick += interval
+            if now >= report_at:
+                self.report()
+                report_at = now + REPORT_SECONDS
+
+    def report(self):
+        elapsed = time.perf_counter() - self.stats_start
+        cpu = (time.process_time() - self.cpu_start) / elapsed
+        latency, work, flush = self.latency.summary(), self.work.summary(), self.flush_work.summary()
+        print(f'{len(self.sessions):>6} sessions  {self.ticks_run / elapsed:5.1f} ticks/s  '
+              f"tick start late p50 {latency['p50_ms']:.2f} p99 {latency['p99_ms']:.2f} "
+              f"max {latency['max_ms']:.2f} ms  "
+              f"tick work p50 {work['p50_ms']:.2f} p99 {work['p99_ms']:.2f} ms  "
+              f"flush p99 {flush['p99_ms']:.2f} ms  "
+              f'{self.bytes_sent / elapsed / 1024:,.0f} KiB/s out  cpu {cpu:.0%}  '
+              f'skipped {self.skipped}  dropped {self.dropped}  refused {self.refused}', flush=True)
+        self.reset_stats()
+
+
+async def serve(host, port, capacity, seed, flush_ticks):
+    game_server = GameServer(capacity, seed, flush_ticks=flush_ticks)
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: SessionProtocol(game_server), host, port, backlog=1024)
+    print(f'Serving up to {capacity} sessions on {host}:{port}, {game_server.tick_rate} ticks/s, '
+          f'records sent every {flush_ticks} ticks', flush=True)
+    async with server:
+        await game_server.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Host many headless game sessions over TCP')
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--capacity', type=int, default=DEFAULT_CAPACITY, help='maximum concurrent sessions')
+    parser.add_argument('--flush-ticks', type=int, default=FLUSH_TICKS,
+                        help='ticks of records per write; lower means less delay and more sends')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+    raise_file_limit()
+    try:
+        asyncio.run(serve(args.host, args.port, args.capacity, args.seed, args.flush_ticks))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
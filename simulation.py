@@ -0,0 +1,533 @@
+import math
+import random
+
+from config import (
+    TICK_RATE, GRAVITY, JUMP_STRENGTH, BASE_PIPE_SPEED, BASE_PIPE_SPAWN_RATE,
+    PIPE_GAP, PIPE_HEIGHTS, FLOOR_Y, CEILING_Y, PIPE_WIDTH, PIPE_HEIGHT,
+    PIPE_SPAWN_X, BIRD_WIDTH, BIRD_HEIGHT, BIRD_START_X, BIRD_START_Y,
+    BIRD_FLAP_RATE, BIRD_FRAME_COUNT, MAX_BIRD_ROTATION, MIN_BIRD_ROTATION,
+    ROTATION_SPEED, DIFFICULTY_SCALE, MAX_PIPE_SPEED, MIN_PIPE_SPAWN_RATE,
+    SPAWN_RATE_STEP, POINTS_PER_PIPE,
+)
+
+# Headless game rules. Nothing in here may import pygame: the simulation has
+# to run on machines without a display or audio device.
+
+DEATH_PIPE = 'pipe'
+DEATH_FLOOR = 'floor'
+DEATH_CEILING = 'ceiling'
+
+# Compact integer codes for death causes, for results stored in arrays
+CAUSE_NONE = 0
+CAUSE_PIPE = 1
+CAUSE_FLOOR = 2
+CAUSE_CEILING = 3
+DEATH_CAUSES = (None, DEATH_PIPE, DEATH_FLOOR, DEATH_CEILING)
+
+# Bird vs pipe tests: the unrotated bird rect, or a collider (see
+# collision.py) that checks the drawn pixels. Index = stored code.
+COLLISION_RECT = 'rect'
+COLLISION_PIXEL = 'pixel'
+COLLISION_MODES = (COLLISION_RECT, COLLISION_PIXEL)
+
+BIRD_LEFT = BIRD_START_X - BIRD_WIDTH // 2
+BIRD_RIGHT = BIRD_LEFT + BIRD_WIDTH
+BIRD_HALF_HEIGHT = BIRD_HEIGHT // 2
+# Half the bird's diagonal: no rotation draws it wider than this
+BIRD_RADIUS = math.ceil(math.hypot(BIRD_WIDTH, BIRD_HEIGHT) / 2)
+
+
+def ms_to_ticks(ms):
+    return max(1, round(ms * TICK_RATE / 1000))
+
+
+# Fewest ticks between two pipe spawns, at maximum difficulty
+MIN_SPAWN_TICKS = ms_to_ticks(MIN_PIPE_SPAWN_RATE)
+# A pipe crosses the screen in at most (PIPE_SPAWN_X + PIPE_WIDTH) / BASE_PIPE_SPEED
+# ticks and pipes spawn at least every MIN_SPAWN_TICKS ticks, so this many
+# slots always hold every pipe that is still on screen.
+PIPE_SLOTS = math.ceil((PIPE_SPAWN_X + PIPE_WIDTH) / BASE_PIPE_SPEED / MIN_SPAWN_TICKS) + 1
+
+
+def ticks_per_step(tick_rate):
+    # TICK_RATE ticks per step() at tick_rate. A coarse step spawns at most
+    # one pipe, so it may not cover more ticks than the shortest spawn interval.
+    if tick_rate <= 0 or TICK_RATE % tick_rate or TICK_RATE // tick_rate > MIN_SPAWN_TICKS:
+        raise ValueError(f'tick_rate must divide {TICK_RATE} and be at least '
+                         f'{math.ceil(TICK_RATE / MIN_SPAWN_TICKS)}, got {tick_rate}')
+    return TICK_RATE // tick_rate
+
+
+MASK64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+class CounterRandom:
+    # Counter-based generator (SplitMix64): draw n depends only on (seed, n),
+    # so the whole state is two integers and can be saved or copied for free.
+    __slots__ = ('seed', 'counter')
+
+    def __init__(self, seed=0):
+        self.reseed(seed)
+
+    def reseed(self, seed):
+        self.seed = seed & MASK64
+        self.counter = 0
+
+    def next64(self):
+        z = (self.seed + (self.counter + 1) * GOLDEN_GAMMA) & MASK64
+        self.counter += 1
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+        return z ^ (z >> 31)
+
+    def choice(self, seq):
+        return seq[self.next64() % len(seq)]
+
+    def getstate(self):
+        return (self.seed, self.counter)
+
+    def setstate(self, state):
+        self.seed, self.counter = state
+
+
+def difficulty_for_score(score):
+    speed = min(MAX_PIPE_SPEED, BASE_PIPE_SPEED + score * DIFFICULTY_SCALE)
+    spawn_rate = max(MIN_PIPE_SPAWN_RATE, BASE_PIPE_SPAWN_RATE - score * SPAWN_RATE_STEP)
+    return speed, int(spawn_rate)
+
+
+class PipePair:
+    __slots__ = ('centerx', 'prev_centerx', 'gap_y', 'slot')
+
+    def __init__(self, centerx, gap_y, slot=0):
+        self.centerx = centerx
+        # Position one step earlier, for renderers interpolating between steps
+        self.prev_centerx = centerx
+        # gap_y is the top of the bottom pipe; the top pipe ends PIPE_GAP above it
+        self.gap_y = gap_y
+        self.slot = slot
+
+    @property
+    def left(self):
+        return self.centerx - PIPE_WIDTH // 2
+
+    def bottom_rect(self):
+        return (self.left, self.gap_y, PIPE_WIDTH, PIPE_HEIGHT)
+
+    def top_rect(self):
+        return (self.left, self.gap_y - PIPE_GAP - PIPE_HEIGHT, PIPE_WIDTH, PIPE_HEIGHT)
+
+
+class PipeRing:
+    # Fixed pool of PipePair objects used as a ring buffer. Pipes are addressed
+    # by a monotonic spawn index; index i lives in slot i % capacity.
+
+    def __init__(self, capacity=PIPE_SLOTS):
+        self.capacity = capacity
+        self.slots = [PipePair(0, 0, slot) for slot in range(capacity)]
+        self.head = 0
+        self.spawned = 0
+
+    def clear(self):
+        self.head = 0
+        self.spawned = 0
+
+    def __len__(self):
+        return self.spawned - self.head
+
+    def __iter__(self):
+        slots, capacity = self.slots, self.capacity
+        for index in range(self.head, self.spawned):
+            yield slots[index % capacity]
+
+    def __getitem__(self, index):
+        if not self.head <= index < self.spawned:
+            raise IndexError(index)
+        return self.slots[index % self.capacity]
+
+    def push(self, centerx, gap_y):
+        if self.spawned - self.head == self.capacity:
+            raise OverflowError('pipe ring is full')
+        pipe = self.slots[self.spawned % self.capacity]
+        pipe.centerx = pipe.prev_centerx = centerx
+        pipe.gap_y = gap_y
+        self.spawned += 1
+        return pipe
+
+    def cull(self):
+        # Pipes leave in spawn order, so only the oldest ones need checking
+        while self.head < self.spawned:
+            if self.slots[self.head % self.capacity].left + PIPE_WIDTH > 0:
+                break
+            self.head += 1
+
+
+class SimState:
+    # Everything about a game that changes while it is played, detached from
+    # the simulation it came from: scalars plus the live pipes as a flat
+    # (centerx, prev_centerx, gap_y, ...) tuple. Treat it as immutable; the
+    # same state can be restored any number of times.
+    __slots__ = (
+        'seed', 'rng_counter', 'tick', 'bird_y', 'prev_bird_y', 'bird_movement', 'bird_rotation',
+        'bird_index', 'bird_flap_timer', 'score', 'next_pipe_index', 'current_pipe_speed',
+        'current_spawn_rate', 'spawn_interval', 'spawn_timer', 'done', 'death_cause',
+        'pipes_head', 'pipes',
+    )
+
+    @property
+    def pipe_count(self):
+        return len(self.pipes) // 3
+
+
+class FlappySimulation:
+    def __init__(self, seed=None, tick_rate=TICK_RATE, collider=None):
+        # step() may cover several TICK_RATE ticks, e.g. 4 at a 15 Hz decision rate
+        self.ticks_per_step = ticks_per_step(tick_rate)
+        self.tick_rate = tick_rate
+        # Optional pixel narrow phase with bounds(frame, rotation, bird_y) and
+        # hits_pipe(frame, rotation, bird_y, pipe_left, gap_y)
+        self.collider = collider
+        # Seeds for later episodes when reset() is called without one
+        self.seed_source = random.Random(seed)
+        self.rng = CounterRandom()
+        self.pipes = PipeRing()
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        if seed is None:
+            seed = self.seed_source.getrandbits(63)
+        self.rng.reseed(seed)
+        self.seed = self.rng.seed
+        self.bird_y = self.prev_bird_y = BIRD_START_Y
+        self.bird_movement = 0
+        self.bird_rotation = 0
+        self.bird_index = 0
+        self.bird_flap_timer = 0
+        self.pipes.clear()
+        self.next_pipe_index = 0
+        self.score = 0
+        self.tick = 0
+        self.current_pipe_speed = BASE_PIPE_SPEED
+        self.current_spawn_rate = BASE_PIPE_SPAWN_RATE
+        self.spawn_interval = ms_to_ticks(self.current_spawn_rate)
+        self.spawn_timer = 0
+        self.done = False
+        self.death_cause = None
+        return self.observe()
+
+    def snapshot(self):
+        state = SimState()
+        rng, ring = self.rng, self.pipes
+        state.seed = rng.seed
+        state.rng_counter = rng.counter
+        state.tick = self.tick
+        state.bird_y = self.bird_y
+        state.prev_bird_y = self.prev_bird_y
+        state.bird_movement = self.bird_movement
+        state.bird_rotation = self.bird_rotation
+        state.bird_index = self.bird_index
+        state.bird_flap_timer = self.bird_flap_timer
+        state.score = self.score
+        state.next_pipe_index = self.next_pipe_index
+        state.current_pipe_speed = self.current_pipe_speed
+        state.current_spawn_rate = self.current_spawn_rate
+        state.spawn_interval = self.spawn_interval
+        state.spawn_timer = self.spawn_timer
+        state.done = self.done
+        state.death_cause = self.death_cause
+        state.pipes_head = ring.head
+        pipes = []
+        for pipe in ring:
+            pipes += (pipe.centerx, pipe.prev_centerx, pipe.gap_y)
+        state.pipes = tuple(pipes)
+        return state
+
+    def restore(self, state):
+        rng, ring = self.rng, self.pipes
+        rng.seed = self.seed = state.seed
+        rng.counter = state.rng_counter
+        self.tick = state.tick
+        self.bird_y = state.bird_y
+        self.prev_bird_y = state.prev_bird_y
+        self.bird_movement = state.bird_movement
+        self.bird_rotation = state.bird_rotation
+        self.bird_index = state.bird_index
+        self.bird_flap_timer = state.bird_flap_timer
+        self.score = state.score
+        self.next_pipe_index = state.next_pipe_index
+        self.current_pipe_speed = state.current_pipe_speed
+        self.current_spawn_rate = state.current_spawn_rate
+        self.spawn_interval = state.spawn_interval
+        self.spawn_timer = state.spawn_timer
+        self.done = state.done
+        self.death_cause = state.death_cause
+        # Pipes go back into the slots they were spawned into, so renderers
+        # that key per-pipe data on PipePair.slot stay valid
+        head = ring.head = state.pipes_head
+        pipes = state.pipes
+        ring.spawned = head + len(pipes) // 3
+        slots, capacity = ring.slots, ring.capacity
+        for offset in range(0, len(pipes), 3):
+            pipe = slots[(head + offset // 3) % capacity]
+            pipe.centerx, pipe.prev_centerx, pipe.gap_y = pipes[offset:offset + 3]
+
+    def fork(self):
+        # An independent copy of this game to play ahead on. Tree searches
+        # that branch often should rather keep one scratch simulation and
+        # restore() states into it, which allocates nothing but the state.
+        # The fork shares the collider (read-only) and gets its own copy of
+        # the seed stream: a reset() without a seed on the fork draws what the
+        # parent's next one would, and leaves the parent's stream alone.
+        other = FlappySimulation.__new__(FlappySimulation)
+        other.tick_rate = self.tick_rate
+        other.ticks_per_step = self.ticks_per_step
+        other.collider = self.collider
+        other.seed_source = random.Random(0)
+        other.seed_source.setstate(self.seed_source.getstate())
+        other.rng = CounterRandom()
+        other.pipes = PipeRing(self.pipes.capacity)
+        other.restore(self.snapshot())
+        return other
+
+    def bird_rect(self):
+        return (BIRD_LEFT, self.bird_y - BIRD_HALF_HEIGHT, BIRD_WIDTH, BIRD_HEIGHT)
+
+    def next_pipe(self):
+        if self.next_pipe_index < self.pipes.spawned:
+            return self.pipes[self.next_pipe_index]
+        return None
+
+    def observe(self):
+        pipe = self.next_pipe()
+        if pipe is None:
+            dx = PIPE_SPAWN_X - BIRD_START_X
+            gap_center = PIPE_HEIGHTS[len(PIPE_HEIGHTS) // 2] - PIPE_GAP / 2
+        else:
+            dx = pipe.centerx - BIRD_START_X
+            gap_center = pipe.gap_y - PIPE_GAP / 2
+        return (self.bird_y, self.bird_movement, dx, gap_center)
+
+    def step(self, action):
+        """Advance one step of ticks_per_step ticks; a truthy action flaps at its
+        start. Returns (obs, reward, done, info)."""
+        if self.done:
+            raise RuntimeError('step() called on a finished game; call reset() first')
+
+        if action:
+            self.bird_movement = JUMP_STRENGTH
+
+        if self.ticks_per_step == 1:
+            scored = self.advance_tick()
+        else:
+            scored = self.advance_step(self.ticks_per_step)
+        self.tick += 1
+
+        info = {
+            'tick': self.tick,
+            'score': self.score,
+            'scored': scored,
+            'death_cause': self.death_cause,
+        }
+        return self.observe(), scored, self.done, info
+
+    def advance_tick(self):
+        self.spawn_timer += 1
+        if self.spawn_timer >= self.spawn_interval:
+            self.spawn_timer = 0
+            self.create_pipe()
+
+        self.bird_flap_timer += 1
+        if self.bird_flap_timer >= BIRD_FLAP_RATE:
+            self.bird_index = (self.bird_index + 1) % BIRD_FRAME_COUNT
+            self.bird_flap_timer = 0
+
+        self.bird_movement += GRAVITY
+        self.prev_bird_y = self.bird_y
+        self.bird_y = int(self.bird_y + self.bird_movement)
+        self.rotate_bird()
+        self.move_pipes()
+
+        self.death_cause = self.check_collision()
+        self.done = self.death_cause is not None
+        return self.check_score()
+
+    def advance_step(self, ticks):
+        # Several ticks at once, for coarse tick rates. The bird's path is
+        # still followed tick by tick, which is a few additions and keeps its
+        # heights those of the game. The pipes move once, and collisions are
+        # one swept test per pipe: the ticks on which it overlaps the bird
+        # horizontally, against the bird's heights on those ticks. Returns
+        # the points scored up to the tick the bird died, if it did.
+        spawn_at = self.spawn_interval - self.spawn_timer
+        self.spawn_timer += ticks
+        spawned = None
+        if spawn_at <= ticks:
+            self.spawn_timer -= self.spawn_interval
+            spawned = self.create_pipe()
+
+        flap_timer = self.bird_flap_timer + ticks
+        self.bird_index = (self.bird_index + flap_timer // BIRD_FLAP_RATE) % BIRD_FRAME_COUNT
+        self.bird_flap_timer = flap_timer % BIRD_FLAP_RATE
+
+        start_y = self.bird_y
+        heights = []
+        rotations = []
+        for _ in range(ticks):
+            self.bird_movement += GRAVITY
+            self.bird_y = int(self.bird_y + self.bird_movement)
+            self.rotate_bird()
+            heights.append(self.bird_y)
+            rotations.append(self.bird_rotation)
+        self.prev_bird_y = start_y
+
+        # Every pipe moves in a straight line from where it was a tick before
+        # the step; a pipe spawned during the step starts where it would have
+        # been had it existed, and is only there from its spawn tick on
+        speed = self.current_pipe_speed
+        sweeps = []
+        for pipe in self.pipes:
+            if pipe is spawned:
+                start, first = PIPE_SPAWN_X + speed * (spawn_at - 1), spawn_at
+            else:
+                start, first = pipe.centerx, 1
+            pipe.prev_centerx = pipe.centerx
+            pipe.centerx = round(start - speed * ticks)
+            sweeps.append((pipe, start, first))
+
+        death_tick, cause = self.sweep_collision(heights, rotations, sweeps, speed)
+        self.death_cause = cause
+        self.done = cause is not None
+        if self.done:
+            self.bird_y = heights[death_tick - 1]
+            self.bird_rotation = rotations[death_tick - 1]
+
+        # Pipes whose center passed the bird by the last tick played score
+        scored = 0
+        head = self.pipes.head
+        while self.next_pipe_index < self.pipes.spawned:
+            _, start, _ = sweeps[self.next_pipe_index - head]
+            if start - speed * death_tick >= BIRD_START_X:
+                break
+            self.next_pipe_index += 1
+            scored += POINTS_PER_PIPE
+        self.pipes.cull()
+        if scored:
+            self.score += scored
+            self.update_difficulty()
+        return scored
+
+    def sweep_collision(self, heights, rotations, sweeps, speed):
+        # (tick of death, cause), or (len(heights), None). On one tick a pipe
+        # is tested before the ceiling and the ceiling before the floor, as in
+        # check_collision().
+        ticks = len(heights)
+        death_tick, cause = ticks, None
+        for tick, y in enumerate(heights, 1):
+            top = y - BIRD_HALF_HEIGHT
+            if top <= CEILING_Y:
+                death_tick, cause = tick, DEATH_CEILING
+                break
+            if top + BIRD_HEIGHT >= FLOOR_Y:
+                death_tick, cause = tick, DEATH_FLOOR
+                break
+
+        collider = self.collider
+        # The widest the bird gets horizontally, drawn at any rotation
+        left, right = (BIRD_LEFT, BIRD_RIGHT) if collider is None else \
+            (BIRD_START_X - BIRD_RADIUS, BIRD_START_X + BIRD_RADIUS)
+        for pipe, start, first in sweeps:
+            start_left = start - PIPE_WIDTH // 2
+            # Ticks low..high on which the pipe's span overlaps [left, right)
+            low = max(first, math.floor((start_left - right) / speed) + 1)
+            high = min(death_tick, math.ceil((start_left + PIPE_WIDTH - left) / speed) - 1)
+            gap_top, gap_bottom = pipe.gap_y - PIPE_GAP, pipe.gap_y
+            for tick in range(low, high + 1):
+                y = heights[tick - 1]
+                if collider is None:
+                    if y - BIRD_HALF_HEIGHT >= gap_top and y + BIRD_HALF_HEIGHT <= gap_bottom:
+                        continue
+                else:
+                    rotation = rotations[tick - 1]
+                    pipe_left = round(start - speed * tick) - PIPE_WIDTH // 2
+                    bird_left, top, bird_right, bottom = collider.bounds(self.bird_index, rotation, y)
+                    if (pipe_left >= bird_right or pipe_left + PIPE_WIDTH <= bird_left
+                            or top >= gap_top and bottom <= gap_bottom
+                            or not collider.hits_pipe(self.bird_index, rotation, y, pipe_left, pipe.gap_y)):
+                        continue
+                if tick < death_tick or cause != DEATH_PIPE:
+                    death_tick, cause = tick, DEATH_PIPE
+                break
+        return death_tick, cause
+
+    def create_pipe(self):
+        return self.pipes.push(PIPE_SPAWN_X, self.rng.choice(PIPE_HEIGHTS))
+
+    def move_pipes(self):
+        speed = self.current_pipe_speed
+        for pipe in self.pipes:
+            pipe.prev_centerx = pipe.centerx
+            pipe.centerx = round(pipe.centerx - speed)
+        self.pipes.cull()
+
+    def rotate_bird(self):
+        # Target rotation based on movement
+        if self.bird_movement < 0:
+            target_rotation = MAX_BIRD_ROTATION
+        else:
+            target_rotation = MIN_BIRD_ROTATION
+
+        if self.bird_rotation < target_rotation:
+            self.bird_rotation = min(target_rotation, self.bird_rotation + ROTATION_SPEED)
+        elif self.bird_rotation > target_rotation:
+            self.bird_rotation = max(target_rotation, self.bird_rotation - ROTATION_SPEED)
+
+    @property
+    def collision_mode(self):
+        return COLLISION_RECT if self.collider is None else self.collider.mode
+
+    def check_collision(self):
+        bird_top = self.bird_y - BIRD_HALF_HEIGHT
+        bird_bottom = bird_top + BIRD_HEIGHT
+        collider = self.collider
+        if collider is None:
+            left, top, right, bottom = BIRD_LEFT, bird_top, BIRD_RIGHT, bird_bottom
+        else:
+            left, top, right, bottom = collider.bounds(self.bird_index, self.bird_rotation, self.bird_y)
+        for pipe in self.pipes:
+            pipe_left = pipe.left
+            if pipe_left >= right or pipe_left + PIPE_WIDTH <= left:
+                continue
+            # Overlap with the top pipe or the bottom pipe, same as colliderect;
+            # with a collider that is only the broad phase
+            if top < pipe.gap_y - PIPE_GAP or bottom > pipe.gap_y:
+                if collider is None or collider.hits_pipe(self.bird_index, self.bird_rotation,
+                                                          self.bird_y, pipe_left, pipe.gap_y):
+                    return DEATH_PIPE
+        if bird_top <= CEILING_Y:
+            return DEATH_CEILING
+        if bird_bottom >= FLOOR_Y:
+            return DEATH_FLOOR
+        return None
+
+    def check_score(self):
+        scored = 0
+        pipes = self.pipes
+        while self.next_pipe_index < pipes.spawned and pipes[self.next_pipe_index].centerx < BIRD_START_X:
+            self.next_pipe_index += 1
+            scored += POINTS_PER_PIPE
+        if scored:
+            self.score += scored
+            self.update_difficulty()
+        return scored
+
+    def update_difficulty(self):
+        new_speed, new_spawn_rate = difficulty_for_score(self.score)
+
+        if abs(new_speed - self.current_pipe_speed) > 0.01:
+            self.current_pipe_speed = new_speed
+        if abs(new_spawn_rate - self.current_spawn_rate) > 1:
+            self.current_spawn_rate = new_spawn_rate
+            # Changing the rate restarts the spawn countdown, like set_timer did
+            self.spawn_interval = ms_to_ticks(new_spawn_rate)
+            self.spawn_timer = 0
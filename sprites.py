@@ -0,0 +1,51 @@
+import pygame
+
+from config import (
+    MAX_BIRD_ROTATION, MIN_BIRD_ROTATION, ROTATION_SPEED, TRAIL_LENGTH,
+)
+
+# Every surface the game loop would otherwise build per frame, made once at
+# load time: rotated bird frames, the flipped top pipe and faded trail ghosts.
+
+TRAIL_START_ALPHA = 200
+TRAIL_FADE = 15
+TRAIL_ALPHAS = [max(0, TRAIL_START_ALPHA - TRAIL_FADE * step)
+                for step in range(1, TRAIL_LENGTH + 1)]
+
+
+class SpriteCache:
+    def __init__(self, bird_frames, pipe_surface):
+        self.angles = list(range(MIN_BIRD_ROTATION, MAX_BIRD_ROTATION + 1, ROTATION_SPEED))
+
+        # rotated[frame][angle index] -> (surface, half width, half height)
+        self.rotated = []
+        for frame in bird_frames:
+            rotations = []
+            for angle in self.angles:
+                surface = pygame.transform.rotozoom(frame, angle, 1)
+                rotations.append((surface, surface.get_width() // 2, surface.get_height() // 2))
+            self.rotated.append(rotations)
+
+        self.pipe_bottom = pipe_surface
+        self.pipe_top = pygame.transform.flip(pipe_surface, False, True)
+
+        # trail[frame][alpha] -> copy of the frame with that surface alpha
+        self.trail = []
+        for frame in bird_frames:
+            ghosts = {}
+            for alpha in TRAIL_ALPHAS:
+                if alpha > 0:
+                    ghost = frame.copy()
+                    ghost.set_alpha(alpha)
+                    ghosts[alpha] = ghost
+            self.trail.append(ghosts)
+
+    def angle_index(self, rotation):
+        index = round((rotation - MIN_BIRD_ROTATION) / ROTATION_SPEED)
+        return min(len(self.angles) - 1, max(0, index))
+
+    def rotated_bird(self, frame_index, rotation):
+        return self.rotated[frame_index][self.angle_index(rotation)]
+
+    def trail_ghost(self, frame_index, alpha):
+        return self.trail[frame_index].get(alpha)
@@ -0,0 +1,50 @@
+# Latency statistics without pygame, for the headless modules as well as
+# the frame profiler: a fixed-bucket histogram for whole runs and a
+# percentile over a short rolling window.
+
+BUCKET_MS = 0.05
+BUCKET_COUNT = 2000
+
+
+class Histogram:
+    def __init__(self):
+        self.counts = [0] * (BUCKET_COUNT + 1)
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def add(self, ms):
+        # Samples can be slightly negative, e.g. a tick woken early; they count as 0
+        self.counts[max(0, min(int(ms / BUCKET_MS), BUCKET_COUNT))] += 1
+        self.total += 1
+        self.sum += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, fraction):
+        if not self.total:
+            return 0.0
+        target = fraction * self.total
+        seen = 0
+        for bucket, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return min((bucket + 1) * BUCKET_MS, self.max)
+        return self.max
+
+    def summary(self):
+        return {
+            'count': self.total,
+            'mean_ms': self.sum / self.total if self.total else 0.0,
+            'p50_ms': self.percentile(0.50),
+            'p95_ms': self.percentile(0.95),
+            'p99_ms': self.percentile(0.99),
+            'max_ms': self.max,
+        }
+
+
+def rolling_percentile(samples, fraction):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
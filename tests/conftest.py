@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+# The game's modules live at the top of the repository, not in a package
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+@pytest.fixture
+def headless(monkeypatch):
+    # For tests that build the pygame game: no window or audio device, and
+    # asset paths resolve from the repository root
+    monkeypatch.setenv('SDL_VIDEODRIVER', 'dummy')
+    monkeypatch.setenv('SDL_AUDIODRIVER', 'dummy')
+    monkeypatch.chdir(ROOT)
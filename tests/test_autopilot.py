@@ -0,0 +1,34 @@
+import sys
+
+import autopilot
+from autopilot import Autopilot
+from config import MAX_PIPE_SPEED, MIN_PIPE_SPAWN_RATE, TICK_RATE
+from simulation import FlappySimulation
+
+MINUTES = 2
+
+
+def test_survives_to_maximum_difficulty():
+    sim = FlappySimulation(0)
+    pilot = Autopilot()
+    while not sim.done and sim.tick < MINUTES * 60 * TICK_RATE:
+        sim.step(pilot.decide(sim))
+    assert not sim.done
+    assert sim.current_pipe_speed >= MAX_PIPE_SPEED and sim.current_spawn_rate <= MIN_PIPE_SPAWN_RATE
+    assert pilot.doomed == 0
+    # A new game on the same simulation starts a new plan
+    sim.reset(1)
+    for _ in range(600):
+        sim.step(pilot.decide(sim))
+    assert not sim.done and pilot.seed == 1
+
+
+def test_peak_rss_is_reported_in_megabytes():
+    peak = autopilot.peak_rss_mb()
+    assert 1 < peak < 10_000
+
+
+def test_peak_rss_is_none_without_the_resource_module(monkeypatch):
+    # As on Windows, where game.py still has to start
+    monkeypatch.setitem(sys.modules, 'resource', None)
+    assert autopilot.peak_rss_mb() is None
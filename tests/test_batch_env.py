@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+import batch_env
+import simulation
+from batch_env import BatchFlappyEnv
+from simulation import FlappySimulation, DEATH_CAUSES
+
+GAMES = 16
+
+
+@pytest.fixture
+def one_gap_height(monkeypatch):
+    # The two implementations draw gaps from different generators; with a
+    # single height they play the same course
+    monkeypatch.setattr(simulation, 'PIPE_HEIGHTS', [400])
+    monkeypatch.setattr(batch_env, '_PIPE_HEIGHTS', np.array([400], dtype=np.int32))
+
+
+@pytest.mark.parametrize('tick_rate', [60, 15, 2])
+def test_matches_simulation(one_gap_height, tick_rate):
+    env = BatchFlappyEnv(GAMES, seed=0, tick_rate=tick_rate)
+    sims = [FlappySimulation(index, tick_rate=tick_rate) for index in range(GAMES)]
+    rng = np.random.default_rng(0)
+    obs = env.observe()
+    finished = 0
+    for _ in range(3000 // env.ticks_per_step):
+        assert np.array_equal(obs, [sim.observe() for sim in sims])
+        actions = (obs[:, 0] > obs[:, 3] + 30) ^ (rng.random(GAMES) < 0.1)
+        obs, reward, done, info = env.step(actions)
+        for index, sim in enumerate(sims):
+            _, sim_reward, sim_done, _ = sim.step(actions[index])
+            assert (reward[index], done[index]) == (sim_reward, sim_done)
+            if sim_done:
+                assert info['episode_score'][index] == sim.score
+                assert info['episode_length'][index] == sim.tick
+                assert DEATH_CAUSES[info['death_cause'][index]] == sim.death_cause
+                sim.reset()
+                finished += 1
+    assert finished > GAMES
+
+
+def test_reset_games_only_resets_the_selected_games():
+    env = BatchFlappyEnv(4, seed=0)
+    for _ in range(30):
+        env.step(np.zeros(4, dtype=bool))
+    before = env.observe()
+    env.reset_games(np.array([False, True, False, False]))
+    after = env.observe()
+    fresh = BatchFlappyEnv(1, seed=0).observe()[0]
+    assert np.array_equal(after[[0, 2, 3]], before[[0, 2, 3]])
+    assert np.array_equal(after[1], fresh)
+    assert env.ticks[1] == 0 and env.ticks[0] == 30
+
+
+def test_tick_rate_must_divide_the_game_rate():
+    with pytest.raises(ValueError):
+        BatchFlappyEnv(2, tick_rate=7)
@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from neuroevolution import (
+    GenomePilot, INPUTS, decide, genome_size, load_checkpoint, save_checkpoint, split_genomes,
+)
+from simulation import FlappySimulation
+
+
+def below_gap_genome(hidden):
+    # Flaps when bird_y (input 0) is below the gap center (input 3)
+    genome = np.zeros(genome_size(hidden), dtype=np.float32)
+    w1, _, w2, _ = split_genomes(genome.reshape(1, -1), hidden)
+    w1[0, 0, 0], w1[0, 3, 0] = 1, -1
+    w2[0, 0] = 1
+    return genome
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = str(tmp_path / 'genomes.fbne')
+    rng = np.random.default_rng(0)
+    genomes = rng.normal(size=(5, genome_size(3))).astype(np.float32)
+    fitness = rng.normal(size=5).astype(np.float32)
+    save_checkpoint(path, genomes, fitness, generation=7, hidden=3)
+    loaded, loaded_fitness, generation, hidden = load_checkpoint(path)
+    assert (generation, hidden) == (7, 3)
+    assert np.array_equal(loaded, genomes) and np.array_equal(loaded_fitness, fitness)
+    assert not (tmp_path / 'genomes.fbne.tmp').exists()
+
+
+def test_rejects_other_and_truncated_files(tmp_path):
+    path = tmp_path / 'genomes.fbne'
+    save_checkpoint(str(path), np.zeros((2, genome_size())), np.zeros(2), generation=1)
+    data = path.read_bytes()
+    path.write_bytes(data[:-4])
+    with pytest.raises(ValueError):
+        load_checkpoint(str(path))
+    path.write_bytes(b'FBR' + data[3:])
+    with pytest.raises(ValueError):
+        load_checkpoint(str(path))
+
+
+def test_pilot_plays_the_saved_genome(tmp_path):
+    path = str(tmp_path / 'genomes.fbne')
+    best = below_gap_genome(4)
+    save_checkpoint(path, np.stack([best, np.zeros_like(best)]), [2.0, 1.0], generation=3, hidden=4)
+    pilot = GenomePilot.load(path)
+    sim = FlappySimulation(3)
+    while not sim.done and sim.tick < 2000:
+        obs = sim.observe()
+        flap = pilot.decide(sim)
+        assert flap == (obs[0] > obs[3])
+        sim.step(flap)
+    assert pilot.take_times().total == sim.tick and pilot.times.total == 0
+
+
+def test_batched_decisions_match_one_genome_at_a_time():
+    rng = np.random.default_rng(1)
+    genomes = rng.normal(size=(32, genome_size())).astype(np.float32)
+    obs = rng.uniform(0, 700, size=(32, INPUTS))
+    batched = decide(obs, split_genomes(genomes))
+    single = [decide(obs[i:i + 1], split_genomes(genomes[i:i + 1]))[0] for i in range(32)]
+    assert list(batched) == single
@@ -0,0 +1,16 @@
+from observation import PixelFlappyEnv, FRAME_STACK
+
+
+def test_agent_flaps_are_not_player_input(headless):
+    env = PixelFlappyEnv(seed=3)
+    try:
+        assert len(env.reset()) == FRAME_STACK
+        for _ in range(50):
+            _, _, done, _ = env.step(True)
+            if done:
+                env.reset()
+        # Nothing presents the env's frames, so measured flaps would pile up here
+        latency = env.game.latency
+        assert latency.applied == [] and latency.waiting == []
+    finally:
+        env.close()
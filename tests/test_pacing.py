@@ -0,0 +1,66 @@
+import time
+
+import pytest
+
+from pacing import PACERS, PACING_MODES, InputLatency, LatePacer, LATE_WORK_WINDOW
+
+
+def test_start_and_unpause_show_on_the_next_present():
+    latency = InputLatency()
+    latency.input(10.0)
+    latency.presented(10.004)
+    assert latency.applied == []
+    assert latency.summary()['count'] == 1
+    assert latency.summary()['max_ms'] == pytest.approx(4.0)
+
+
+def test_a_flap_waits_for_the_tick_that_applies_it():
+    latency = InputLatency()
+    latency.input(10.0, applied=False)
+    latency.presented(10.002)
+    assert latency.summary()['count'] == 0 and latency.waiting == [10.0]
+    latency.apply()
+    assert latency.waiting == [] and len(latency.applied) == 1
+    latency.presented(10.010)
+    assert latency.summary()['count'] == 1
+    assert latency.summary()['max_ms'] == pytest.approx(10.0)
+
+
+def test_threaded_present_only_counts_inputs_applied_before_its_snapshot():
+    latency = InputLatency()
+    latency.input(1.0)
+    shown = time.perf_counter()
+    latency.input(2.0)
+    latency.presented(3.0, shown=shown)
+    assert latency.summary()['count'] == 1 and [stamp for stamp, _ in latency.applied] == [2.0]
+    latency.presented(3.0)
+    assert latency.summary()['count'] == 2 and latency.applied == []
+
+
+def test_every_mode_has_a_pacer():
+    assert set(PACERS) == set(PACING_MODES)
+    for mode in PACING_MODES:
+        pacer = PACERS[mode](fps=1000)
+        pacer.wait()
+        assert pacer.wait() >= 0
+        pacer.presented()
+    assert [mode for mode in PACING_MODES if PACERS[mode].late_input] == ['late']
+
+
+def test_late_pacer_wakes_before_the_deadline_by_the_longest_recent_frame():
+    pacer = LatePacer(fps=100)
+    pacer.work = [0.004] + [0.001] * (LATE_WORK_WINDOW - 1)
+    deadline = pacer.deadline
+    pacer.wait()
+    woke = time.perf_counter()
+    assert woke >= deadline - 0.004 - 0.001
+    pacer.presented()
+    assert pacer.deadline == pytest.approx(deadline + 0.01)
+
+
+def test_late_pacer_restarts_the_cadence_after_a_missed_deadline():
+    pacer = LatePacer(fps=100)
+    time.sleep(0.05)
+    pacer.presented()
+    assert pacer.deadline > time.perf_counter()
+    assert pacer.frames == 1
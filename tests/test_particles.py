@@ -0,0 +1,50 @@
+import numpy as np
+import pygame
+
+from particles import ParticlePool
+
+RED, BLUE = (255, 0, 0), (0, 0, 255)
+
+
+def burst(pool, color, count, lifetime):
+    pool.emit(100, 100, color, count, angle=(0, 6.28), speed=(1, 2), size=(4, 6), lifetime=(lifetime, lifetime))
+
+
+def test_emit_stops_at_capacity():
+    pool = ParticlePool([RED, BLUE], capacity=10, seed=0)
+    burst(pool, RED, 6, 10)
+    burst(pool, BLUE, 6, 10)
+    assert len(pool) == 10
+    assert list(pool.color[:10]) == [0] * 6 + [1] * 4
+    burst(pool, RED, 1, 10)
+    assert len(pool) == 10
+
+
+def test_expired_particles_free_their_slots_for_new_ones():
+    pool = ParticlePool([RED, BLUE], capacity=10, seed=0)
+    burst(pool, RED, 6, 2)
+    burst(pool, BLUE, 4, 5)
+    pool.update(1)
+    pool.update(1)
+    # The short-lived red ones are gone and the live blue ones moved to the front
+    assert len(pool) == 4
+    assert np.all(pool.color[:4] == 1) and np.all(pool.age[:4] == 2)
+    burst(pool, RED, 8, 2)
+    assert len(pool) == 10
+    for _ in range(3):
+        pool.update(1)
+    assert len(pool) == 0
+
+
+def test_snapshot_is_detached_and_draws_inside_the_bounds():
+    pool = ParticlePool([RED, BLUE], capacity=10, seed=0)
+    burst(pool, RED, 5, 10)
+    snapshot = pool.snapshot()
+    bounds = pool.bounds()
+    pool.update(1)
+    assert len(snapshot) == 5 and not np.array_equal(snapshot.x, pool.x[:5])
+
+    screen = pygame.Surface((200, 200), pygame.SRCALPHA)
+    snapshot.draw(screen)
+    drawn = screen.get_bounding_rect()
+    assert drawn.width and bounds.contains(drawn)
@@ -0,0 +1,44 @@
+import pytest
+
+from config import PIPE_WIDTH
+from rollout import flap_below_gap
+from simulation import FlappySimulation, PipeRing, PIPE_SLOTS
+
+
+def test_ring_reuses_its_slots_in_spawn_order():
+    ring = PipeRing(capacity=3)
+    slots = list(ring.slots)
+    for index in range(3):
+        ring.push(100 * index, 400)
+    with pytest.raises(OverflowError):
+        ring.push(300, 400)
+
+    # The oldest pipe has left the screen; its slot takes the next spawn
+    ring[0].centerx = -PIPE_WIDTH // 2
+    ring.cull()
+    assert (ring.head, len(ring)) == (1, 2)
+    with pytest.raises(IndexError):
+        ring[0]
+    pipe = ring.push(300, 500)
+    assert pipe is slots[0] and ring[3] is pipe
+    assert [pipe.centerx for pipe in ring] == [100, 200, 300]
+
+
+def test_cull_stops_at_the_first_pipe_on_screen():
+    ring = PipeRing(capacity=4)
+    for centerx in (-PIPE_WIDTH // 2 + 1, -PIPE_WIDTH):
+        ring.push(centerx, 400)
+    ring.cull()
+    # Pipes leave in spawn order, so the second is not looked at
+    assert ring.head == 0
+
+
+def test_long_game_never_outgrows_the_ring():
+    sim = FlappySimulation(9)
+    obs = sim.observe()
+    most = 0
+    while not sim.done:
+        obs, _, _, _ = sim.step(flap_below_gap(obs))
+        most = max(most, len(sim.pipes))
+        assert all(pipe.left + PIPE_WIDTH > 0 for pipe in sim.pipes)
+    assert sim.pipes.spawned > PIPE_SLOTS and most <= PIPE_SLOTS
@@ -0,0 +1,49 @@
+import threading
+
+import pygame
+import pytest
+
+from profiler import ALLOCATION_COUNTER, FRAME, FrameProfiler
+
+
+@pytest.fixture
+def profilers():
+    # A render and a tick profiler, as with --threaded
+    yield FrameProfiler(enabled=True), FrameProfiler(enabled=True)
+    ALLOCATION_COUNTER.uninstall()
+
+
+def test_phases_are_summed_per_frame(profilers):
+    profiler, _ = profilers
+    for _ in range(3):
+        profiler.begin_frame()
+        for _ in range(2):
+            with profiler.phase('draw'):
+                pass
+        profiler.end_frame()
+    summary = profiler.summary()
+    assert summary[FRAME]['count'] == summary['draw']['count'] == 3
+    assert summary['draw']['max_ms'] <= summary[FRAME]['max_ms']
+
+
+def test_surfaces_are_counted_once_and_per_thread(profilers):
+    render, tick = profilers
+    original = ALLOCATION_COUNTER.originals['Surface'][1]
+    # The second profiler did not wrap the wrapper
+    assert pygame.Surface.__bases__ == (original,)
+
+    def tick_frame():
+        tick.begin_frame()
+        for _ in range(5):
+            pygame.Surface((4, 4))
+        tick.end_frame()
+
+    render.begin_frame()
+    pygame.Surface((4, 4))
+    thread = threading.Thread(target=tick_frame)
+    thread.start()
+    thread.join()
+    pygame.transform.flip(pygame.Surface((4, 4)), True, False)
+    render.end_frame()
+    assert render.allocation_summary()['total'] == 3
+    assert tick.allocation_summary()['total'] == 5
@@ -0,0 +1,36 @@
+import pygame
+
+from config import SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+def full_redraw(items):
+    # What FullFrameRenderer would show for the same display list
+    screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+    for surface, rect, area in items:
+        if surface is None:
+            area(screen)
+        else:
+            screen.blit(surface, rect, area)
+    return pygame.image.tobytes(screen, 'RGB')
+
+
+def test_dirty_frames_match_a_full_redraw(headless):
+    from game import FlappyBirdGame
+
+    game = FlappyBirdGame(3, renderer='dirty', score_file=None, autopilot=True)
+    game.sound_enabled = False
+    try:
+        canvas = game.canvas
+        partial = 0
+        for _ in range(600):
+            game.update_tick()
+            game.draw_frame()
+            pushed = canvas.pixels_pushed
+            canvas.present()
+            partial += canvas.pixels_pushed - pushed < SCREEN_WIDTH * SCREEN_HEIGHT
+            assert pygame.image.tobytes(canvas.screen, 'RGB') == full_redraw(canvas.previous)
+        # Pipes, particles, shake and the score all moved through partial repaints
+        assert game.sim.tick > 300 and partial > 300
+    finally:
+        game.scores.close()
+        pygame.quit()
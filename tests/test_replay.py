@@ -0,0 +1,89 @@
+import pytest
+
+from config import MAX_SPEED_TICKS_PER_FRAME
+from replay import Replay, ReplayRecorder
+from rollout import flap_below_gap
+from simulation import FlappySimulation, SimState
+
+SNAPSHOT_INTERVAL = 50
+
+
+def recorded_run(seed):
+    sim = FlappySimulation(seed)
+    recorder = ReplayRecorder(sim, snapshot_interval=SNAPSHOT_INTERVAL)
+    obs = sim.observe()
+    while not sim.done:
+        flap = flap_below_gap(obs)
+        recorder.record(sim, flap)
+        obs, _, _, _ = sim.step(flap)
+    return sim, recorder
+
+
+def state_of(sim):
+    state = sim.snapshot()
+    return {name: getattr(state, name) for name in SimState.__slots__}
+
+
+def test_round_trip_reproduces_the_run():
+    sim, recorder = recorded_run(11)
+    replay = Replay(recorder.to_bytes(sim))
+    assert (replay.seed, replay.ticks, replay.score, replay.death_cause) == \
+        (sim.seed, sim.tick, sim.score, sim.death_cause)
+    assert len(replay.snapshot_offsets) == (sim.tick - 1) // SNAPSHOT_INTERVAL + 1
+    assert state_of(replay.simulate()) == state_of(sim)
+
+
+def test_seek_matches_playing_from_the_start():
+    sim, recorder = recorded_run(11)
+    replay = Replay(recorder.to_bytes(sim))
+    for tick in (0, 1, SNAPSHOT_INTERVAL - 1, SNAPSHOT_INTERVAL, 3 * SNAPSHOT_INTERVAL + 7, replay.ticks):
+        expected = FlappySimulation(replay.seed)
+        while expected.tick < tick:
+            expected.step(replay.flap(expected.tick))
+        assert state_of(replay.seek(FlappySimulation(0), tick)) == state_of(expected)
+
+
+def test_rejects_data_that_is_not_a_replay():
+    with pytest.raises(ValueError):
+        Replay(b'PNG\x00' + bytes(64))
+
+
+def test_save_never_overwrites(tmp_path):
+    sim, recorder = recorded_run(11)
+    recorder.path = lambda directory: str(tmp_path / 'run.fbr')
+    paths = [recorder.save(sim, str(tmp_path)) for _ in range(3)]
+    assert len(set(paths)) == 3
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['run-1.fbr', 'run-2.fbr', 'run.fbr']
+    for path in paths:
+        assert Replay.load(path).score == sim.score
+
+
+@pytest.fixture
+def playback(headless):
+    # A game watching a replay of a recorded run, unthrottled like --replay-speed max
+    import pygame
+    from game import FlappyBirdGame
+
+    sim, recorder = recorded_run(11)
+    replay = Replay(recorder.to_bytes(sim))
+    game = FlappyBirdGame(score_file=None, speed=None, replay=replay)
+    yield game
+    game.scores.close()
+    pygame.quit()
+
+
+def test_playback_plays_a_budget_of_ticks_per_frame(playback):
+    playback.fast_forward()
+    assert 0 < playback.sim.tick <= MAX_SPEED_TICKS_PER_FRAME
+    while playback.game_state == 'game':
+        playback.fast_forward()
+    assert (playback.sim.tick, playback.sim.score) == (playback.replay.ticks, playback.replay.score)
+
+
+def test_playback_stops_where_the_recording_ends(playback, capsys):
+    # As if the re-simulated run outlived the recorded one
+    playback.replay.ticks = 40
+    for _ in range(100):
+        playback.update_tick()
+    assert playback.game_state == 'game_over' and playback.sim.tick == 40
+    assert 'Replay diverged' in capsys.readouterr().out
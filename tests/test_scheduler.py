@@ -0,0 +1,44 @@
+import pytest
+
+from scheduler import FixedTimestep, MAX_FRAME_TIME
+
+# A power of two, so whole and half ticks add up exactly in floating point
+RATE = 64
+TICK = 1 / RATE
+
+
+def test_frames_drain_in_whole_ticks():
+    timestep = FixedTimestep(RATE)
+    # Two and a half ticks, then the half tick left over completes a third
+    assert timestep.advance(2.5 * TICK) == 2
+    assert timestep.alpha == pytest.approx(0.5)
+    assert timestep.advance(0.5 * TICK) == 1
+    assert timestep.alpha == pytest.approx(0, abs=1e-9)
+    assert timestep.ticks == 3
+
+
+def test_ticks_do_not_depend_on_the_frame_rate():
+    slow, fast = FixedTimestep(RATE), FixedTimestep(RATE)
+    slow_ticks = sum(slow.advance(1 / 24) for _ in range(24))
+    fast_ticks = sum(fast.advance(1 / 144) for _ in range(144))
+    assert slow_ticks == pytest.approx(RATE, abs=1) and fast_ticks == pytest.approx(RATE, abs=1)
+
+
+def test_a_long_stall_is_clamped():
+    timestep = FixedTimestep(RATE)
+    assert timestep.advance(5.0) == round(MAX_FRAME_TIME / TICK)
+    assert 0 <= timestep.alpha < 1
+
+
+def test_speed_scales_the_ticks_and_none_leaves_them_to_the_caller():
+    assert FixedTimestep(RATE, speed=4).advance(8 * TICK) == 32
+    unthrottled = FixedTimestep(RATE, speed=None)
+    assert unthrottled.unthrottled
+    assert unthrottled.advance(0.1) == 0 and unthrottled.alpha == 1.0
+
+
+def test_reset_drops_the_partial_tick():
+    timestep = FixedTimestep(RATE)
+    timestep.advance(0.9 * TICK)
+    timestep.reset()
+    assert timestep.alpha == 0 and timestep.advance(0.5 * TICK) == 0
@@ -0,0 +1,139 @@
+import json
+import sqlite3
+import time
+
+import pytest
+
+from scores import ScoreStore, day_of
+
+DAY = 86400
+
+
+@pytest.fixture
+def store():
+    store = ScoreStore(None, legacy_file=None)
+    yield store
+    store.close()
+
+
+def test_best_top_and_count(store):
+    now = time.time()
+    for score in (30, 10, 50, 50, 20):
+        store.record(score, ticks=600, seed=score, timestamp=now)
+    store.flush()
+    assert store.count() == 5
+    assert store.best() == 50
+    top = store.top(3)
+    assert [run['score'] for run in top] == [50, 50, 30]
+    # Ties keep the order the runs were recorded in
+    assert top[0]['id'] < top[1]['id']
+    assert top[0]['duration'] == 10.0 and top[0]['day'] == day_of(now)
+
+
+def test_empty_store(store):
+    assert (store.best(), store.count(), store.top(), store.day_best()) == (0, 0, [], None)
+
+
+def test_daily_bests_keep_one_run_per_day(store):
+    today = time.time()
+    yesterday = today - DAY
+    for score, timestamp in ((10, yesterday), (40, yesterday), (20, yesterday), (15, today), (5, today)):
+        store.record(score, timestamp=timestamp)
+    store.flush()
+    assert store.day_best()['score'] == 15
+    assert store.day_best(day_of(yesterday))['score'] == 40
+    assert store.daily_bests() == [(day_of(today), 15), (day_of(yesterday), 40)]
+    assert store.daily_bests(days=1) == [(day_of(today), 15)]
+
+
+def test_seeds_keep_all_64_bits(store):
+    seeds = [0, (1 << 63) - 1, 1 << 63, (1 << 64) - 1]
+    for score, seed in enumerate(seeds, 1):
+        store.record(score, seed=seed)
+    store.flush()
+    assert sorted(run['seed'] for run in store.top(len(seeds))) == seeds
+
+
+def test_replays_are_written_before_the_run_and_never_overwritten(store, tmp_path):
+    path = str(tmp_path / 'replays' / 'run.fbr')
+    store.record(10, replay=(path, b'first'))
+    store.record(20, replay=(path, b'second'))
+    store.flush()
+    first, second = sorted(store.top(), key=lambda run: run['score'])
+    assert first['replay'] == path
+    assert second['replay'] == str(tmp_path / 'replays' / 'run-1.fbr')
+    assert open(first['replay'], 'rb').read() == b'first'
+    assert open(second['replay'], 'rb').read() == b'second'
+    assert sorted(p.name for p in (tmp_path / 'replays').iterdir()) == ['run-1.fbr', 'run.fbr']
+
+
+def test_runs_survive_reopening(tmp_path):
+    path = str(tmp_path / 'scores.db')
+    store = ScoreStore(path, legacy_file=None)
+    store.record(70, ticks=1200, seed=3)
+    store.close()
+    store = ScoreStore(path, legacy_file=None)
+    try:
+        assert store.count() == 1
+        assert store.top()[0]['score'] == 70 and store.top()[0]['seed'] == 3
+    finally:
+        store.close()
+
+
+def test_legacy_high_score_is_imported_once(tmp_path):
+    legacy = tmp_path / 'high_score.json'
+    legacy.write_text(json.dumps({'high_score': 42}))
+    path = str(tmp_path / 'scores.db')
+    store = ScoreStore(path, legacy_file=str(legacy))
+    store.close()
+    store = ScoreStore(path, legacy_file=str(legacy))
+    try:
+        assert store.count() == 1
+        run = store.top()[0]
+        assert (run['score'], run['ticks'], run['seed'], run['replay']) == (42, None, None, None)
+    finally:
+        store.close()
+
+
+def test_unreadable_legacy_file_is_ignored(tmp_path):
+    legacy = tmp_path / 'high_score.json'
+    legacy.write_text('not json')
+    store = ScoreStore(str(tmp_path / 'scores.db'), legacy_file=str(legacy))
+    try:
+        assert store.count() == 0
+    finally:
+        store.close()
+
+
+def test_count_is_the_number_of_runs(store):
+    for score in (1, 2, 3):
+        store.record(score)
+    store.flush()
+    # Ids skip after a delete; count() still counts rows
+    store.reader.execute('DELETE FROM runs WHERE score = 2')
+    assert store.count() == 2
+
+
+def test_unreadable_store_raises_and_closes(tmp_path):
+    path = tmp_path / 'scores.db'
+    path.write_bytes(b'not a database' * 100)
+    with pytest.raises(sqlite3.DatabaseError):
+        ScoreStore(str(path), legacy_file=None)
+
+
+def test_game_starts_without_a_usable_store(headless, tmp_path, capsys):
+    import pygame
+    from game import FlappyBirdGame
+
+    path = tmp_path / 'scores.db'
+    path.write_bytes(b'not a database' * 100)
+    game = FlappyBirdGame(0, score_file=str(path))
+    try:
+        assert game.high_score == 0
+        assert 'runs will not be saved' in capsys.readouterr().out
+        game.scores.record(5)
+        game.scores.flush()
+        assert game.scores.best() == 5
+    finally:
+        game.scores.close()
+        pygame.quit()
@@ -0,0 +1,65 @@
+import asyncio
+
+import numpy as np
+
+from loadgen import LoadClient, LoadStats
+from server import GameServer, SessionProtocol, FLUSH_TICKS
+
+CLIENTS = 2
+TICKS = 1800
+
+
+async def records_arrive(stats, count):
+    for _ in range(2000):
+        if stats.records >= count:
+            return
+        await asyncio.sleep(0.001)
+    raise AssertionError(f'{stats.records} of {count} records arrived')
+
+
+async def play_sessions():
+    # The server's ticks are stepped by hand; the records go over loopback TCP
+    game_server = GameServer(capacity=4, seed=0)
+    loop = asyncio.get_running_loop()
+    server = await loop.create_server(lambda: SessionProtocol(game_server), '127.0.0.1', 0)
+    port = server.sockets[0].getsockname()[1]
+    stats = LoadStats()
+    clients = []
+    for _ in range(CLIENTS):
+        _, client = await loop.create_connection(lambda: LoadClient(stats, True), '127.0.0.1', port)
+        clients.append(client)
+    while stats.connected < CLIENTS:
+        await asyncio.sleep(0.001)
+
+    env = game_server.env
+    try:
+        for tick in range(1, TICKS + 1):
+            game_server.step()
+            if tick % FLUSH_TICKS:
+                continue
+            await records_arrive(stats, CLIENTS * tick)
+            for client in clients:
+                # Session ids and slots are handed out in the same order
+                view, slot = client.view, client.session
+                alive = env.pipe_alive[slot]
+                assert (view.bird_y, view.score) == (env.bird_y[slot], env.score[slot])
+                assert sorted(x for x, _ in view.pipes) == sorted(env.pipe_x[slot][alive])
+                assert sorted(gap for _, gap in view.pipes) == sorted(env.pipe_gap[slot][alive])
+                if client.wants_flap():
+                    client.flap()
+            # Let the flaps reach the server before the next tick
+            await asyncio.sleep(0.002)
+    finally:
+        for client in clients:
+            client.transport.close()
+        server.close()
+        await server.wait_closed()
+    return stats, game_server
+
+
+def test_clients_rebuild_the_sessions_from_their_records():
+    stats, game_server = asyncio.run(play_sessions())
+    assert stats.records == CLIENTS * TICKS
+    assert np.count_nonzero(game_server.env.pipe_alive[:CLIENTS]) > 0
+    # Both sessions played whole games, flapping from the rebuilt state
+    assert len(stats.scores) >= CLIENTS and max(stats.scores) > 0
@@ -0,0 +1,40 @@
+import pytest
+
+from config import POINTS_PER_PIPE
+from rollout import flap_below_gap
+from simulation import FlappySimulation
+
+
+def play(sim, steps):
+    # (obs, reward, done) per step of the scripted policy, up to game over
+    trajectory = []
+    obs = sim.observe()
+    for _ in range(steps):
+        obs, reward, done, _ = sim.step(flap_below_gap(obs))
+        trajectory.append((obs, reward, done))
+        if done:
+            break
+    return trajectory
+
+
+def test_same_seed_plays_the_same_game():
+    first = play(FlappySimulation(3), 5000)
+    assert first == play(FlappySimulation(3), 5000)
+    sim = FlappySimulation(4)
+    sim.reset(3)
+    assert play(sim, 5000) == first
+
+
+def test_scripted_policy_scores_and_rewards_add_up():
+    sim = FlappySimulation(3)
+    trajectory = play(sim, 5000)
+    assert trajectory[-1][2] and sim.done and sim.death_cause is not None
+    assert sim.score > 0 and sim.score % POINTS_PER_PIPE == 0
+    assert sum(reward for _, reward, _ in trajectory) == sim.score
+
+
+def test_step_after_game_over_raises():
+    sim = FlappySimulation(3)
+    play(sim, 5000)
+    with pytest.raises(RuntimeError):
+        sim.step(False)
@@ -0,0 +1,66 @@
+from rollout import flap_below_gap
+from simulation import FlappySimulation, SimState
+
+
+def play(sim, steps):
+    # (obs, reward, done) per step of the scripted policy, up to game over
+    trajectory = []
+    obs = sim.observe()
+    for _ in range(steps):
+        obs, reward, done, _ = sim.step(flap_below_gap(obs))
+        trajectory.append((obs, reward, done))
+        if done:
+            break
+    return trajectory
+
+
+def state_of(sim):
+    state = sim.snapshot()
+    return {name: getattr(state, name) for name in SimState.__slots__}
+
+
+def test_restore_replays_the_same_future():
+    sim = FlappySimulation(9)
+    play(sim, 300)
+    state = sim.snapshot()
+    future = play(sim, 5000)
+
+    other = FlappySimulation(99)
+    other.restore(state)
+    assert play(other, 5000) == future
+    # A state can be restored any number of times, into any simulation
+    sim.restore(state)
+    assert play(sim, 5000) == future
+
+
+def test_snapshot_is_detached_from_the_game():
+    sim = FlappySimulation(9)
+    play(sim, 100)
+    state = sim.snapshot()
+    before = {name: getattr(state, name) for name in SimState.__slots__}
+    play(sim, 100)
+    assert {name: getattr(state, name) for name in SimState.__slots__} == before
+    assert state.pipe_count == len(state.pipes) // 3
+
+
+def test_fork_plays_on_without_touching_the_parent():
+    sim = FlappySimulation(9)
+    play(sim, 200)
+    before = state_of(sim)
+    fork = sim.fork()
+    assert state_of(fork) == before
+    future = play(fork, 5000)
+    assert state_of(sim) == before
+    assert play(sim, 5000) == future
+
+
+def test_fork_has_its_own_seed_stream():
+    sim, untouched = FlappySimulation(7), FlappySimulation(7)
+    fork = sim.fork()
+    fork.reset()
+    fork_seed = fork.seed
+    fork.reset()
+    # The fork drew what the parent would have, without advancing the parent
+    sim.reset()
+    untouched.reset()
+    assert sim.seed == untouched.seed == fork_seed
@@ -0,0 +1,31 @@
+import pytest
+
+from stats import BUCKET_MS, BUCKET_COUNT, Histogram, rolling_percentile
+
+
+def test_percentiles_are_bucket_upper_bounds():
+    histogram = Histogram()
+    for ms in range(1, 101):
+        histogram.add(ms / 10)
+    summary = histogram.summary()
+    assert summary['count'] == 100
+    assert summary['mean_ms'] == pytest.approx(5.05)
+    # Within a bucket of the exact value
+    assert summary['p50_ms'] == pytest.approx(5.0, abs=BUCKET_MS * 1.01)
+    assert summary['p99_ms'] == pytest.approx(9.9, abs=BUCKET_MS * 1.01)
+    assert summary['max_ms'] == 10.0
+
+
+def test_out_of_range_samples_land_in_the_end_buckets():
+    histogram = Histogram()
+    histogram.add(-500.0)
+    histogram.add(-0.01)
+    histogram.add(BUCKET_COUNT * BUCKET_MS * 10)
+    assert histogram.counts[0] == 2 and histogram.counts[-1] == 1
+    assert histogram.percentile(0.5) == BUCKET_MS
+
+
+def test_rolling_percentile():
+    assert rolling_percentile([], 0.99) == 0.0
+    assert rolling_percentile([3, 1, 2, 5, 4], 0.5) == 3
+    assert rolling_percentile([3, 1, 2, 5, 4], 0.99) == 5
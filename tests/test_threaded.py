@@ -0,0 +1,50 @@
+import threading
+
+import pytest
+
+from threaded import SnapshotBuffer
+
+
+def test_triple_buffer_never_writes_the_slot_being_drawn():
+    buffer = SnapshotBuffer()
+    buffer.publish('a')
+    assert buffer.acquire() == ('a', True)
+    # The reader keeps 'a' while the writer runs ahead
+    for snapshot in 'bcde':
+        buffer.publish(snapshot)
+        assert buffer.slots[buffer.reading] == 'a'
+    assert buffer.acquire() == ('e', True)
+    assert buffer.acquire() == ('e', False)
+    assert (buffer.published, buffer.swaps, buffer.overwritten, buffer.repeats) == (5, 2, 3, 1)
+
+
+def test_double_buffer_replaces_the_undrawn_snapshot_in_place():
+    buffer = SnapshotBuffer(slots=2)
+    buffer.publish('a')
+    buffer.acquire()
+    buffer.publish('b')
+    newest = buffer.newest
+    buffer.publish('c')
+    assert buffer.newest == newest and buffer.slots[buffer.reading] == 'a'
+    assert buffer.acquire() == ('c', True)
+
+
+def test_slot_count_is_checked():
+    with pytest.raises(ValueError):
+        SnapshotBuffer(slots=4)
+
+
+def test_reader_sees_snapshots_in_publish_order():
+    buffer = SnapshotBuffer()
+    buffer.publish(0)
+    count = 20000
+    writer = threading.Thread(target=lambda: [buffer.publish(n) for n in range(1, count + 1)])
+    writer.start()
+    seen = []
+    while not seen or seen[-1] < count:
+        snapshot, new = buffer.acquire()
+        if new:
+            seen.append(snapshot)
+    writer.join()
+    assert seen == sorted(set(seen))
+    assert buffer.swaps == len(seen) and buffer.published == count + 1
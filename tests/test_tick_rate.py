@@ -0,0 +1,150 @@
+import numpy as np
+import pytest
+
+from batch_env import BatchFlappyEnv
+from config import JUMP_STRENGTH, PIPE_WIDTH, PIPE_GAP, BIRD_START_X
+from simulation import (
+    FlappySimulation, PIPE_SLOTS, DEATH_CAUSES, DEATH_PIPE, DEATH_FLOOR, BIRD_LEFT, BIRD_HALF_HEIGHT,
+)
+
+# Coarse steps against states built by hand, where the deciding event falls
+# strictly inside a 15 Hz step (4 ticks). Each case is checked on
+# FlappySimulation, on a one-game BatchFlappyEnv holding the same state, and
+# against the same ticks played one by one on a fork.
+
+TICK_RATE = 15
+# Slowest rate FlappySimulation accepts
+LOWEST_RATE = 2
+
+
+def coarse_sim(bird_y, bird_movement, pipes):
+    sim = FlappySimulation(0, tick_rate=TICK_RATE)
+    sim.bird_y = sim.prev_bird_y = bird_y
+    sim.bird_movement = bird_movement
+    for centerx, gap_y in pipes:
+        sim.pipes.push(centerx, gap_y)
+        # Pipes already behind the bird were scored before this state
+        if centerx < BIRD_START_X:
+            sim.next_pipe_index += 1
+    return sim
+
+
+def batch_from(sim):
+    env = BatchFlappyEnv(1, seed=0, tick_rate=TICK_RATE)
+    env.bird_y[0] = sim.bird_y
+    env.bird_movement[0] = sim.bird_movement
+    for index in range(sim.pipes.head, sim.pipes.spawned):
+        pipe, slot = sim.pipes[index], index % PIPE_SLOTS
+        env.pipe_x[0, slot] = pipe.centerx
+        env.pipe_gap[0, slot] = pipe.gap_y
+        env.pipe_alive[0, slot] = True
+        env.pipe_passed[0, slot] = index < sim.next_pipe_index
+    env.pipes_spawned[0] = sim.pipes.spawned
+    return env
+
+
+def substepped(sim, flap):
+    ghost = sim.fork()
+    if flap:
+        ghost.bird_movement = JUMP_STRENGTH
+    for _ in range(sim.ticks_per_step):
+        ghost.advance_tick()
+        if ghost.done:
+            break
+    return ghost
+
+
+def step_all(sim, flap=False):
+    # (sim after the step, the sub-stepped fork, (done, score, cause) of the batch)
+    env = batch_from(sim)
+    ghost = substepped(sim, flap)
+    sim.step(flap)
+    _, _, done, info = env.step([flap])
+    batch = (bool(done[0]), int(info['episode_score'][0]), DEATH_CAUSES[info['death_cause'][0]])
+    return sim, ghost, batch
+
+
+def test_pipe_corner_clipped_inside_step():
+    # The bird starts inside the gap and flaps; its head clips the top pipe on
+    # the first tick while the pipe is leaving, and by the end of the step the
+    # pipe is behind it, where a test at the step boundary cannot see it
+    gap_y = 450
+    bird_y = gap_y - PIPE_GAP + BIRD_HALF_HEIGHT + 2
+    centerx = -8 + PIPE_WIDTH // 2
+    sim, ghost, batch = step_all(coarse_sim(bird_y, 0, [(centerx, gap_y)]), flap=True)
+    assert sim.pipes.spawned == 1 and sim.pipes[0].left + PIPE_WIDTH <= BIRD_LEFT
+    assert (sim.done, sim.death_cause) == (True, DEATH_PIPE)
+    assert ghost.death_cause == DEATH_PIPE
+    assert batch == (True, 0, DEATH_PIPE)
+
+
+def test_floor_reached_between_step_boundaries():
+    # Falling from 600 at 10 px/tick, the bird reaches the floor on the third
+    # tick; the step ends there, where the sub-stepped bird is
+    sim, ghost, batch = step_all(coarse_sim(600, 10, []))
+    assert (sim.done, sim.death_cause) == (True, DEATH_FLOOR)
+    assert sim.bird_y == ghost.bird_y == 630
+    assert batch == (True, 0, DEATH_FLOOR)
+
+
+@pytest.mark.parametrize('centerx, scored', [
+    # Center passes the bird on the third tick, the one the bird dies on
+    (BIRD_START_X + 12, True),
+    # ... or on the fourth, after it died
+    (BIRD_START_X + 17, False),
+])
+def test_score_and_death_on_same_tick(centerx, scored):
+    # The bird is inside a low gap and hits the floor on the third tick
+    sim, ghost, batch = step_all(coarse_sim(600, 10, [(centerx, 700)]))
+    points = 2 if scored else 0
+    assert (sim.done, sim.death_cause, sim.score) == (True, DEATH_FLOOR, points)
+    assert (ghost.death_cause, ghost.score) == (DEATH_FLOOR, points)
+    assert batch == (True, points, DEATH_FLOOR)
+
+
+def test_pipe_checked_before_floor_on_earlier_tick():
+    # Below the gap of a leaving pipe on the first tick, on the floor later
+    centerx = -8 + PIPE_WIDTH // 2
+    sim, ghost, batch = step_all(coarse_sim(600, 10, [(centerx, 560)]))
+    assert sim.death_cause == ghost.death_cause == DEATH_PIPE
+    assert batch == (True, 0, DEATH_PIPE)
+
+
+def test_coarse_steps_match_substeps_over_episodes():
+    rng = np.random.default_rng(0)
+    sim = FlappySimulation(0, tick_rate=TICK_RATE)
+    for episode in range(20):
+        obs = sim.reset(episode)
+        while not sim.done:
+            flap = obs[0] > obs[3] + 30 or rng.random() < 0.05
+            ghost = substepped(sim, flap)
+            obs, _, _, _ = sim.step(flap)
+            assert (sim.done, sim.score, sim.death_cause) == (ghost.done, ghost.score, ghost.death_cause)
+
+
+def test_rates_spawning_two_pipes_in_a_step_are_rejected():
+    # 60 ticks per step at 1 Hz; pipes can spawn every 48
+    for tick_rate in (1, 7):
+        with pytest.raises(ValueError):
+            FlappySimulation(0, tick_rate=tick_rate)
+        with pytest.raises(ValueError):
+            BatchFlappyEnv(2, tick_rate=tick_rate)
+
+
+def test_lowest_rate_matches_substeps():
+    # 30 ticks per step: a pipe spawns inside most steps
+    rng = np.random.default_rng(0)
+    sim = FlappySimulation(0, tick_rate=LOWEST_RATE)
+    steps = 0
+    for episode in range(50):
+        obs = sim.reset(episode)
+        while not sim.done:
+            flap = obs[0] > obs[3] or rng.random() < 0.2
+            ghost = substepped(sim, flap)
+            obs, _, _, _ = sim.step(flap)
+            steps += 1
+            assert (sim.done, sim.score, sim.death_cause) == (ghost.done, ghost.score, ghost.death_cause)
+            if not sim.done:
+                assert (sim.bird_y, sim.pipes.spawned) == (ghost.bird_y, ghost.pipes.spawned)
+                assert [pipe.gap_y for pipe in sim.pipes] == [pipe.gap_y for pipe in ghost.pipes]
+    assert steps > 200
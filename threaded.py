@@ -0,0 +1,205 @@
+import threading
+import time
+from collections import namedtuple
+
+from config import TICK_RATE, FPS
+from scheduler import MAX_FRAME_TIME
+from stats import Histogram
+
+# Threaded mode for FlappyBirdGame (--threaded). A simulation thread runs
+# the game ticks on its own fixed-rate schedule and, after every tick,
+# publishes a FrameSnapshot: everything draw_frame() reads, detached from
+# the live game. The main thread keeps the window. It reads input, hands it
+# to the simulation thread as commands, and draws the newest snapshot.
+# pygame releases the GIL while it blits and updates the display, so ticks
+# keep running while a frame is drawn and presented, and a slow frame no
+# longer delays the ticks behind it.
+
+BUFFER_SLOTS = 3
+# How often a thread running Python hands over the GIL (the default is
+# 5 ms). A shorter interval lets the simulation thread start its tick on
+# time while the render thread is busy in Python code.
+SWITCH_INTERVAL = 0.0005
+# A present this many frame budgets after the previous one missed a refresh
+DROPPED_FRAME_FACTOR = 1.5
+
+PipeView = namedtuple('PipeView', 'slot prev_centerx centerx gap_y')
+
+
+class FrameSnapshot:
+    # The drawn state of the game after one tick, under the same attribute
+    # names as FlappyBirdGame, so draw_frame() takes either. Never changed
+    # once published.
+    __slots__ = (
+        'tick', 'time', 'game_state', 'game_active', 'paused', 'pipes', 'trail', 'bird_index', 'bird',
+        'bird_rect', 'bird_y', 'prev_bird_y', 'bird_rotation', 'score', 'high_score', 'flash_count',
+        'particles', 'camera', 'floor_x_pos',
+    )
+
+    @classmethod
+    def capture(cls, game):
+        snapshot = cls()
+        sim = game.sim
+        snapshot.tick = sim.tick
+        snapshot.game_state = game.game_state
+        snapshot.game_active = game.game_active
+        snapshot.paused = game.paused
+        snapshot.pipes = tuple(PipeView(pipe.slot, pipe.prev_centerx, pipe.centerx, pipe.gap_y)
+                               for pipe in sim.pipes)
+        # Trail rects are copies that are never moved; only the alphas fade
+        snapshot.trail = tuple(dict(ghost) for ghost in game.trail)
+        snapshot.bird_index = game.bird_index
+        snapshot.bird = game.bird
+        snapshot.bird_rect = game.bird_rect.copy()
+        snapshot.bird_y = sim.bird_y
+        snapshot.prev_bird_y = sim.prev_bird_y
+        snapshot.bird_rotation = sim.bird_rotation
+        snapshot.score = game.score
+        snapshot.high_score = game.high_score
+        snapshot.flash_count = game.flash_count
+        snapshot.particles = game.particles.snapshot()
+        snapshot.camera = game.camera
+        snapshot.floor_x_pos = game.floor_x_pos
+        snapshot.time = time.perf_counter()
+        return snapshot
+
+
+class SnapshotBuffer:
+    # Hands snapshots from the simulation thread to the render thread; neither
+    # ever waits on the other for longer than swapping two slot indices. With
+    # three slots the writer always has a free one: one holds the newest
+    # snapshot, one is being drawn and one is written. With two, a snapshot
+    # nobody has drawn yet is replaced in place while the reader holds the other.
+
+    def __init__(self, slots=BUFFER_SLOTS):
+        if slots not in (2, 3):
+            raise ValueError(f'a snapshot buffer has 2 or 3 slots, got {slots}')
+        self.slots = [None] * slots
+        self.lock = threading.Lock()
+        self.newest = None
+        self.reading = None
+        self.unread = False
+        self.published = 0
+        # The reader took a new snapshot
+        self.swaps = 0
+        # Published but replaced before any frame drew it
+        self.overwritten = 0
+        # A frame found nothing new and drew the last snapshot again
+        self.repeats = 0
+
+    def publish(self, snapshot):
+        with self.lock:
+            slot = next((index for index in range(len(self.slots))
+                         if index != self.newest and index != self.reading), self.newest)
+            if self.unread:
+                self.overwritten += 1
+            self.slots[slot] = snapshot
+            self.newest = slot
+            self.unread = True
+            self.published += 1
+
+    def acquire(self):
+        # The newest snapshot, and whether it is new since the previous call
+        with self.lock:
+            if not self.unread:
+                self.repeats += 1
+                return self.slots[self.reading], False
+            self.reading = self.newest
+            self.unread = False
+            self.swaps += 1
+            return self.slots[self.reading], True
+
+
+class SimulationThread(threading.Thread):
+    # Calls tick() then publish() on an absolute schedule of tick_rate * speed
+    # ticks per second, or back to back when speed is None. A stall of more than
+    # MAX_FRAME_TIME is dropped rather than replayed as a burst, as in FixedTimestep.
+
+    def __init__(self, tick, publish, tick_rate=TICK_RATE, speed=1.0):
+        super().__init__(name='simulation', daemon=True)
+        self.tick = tick
+        self.publish = publish
+        self.tick_time = None if speed is None else 1.0 / (tick_rate * speed)
+        self.stopping = threading.Event()
+        self.error = None
+        # How late each tick started, and how long it took with its snapshot
+        self.late = Histogram()
+        self.work = Histogram()
+        self.ticks = 0
+        self.skipped = 0
+        self.started_at = None
+
+    def run(self):
+        try:
+            self._run()
+        except BaseException as error:
+            # Raised again on the render thread by check()
+            self.error = error
+
+    def _run(self):
+        tick_time = self.tick_time
+        next_tick = self.started_at = time.perf_counter()
+        while not self.stopping.is_set():
+            if tick_time is None:
+                now = time.perf_counter()
+            else:
+                now = self._wait(next_tick)
+                if now - next_tick > MAX_FRAME_TIME:
+                    self.skipped += int((now - next_tick) / tick_time)
+                    next_tick = now
+                self.late.add((now - next_tick) * 1000)
+                next_tick += tick_time
+            self.tick()
+            self.publish()
+            self.work.add((time.perf_counter() - now) * 1000)
+            self.ticks += 1
+
+    def _wait(self, deadline):
+        # Only sleeps: spinning would hold the GIL the render thread needs
+        now = time.perf_counter()
+        if deadline > now:
+            time.sleep(deadline - now)
+            now = time.perf_counter()
+        return now
+
+    def check(self):
+        if self.error is not None:
+            raise self.error
+
+    def stop(self):
+        self.stopping.set()
+        if self.is_alive():
+            self.join()
+
+
+class RenderStats:
+    # Present-to-present intervals on the render thread. An interval of
+    # DROPPED_FRAME_FACTOR budgets or more counts the refreshes it missed.
+
+    def __init__(self, fps=FPS):
+        self.frame_time = 1.0 / fps
+        self.intervals = Histogram()
+        self.frames = 0
+        self.dropped = 0
+        self.last_present = None
+
+    def presented(self, now):
+        if self.last_present is not None:
+            interval = now - self.last_present
+            self.intervals.add(interval * 1000)
+            if interval >= DROPPED_FRAME_FACTOR * self.frame_time:
+                self.dropped += round(interval / self.frame_time) - 1
+        self.last_present = now
+        self.frames += 1
+
+
+def print_threaded_summary(sim_thread, buffer, render):
+    elapsed = time.perf_counter() - sim_thread.started_at if sim_thread.started_at else 0.0
+    late, work, frames = sim_thread.late.summary(), sim_thread.work.summary(), render.intervals.summary()
+    print(f'Simulation thread: {sim_thread.ticks} ticks in {elapsed:.1f} s, '
+          f"start late p50 {late['p50_ms']:.2f} p99 {late['p99_ms']:.2f} max {late['max_ms']:.2f} ms, "
+          f"work p99 {work['p99_ms']:.2f} ms, {sim_thread.skipped} skipped")
+    print(f"Render thread: {render.frames} frames, present interval p50 {frames['p50_ms']:.1f} "
+          f"p99 {frames['p99_ms']:.1f} max {frames['max_ms']:.1f} ms, {render.dropped} dropped; "
+          f'{buffer.swaps} buffer swaps, {buffer.repeats} repeated frames, '
+          f'{buffer.overwritten} of {buffer.published} snapshots never drawn')